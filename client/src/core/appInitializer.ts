@@ -13,7 +13,7 @@ import { ChatSidebar } from '../ui/chatSidebar';
 import { LiveIndicator } from '../ui/liveIndicator';
 import { StreamInfoDisplay } from '../ui/streamInfoDisplay';
 import { WakeLockManager } from '../utils/wakeLockManager';
-import { WebSocketMessage, ChatMessage, NeuroSpeechSegmentMessage, StreamMetadataMessage } from '../types/common';
+import { WebSocketMessage, ChatMessage, ChatBatchMessage, NeuroSpeechSegmentMessage, StreamMetadataMessage } from '../types/common';
 import { SettingsModal, AppSettings } from '../ui/settingsModal';
 import { MuteButton } from '../ui/muteButton';
 import { getLatestReplayVideo, buildBilibiliIframeUrl } from '../services/bilibiliService';
@@ -207,6 +207,7 @@ export class AppInitializer {
                 url: url,
                 autoReconnect: true,
                 maxReconnectAttempts: this.currentSettings.reconnectAttempts,
+                capabilities: ['binary_audio', 'chat_batch'],
                 onMessage: universalMessageHandler,
                 onOpen: onOpen,
                 onDisconnect: onDisconnect,
@@ -223,6 +224,7 @@ export class AppInitializer {
                 url: url,
                 autoReconnect: true,
                 maxReconnectAttempts: this.currentSettings.reconnectAttempts,
+                capabilities: ['binary_audio', 'chat_batch'],
                 onMessage: universalMessageHandler,
                 onOpen: onOpen,
                 onDisconnect: onDisconnect,
@@ -479,8 +481,8 @@ export class AppInitializer {
                 const segment = message as NeuroSpeechSegmentMessage;
                 if (segment.is_end) {
                     this.audioPlayer.setAllSegmentsReceived(); 
-                } else if (segment.audio_base64 && segment.text && typeof segment.duration === 'number') { 
-                    this.audioPlayer.addAudioSegment(segment.text, segment.audio_base64, segment.duration);
+                } else if ((segment.audio_data || segment.audio_base64) && segment.text && typeof segment.duration === 'number') { 
+                    this.audioPlayer.addAudioSegment(segment.text, segment.audio_data ?? segment.audio_base64!, segment.duration);
                 } else {
                     console.warn("Received neuro_speech_segment message with missing audio/text/duration:", segment);
                 }
@@ -495,6 +497,12 @@ export class AppInitializer {
                    this.chatDisplay.appendChatMessage(message as ChatMessage);
                 }
                 break;
+            case 'chat_batch':
+                // 按服务器给出的偏移错开显示批量消息
+                for (const chat of (message as ChatBatchMessage).messages) {
+                    setTimeout(() => this.handleWebSocketMessage(chat), chat.offset_ms ?? 0);
+                }
+                break;
             case 'error':
                 this.chatDisplay.appendChatMessage({ type: "chat_message", username: "System", text: `后端错误: ${(message as any).message}`, is_user_message: false });
                 break;
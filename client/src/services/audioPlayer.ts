@@ -33,13 +33,22 @@ export class AudioPlayer {
     /**
      * 新增：添加音频片段时传入 duration
      */
-    public addAudioSegment(text: string, audioBase64: string, duration: number): void { // <-- 增加 duration 参数
+    public addAudioSegment(text: string, audioSource: string | ArrayBuffer, duration: number): void { // <-- 增加 duration 参数
         // 新段落开始时，先隐藏字幕
         if (this.lastSegmentEnd) {
             hideNeuroCaption();
         }
         this.lastSegmentEnd = false;
-        const audio = new Audio('data:audio/mp3;base64,' + audioBase64);
+        let audio: HTMLAudioElement;
+        if (typeof audioSource === 'string') {
+            audio = new Audio('data:audio/mp3;base64,' + audioSource);
+        } else {
+            // 二进制音频：使用 Blob URL，播放结束后释放
+            const objectUrl = URL.createObjectURL(new Blob([audioSource], { type: 'audio/mpeg' }));
+            audio = new Audio(objectUrl);
+            audio.addEventListener('ended', () => URL.revokeObjectURL(objectUrl), { once: true });
+            audio.addEventListener('error', () => URL.revokeObjectURL(objectUrl), { once: true });
+        }
         
         // 检查静音状态
         try {
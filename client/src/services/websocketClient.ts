@@ -13,6 +13,7 @@ export interface WebSocketClientOptions {
     autoReconnect?: boolean;
     reconnectInterval?: number;
     maxReconnectAttempts?: number; // 新增：最大重连次数，-1为无限
+    capabilities?: string[]; // Optional protocol features announced to the server on connect
 }
 
 export class WebSocketClient {
@@ -22,6 +23,8 @@ export class WebSocketClient {
     private reconnectAttempts: number = 0;
     private reconnectTimeout: ReturnType<typeof setTimeout> | null = null;
     private explicitlyClosed: boolean = false;
+    // A header message waiting for the binary frame that carries its audio
+    private pendingBinaryMessage: WebSocketMessage | null = null;
 
     constructor(options: WebSocketClientOptions) {
         // --- MODIFIED: Set default options and store the whole object ---
@@ -45,6 +48,8 @@ export class WebSocketClient {
         this.explicitlyClosed = false;
         console.log(`Connecting to WebSocket: ${this.options.url}`);
         this.ws = new WebSocket(this.options.url);
+        this.ws.binaryType = 'arraybuffer';
+        this.pendingBinaryMessage = null;
 
         this.ws.onopen = () => {
             console.log(`WebSocket connected: ${this.options.url}`);
@@ -53,16 +58,32 @@ export class WebSocketClient {
                 clearTimeout(this.reconnectTimeout);
                 this.reconnectTimeout = null;
             }
+            if (this.options.capabilities?.length) {
+                this.send({ type: 'client_hello', capabilities: this.options.capabilities });
+            }
             this.options.onOpen?.();
         };
 
         this.ws.onmessage = (event: MessageEvent) => {
+            // Binary frames carry the audio for the preceding `audio_binary` header
+            if (event.data instanceof ArrayBuffer) {
+                if (this.pendingBinaryMessage) {
+                    const message = this.pendingBinaryMessage;
+                    this.pendingBinaryMessage = null;
+                    message.audio_data = event.data;
+                    this.dispatchMessage(message);
+                } else {
+                    console.warn(`Received a binary frame without a header from ${this.options.url}.`);
+                }
+                return;
+            }
             try {
                 const message: WebSocketMessage = JSON.parse(event.data);
-                if (message.type === 'processing_superchat') {
-                    showSuperChatOverlay(message.data.username, message.data.text, message.data.sc_type);
+                if (message.audio_binary) {
+                    this.pendingBinaryMessage = message;
+                    return;
                 }
-                this.options.onMessage?.(message);
+                this.dispatchMessage(message);
             } catch (error) {
                 console.error(`Error parsing message from ${this.options.url}:`, error, event.data);
             }
@@ -87,6 +108,13 @@ export class WebSocketClient {
         };
     }
 
+    private dispatchMessage(message: WebSocketMessage): void {
+        if (message.type === 'processing_superchat') {
+            showSuperChatOverlay(message.data.username, message.data.text, message.data.sc_type);
+        }
+        this.options.onMessage?.(message);
+    }
+
     private tryReconnect(): void {
         // --- MODIFIED: Use configured maxReconnectAttempts and handle -1 ---
         const shouldRetry = this.options.maxReconnectAttempts === -1 || this.reconnectAttempts < this.options.maxReconnectAttempts!;
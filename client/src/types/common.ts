@@ -24,6 +24,9 @@ export interface NeuroSpeechSegmentMessage extends WebSocketMessage {
     segment_id?: number; // 片段 ID，可选
     text?: string;       // 字幕文本，可选
     audio_base64?: string; // 音频数据 Base64，可选
+    audio_binary?: boolean; // 音频通过紧随其后的二进制帧发送
+    audio_data?: ArrayBuffer; // 二进制帧中的原始音频数据
+    duration?: number;   // 音频时长（秒）
     is_end: boolean;     // 是否是本次发言的最后一个片段
 }
 
@@ -44,6 +47,12 @@ export interface ChatMessage extends WebSocketMessage {
     is_user_message: boolean; // 是否是当前客户端用户发送的消息
 }
 
+// 批量聊天消息（需在 client_hello 中声明 chat_batch）
+export interface ChatBatchMessage extends WebSocketMessage {
+    type: "chat_batch";
+    messages: (ChatMessage & { offset_ms?: number })[]; // offset_ms: 相对收到批次的显示延迟（毫秒）
+}
+
 // 后端错误消息
 export interface BackendErrorMessage extends WebSocketMessage {
     type: "error";
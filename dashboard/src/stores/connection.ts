@@ -156,6 +156,8 @@ export const useConnectionStore = defineStore('connection', () => {
           case 'stream_status': streamStore.handleStreamStatusUpdate(message.payload); break;
           case 'server_log': logStore.addServerLog(message.data || message.content || 'Unknown server log'); break;
           case 'agent_log': logStore.addAgentLog(message.data || message.content || 'Unknown agent log'); break;
+          case 'server_log_batch': logStore.addServerLogs(message.data || []); break;
+          case 'agent_log_batch': logStore.addAgentLogs(message.data || []); break;
           case 'core_memory_updated': agentStore.handleCoreMemoryUpdate(message.payload); break;
           case 'temp_memory_updated': agentStore.handleTempMemoryUpdate(message.payload); break;
           case 'init_memory_updated': agentStore.handleInitMemoryUpdate(message.payload); break;
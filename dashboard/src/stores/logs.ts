@@ -21,10 +21,20 @@ export const useLogStore = defineStore('logs', () => {
     }
   }
 
+  function addServerLogs(logs: string[]) {
+    serverLogs.value = serverLogs.value.concat(logs).slice(-MAX_LOGS);
+  }
+
+  function addAgentLogs(logs: string[]) {
+    agentLogs.value = agentLogs.value.concat(logs).slice(-MAX_LOGS);
+  }
+
   return {
     serverLogs,
     agentLogs,
     addServerLog,
     addAgentLog,
+    addServerLogs,
+    addAgentLogs,
   };
 });
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Broadcast latency against the number of stream clients.
+
+Compares sending a message to every client one after another with
+WebSocketManager.broadcast, which encodes once and hands the frame to each
+client's own writer. Every fake client takes SEND_LATENCY_MS to accept a frame.
+
+Run from the server directory:
+    python -m benchmarks.broadcast
+"""
+
+import asyncio
+import time
+
+from starlette.websockets import WebSocketState
+
+from neuro_simulator.utils.websocket import WebSocketManager
+
+CLIENT_COUNTS = (10, 100, 1000)
+SEND_LATENCY_MS = 1.0
+MESSAGE = {"type": "chat_message", "username": "viewer", "text": "neuro is so cute " * 8}
+
+
+class FakeWebSocket:
+    """A connected client that takes a fixed time to accept each frame."""
+
+    def __init__(self, delivered: asyncio.Event, remaining: list):
+        self.client_state = WebSocketState.CONNECTED
+        self._delivered = delivered
+        self._remaining = remaining
+
+    async def accept(self):
+        pass
+
+    async def _receive(self):
+        await asyncio.sleep(SEND_LATENCY_MS / 1000)
+        self._remaining[0] -= 1
+        if self._remaining[0] == 0:
+            self._delivered.set()
+
+    async def send_text(self, text):
+        await self._receive()
+
+    async def send_json(self, message):
+        await self._receive()
+
+    async def close(self, code=1000):
+        self.client_state = WebSocketState.DISCONNECTED
+
+
+async def _sequential(count: int) -> float:
+    delivered, remaining = asyncio.Event(), [count]
+    clients = [FakeWebSocket(delivered, remaining) for _ in range(count)]
+    start = time.perf_counter()
+    for client in clients:
+        await client.send_json(MESSAGE)
+    return time.perf_counter() - start
+
+
+async def _manager(count: int):
+    delivered, remaining = asyncio.Event(), [count]
+    manager = WebSocketManager()
+    for _ in range(count):
+        await manager.connect(FakeWebSocket(delivered, remaining))
+    start = time.perf_counter()
+    await manager.broadcast(MESSAGE)
+    returned = time.perf_counter() - start
+    await delivered.wait()
+    delivered_after = time.perf_counter() - start
+    writers = [outbox.writer_task for outbox in manager._outboxes.values()]
+    for websocket in list(manager.active_connections):
+        manager.disconnect(websocket)
+    await asyncio.gather(*writers, return_exceptions=True)
+    return returned, delivered_after
+
+
+async def main():
+    print(f"Each client takes {SEND_LATENCY_MS} ms per frame.")
+    print(f"{'clients':>8} {'sequential ms':>14} {'broadcast returns ms':>21} {'all delivered ms':>17}")
+    for count in CLIENT_COUNTS:
+        sequential = await _sequential(count)
+        returned, delivered = await _manager(count)
+        print(f"{count:>8} {sequential * 1000:>14.1f} {returned * 1000:>21.2f} {delivered * 1000:>17.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
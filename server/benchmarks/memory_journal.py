@@ -0,0 +1,91 @@
+"""
+Core memory change cost in JSON and journal storage mode.
+
+Starts from BLOCK_COUNT core memory blocks and applies CHANGE_COUNT random
+changes. In JSON mode each change is written by rewriting core_memory.json, in
+journal mode it is appended to core_memory.journal. Reloading the memory
+afterwards is timed too, and must give back the live state.
+
+Run from the server directory:
+    python -m benchmarks.memory_journal
+"""
+
+import asyncio
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from neuro_simulator.agents.memory.manager import MemoryManager
+from neuro_simulator.agents.memory.persistence import memory_persistence
+from neuro_simulator.core.config import config_manager
+
+BLOCK_COUNT = 3000
+CHANGE_COUNT = 2000
+
+
+def _write_memory_files(directory: Path):
+    directory.mkdir()
+    blocks = {
+        f"block{index}": {
+            "id": f"block{index}",
+            "title": f"Viewer {index}",
+            "description": "Things Neuro remembers about this viewer.",
+            "content": [f"Fact {fact} about viewer {index}." for fact in range(4)],
+        }
+        for index in range(BLOCK_COUNT)
+    }
+    (directory / "init_memory.json").write_text(json.dumps({"name": "Neuro"}), encoding="utf-8")
+    (directory / "core_memory.json").write_text(json.dumps({"blocks": blocks}), encoding="utf-8")
+    (directory / "temp_memory.json").write_text("[]", encoding="utf-8")
+
+
+def _manager(directory: Path) -> MemoryManager:
+    return MemoryManager(
+        directory / "init_memory.json",
+        directory / "core_memory.json",
+        directory / "temp_memory.json",
+    )
+
+
+async def _run(storage: str, directory: Path):
+    config_manager.settings.server.memory_storage = storage
+    _write_memory_files(directory)
+    manager = _manager(directory)
+    await manager.initialize()
+
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for change in range(CHANGE_COUNT):
+        block_id = f"block{rng.randrange(BLOCK_COUNT)}"
+        if change % 2:
+            await manager.append_to_core_memory_block(block_id, f"New fact {change}.")
+        else:
+            await manager.update_core_memory_block(block_id, title=f"Viewer {change}")
+        if storage == "json":
+            # Write-behind would coalesce the rewrites; each change is made durable here
+            await memory_persistence.flush([manager.core_memory_file])
+    await manager.flush()
+    per_change = (time.perf_counter() - start) / CHANGE_COUNT
+
+    start = time.perf_counter()
+    reloaded = _manager(directory)
+    await reloaded.initialize()
+    reload = time.perf_counter() - start
+    assert reloaded.core_memory == manager.core_memory
+    return per_change, reload
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as working_dir:
+        config_manager.load(str(Path(working_dir) / "config.yaml"))
+        print(f"{BLOCK_COUNT} core memory blocks, {CHANGE_COUNT} changes.")
+        print(f"{'storage':>8} {'ms per change':>14} {'reload ms':>10}")
+        for storage in ("json", "journal"):
+            per_change, reload = await _run(storage, Path(working_dir) / storage)
+            print(f"{storage:>8} {per_change * 1000:>14.3f} {reload * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
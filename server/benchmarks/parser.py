@@ -0,0 +1,87 @@
+"""
+Streaming JSON parser throughput on multi-KB responses.
+
+Compares the old parser, which appended each chunk to a buffer and re-ran
+raw_decode from its start, with IncrementalJSONParser. The response is an array
+of speak calls fed in CHUNK_SIZE character chunks, as an LLM stream delivers it.
+
+Run from the server directory:
+    python -m benchmarks.parser
+"""
+
+import json
+import time
+from typing import Any, List
+
+from neuro_simulator.agents.streaming_parser import IncrementalJSONParser
+
+CALL_COUNTS = (8, 48, 192)
+CHUNK_SIZE = 4
+SENTENCE = "Chat, I have been thinking about the turtles again, and honestly they deserve better. "
+
+
+def _response(call_count: int) -> str:
+    calls = [
+        {"name": "speak", "params": {"text": SENTENCE * 2 + f"That was number {index}."}}
+        for index in range(call_count)
+    ]
+    return json.dumps(calls, ensure_ascii=False)
+
+
+def _chunks(text: str) -> List[str]:
+    return [text[i:i + CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE)]
+
+
+def _redecode(chunks: List[str]) -> List[Any]:
+    """The previous parse_json_stream loop, without the async plumbing."""
+    values: List[Any] = []
+    buffer = ""
+    decoder = json.JSONDecoder()
+    for chunk in chunks:
+        buffer = (buffer + chunk).lstrip()
+        while buffer:
+            try:
+                value, end_index = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                break
+            values.append(value)
+            buffer = buffer[end_index:].lstrip()
+    return values
+
+
+def _incremental(chunks: List[str], partial_fields=None) -> List[Any]:
+    parser = IncrementalJSONParser(partial_fields)
+    values: List[Any] = []
+    for chunk in chunks:
+        values.extend(parser.feed(chunk))
+    return values
+
+
+def _best_of(runs: int, function, *args) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"Responses are fed in {CHUNK_SIZE} character chunks; best of 3 runs.")
+    print(f"{'size KB':>8} {'re-decode ms':>13} {'incremental ms':>15} {'with partials ms':>17}")
+    for call_count in CALL_COUNTS:
+        text = _response(call_count)
+        chunks = _chunks(text)
+        assert _redecode(chunks) == [json.loads(text)]
+        assert _incremental(chunks) == json.loads(text)
+        redecode = _best_of(3, _redecode, chunks)
+        incremental = _best_of(3, _incremental, chunks)
+        partials = _best_of(3, _incremental, chunks, ["speak.params.text"])
+        print(
+            f"{len(text) / 1024:>8.1f} {redecode * 1000:>13.1f} "
+            f"{incremental * 1000:>15.2f} {partials * 1000:>17.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# neuro_simulator/agents/chatbot/ambient_model.py
+"""
+A local n-gram model of audience chat.
+Ambient chat does not react to anything in particular, so a word-level Markov
+chain trained on past chat can produce part of it without an LLM call.
+"""
+
+import random
+from bisect import bisect
+from itertools import accumulate
+from typing import Dict, List, Optional, Set, Tuple
+
+_START = "\x02"
+_END = "\x03"
+# Texts remembered to avoid training on the same message twice
+_SEEN_LIMIT = 20000
+_rng = random.Random()
+
+State = Tuple[str, ...]
+
+
+class _Transitions:
+    """The words seen after one state, with cumulative counts for sampling."""
+
+    __slots__ = ("counts", "_words", "_cumulative")
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self._words: Optional[List[str]] = None
+        self._cumulative: List[int] = []
+
+    def add(self, word: str):
+        self.counts[word] = self.counts.get(word, 0) + 1
+        self._words = None
+
+    def sample(self, rng: random.Random) -> str:
+        if self._words is None:
+            # Rebuilt only after the counts changed, so sampling is a binary search
+            self._words = list(self.counts)
+            self._cumulative = list(accumulate(self.counts.values()))
+        return self._words[bisect(self._cumulative, rng.random() * self._cumulative[-1])]
+
+
+class NGramChatModel:
+    """
+    A word-level Markov chain of order `order`, trained one message at a time.
+    """
+
+    def __init__(self, order: int = 2, max_words: int = 24):
+        self.order = order
+        self.max_words = max_words
+        self._transitions: Dict[State, _Transitions] = {}
+        self._seen: Set[str] = set()
+        self.messages = 0
+
+    def __len__(self) -> int:
+        return self.messages
+
+    def train(self, text: str):
+        """Learns from one chat message. Repeated messages are only learned once."""
+        words = text.split()
+        if not words or text in self._seen:
+            return
+        if len(self._seen) >= _SEEN_LIMIT:
+            self._seen.clear()
+        self._seen.add(text)
+        state: State = (_START,) * self.order
+        for word in words + [_END]:
+            transitions = self._transitions.get(state)
+            if transitions is None:
+                transitions = self._transitions[state] = _Transitions()
+            transitions.add(word)
+            state = state[1:] + (word,)
+        self.messages += 1
+
+    def generate(self, rng: Optional[random.Random] = None) -> Optional[str]:
+        """Samples one message, or returns None if nothing has been learned yet."""
+        rng = rng or _rng
+        state: State = (_START,) * self.order
+        words: List[str] = []
+        while len(words) < self.max_words:
+            transitions = self._transitions.get(state)
+            if transitions is None:
+                break
+            word = transitions.sample(rng)
+            if word == _END:
+                break
+            words.append(word)
+            state = state[1:] + (word,)
+        return " ".join(words) or None
+
+    def sample(self, count: int, rng: Optional[random.Random] = None) -> List[str]:
+        """Samples up to `count` distinct messages."""
+        results: List[str] = []
+        seen: Set[str] = set()
+        for _ in range(count * 3):
+            if len(results) >= count:
+                break
+            text = self.generate(rng)
+            if text and text not in seen:
+                seen.add(text)
+                results.append(text)
+        return results
@@ -15,12 +15,43 @@ from ...core.agent_interface import BaseAgent
 from ...core.config import config_manager
 from ...core.llm_manager import llm_manager
 from ...core.path_manager import path_manager
+from ..memory.history import get_history_log
 from ..memory.manager import MemoryManager
+from ..memory.rendering import JSON_STYLE
+from ..prompt_templates import prompt_templates
 from ..tools.manager import ToolManager
+from .ambient_model import NGramChatModel
 from .nickname_gen.generator import NicknameGenerator
 
 logger = logging.getLogger(__name__)
 
+# Placeholders available to each prompt template
+_CHATBOT_PROMPT_FIELDS = (
+    "tool_descriptions",
+    "init_memory",
+    "core_memory",
+    "temp_memory",
+    "recent_history",
+    "neuro_speech",
+    "chats_per_batch",
+)
+_MEMORY_PROMPT_FIELDS = ("tool_descriptions", "conversation_history")
+_AMBIENT_PROMPT_FIELDS = ("tool_descriptions", "num_messages")
+_COMBINED_PROMPT_FIELDS = (
+    "tool_descriptions",
+    "init_memory",
+    "core_memory",
+    "temp_memory",
+    "recent_history",
+    "neuro_speech",
+    "num_contextual",
+    "num_ambient",
+)
+# Labels of the two kinds of messages in a combined response
+_CHAT_KINDS = ("contextual", "ambient")
+# How many history entries the local ambient model is trained on at startup
+_AMBIENT_MODEL_HISTORY_LIMIT = 5000
+
 
 class Chatbot(BaseAgent):
     """
@@ -62,8 +93,10 @@ class Chatbot(BaseAgent):
             }
         )
         self.nickname_generator = NicknameGenerator(llm_client=self.chatbot_llm)
+        self.ambient_model = NGramChatModel()
 
         self._initialized = False
+        self.runtime_initialized = False
         self.turn_counter = 0
         self.reflection_threshold = settings.chatbot.reflection_threshold
 
@@ -77,6 +110,7 @@ class Chatbot(BaseAgent):
             logger.info("Initializing Chatbot agent (startup-safe components)...")
             await self.memory_manager.initialize()
             self.tool_manager.load_tools()
+            self._train_ambient_model_from_history()
             self._initialized = True
             logger.info("Chatbot agent startup components initialized successfully.")
 
@@ -84,14 +118,15 @@ class Chatbot(BaseAgent):
         """Initializes components that require a live configuration, like the LLM."""
         logger.info("Initializing Chatbot agent (runtime components)...")
         await self.nickname_generator.initialize()
+        self.runtime_initialized = True
         logger.info("Chatbot agent runtime components initialized successfully.")
 
     async def reset_memory(self):
         """Reset all agent memory types and clear history logs."""
         assert path_manager is not None
         await self.memory_manager.reset_temp_memory()
-        # Clear history files by overwriting them
-        open(path_manager.chatbot_history_path, "w").close()
+        # Clear history files by truncating them
+        get_history_log(path_manager.chatbot_history_path).reset()
         logger.info("All chatbot memory and history logs have been reset.")
 
     async def get_message_history(self, limit: int = 20) -> List[Dict[str, Any]]:
@@ -107,21 +142,55 @@ class Chatbot(BaseAgent):
         logger.warning("process_and_respond is not the primary entry point for Chatbot.")
         return {"status": "not_implemented"}
 
+    async def record_recent_history(self, recent_history: List[Dict[str, Any]]):
+        """
+        Logs the recent chat the chatbot is shown, and lets the local ambient
+        model learn what real viewers wrote. Generated messages were already
+        learned when they were generated.
+        """
+        assert path_manager is not None
+        for entry in recent_history:
+            if entry.get("role") == "user":
+                self._train_ambient_model(entry)
+            await self._append_to_history(path_manager.chatbot_history_path, entry)
+
+    def _train_ambient_model_from_history(self):
+        """Trains the local ambient model on the chat messages in the history log."""
+        assert path_manager is not None
+        try:
+            entries = get_history_log(path_manager.chatbot_history_path).read_tail(
+                _AMBIENT_MODEL_HISTORY_LIMIT
+            )
+        except OSError as e:
+            logger.warning(f"Could not read chatbot history to train the ambient model: {e}")
+            return
+        # Local messages also come back as recent chat history; skip those copies too
+        local_contents = {entry.get("content") for entry in entries if entry.get("source") == "local"}
+        for entry in entries:
+            if entry.get("content") not in local_contents:
+                self._train_ambient_model(entry)
+        logger.debug(f"Local ambient model learned {len(self.ambient_model)} chat messages.")
+
+    def _train_ambient_model(self, entry: Dict[str, Any]):
+        """Learns from a history entry, unless the local model wrote it itself."""
+        if entry.get("source") == "local" or entry.get("role") not in ("user", "assistant"):
+            return
+        content = str(entry.get("content", ""))
+        # Entries are stored as "username: text"
+        _, separator, text = content.partition(": ")
+        if separator:
+            self.ambient_model.train(text)
+
     async def _append_to_history(self, file_path: Path, data: Dict[str, Any]):
         """Appends a new entry to a JSON Lines history file."""
         data["timestamp"] = datetime.now().isoformat()
-        with open(file_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(data, ensure_ascii=False) + "\n")
+        get_history_log(file_path).append(data)
 
     async def _read_history(self, file_path: Path, limit: int) -> List[Dict[str, Any]]:
         """Reads the last N lines from a JSON Lines history file."""
-        if not file_path.exists():
-            return []
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            return [json.loads(line) for line in lines[-limit:]]
-        except (json.JSONDecodeError, IndexError):
+            return get_history_log(file_path).read_tail(limit)
+        except OSError:
             return []
 
     def _format_tool_schemas_for_prompt(self, agent_name: str) -> str:
@@ -150,25 +219,50 @@ class Chatbot(BaseAgent):
     ) -> str:
         """Builds the prompt for the Chatbot (Actor) LLM."""
         assert path_manager is not None
-        with open(path_manager.chatbot_prompt_path, "r", encoding="utf-8") as f:
-            prompt_template = f.read()
+        prompt_template = prompt_templates.get(
+            path_manager.chatbot_prompt_path, _CHATBOT_PROMPT_FIELDS
+        )
 
         tool_descriptions = self._format_tool_schemas_for_prompt("chatbot")
-        init_memory_text = json.dumps(self.memory_manager.init_memory, indent=2)
-        core_memory_text = json.dumps(self.memory_manager.core_memory, indent=2)
-        temp_memory_text = json.dumps(self.memory_manager.temp_memory, indent=2)
+        memory_sections = self.memory_manager.render(JSON_STYLE)
         recent_history_text = "\n".join(
             [f"{msg.get('role')}: {msg.get('content')}" for msg in recent_history]
         )
 
-        return prompt_template.format(
+        return prompt_template.render(
             tool_descriptions=tool_descriptions,
-            init_memory=init_memory_text,
-            core_memory=core_memory_text,
-            temp_memory=temp_memory_text,
             recent_history=recent_history_text,
             neuro_speech=neuro_speech,
             chats_per_batch=num_messages,
+            **memory_sections,
+        )
+
+    async def _build_combined_prompt(
+        self,
+        neuro_speech: str,
+        recent_history: List[Dict[str, str]],
+        num_contextual: int,
+        num_ambient: int,
+    ) -> str:
+        """Builds the prompt asking for both contextual and ambient chats at once."""
+        assert path_manager is not None
+        prompt_template = prompt_templates.get(
+            path_manager.chatbot_combined_prompt_path, _COMBINED_PROMPT_FIELDS
+        )
+
+        tool_descriptions = self._format_tool_schemas_for_prompt("chatbot")
+        memory_sections = self.memory_manager.render(JSON_STYLE)
+        recent_history_text = "\n".join(
+            [f"{msg.get('role')}: {msg.get('content')}" for msg in recent_history]
+        )
+
+        return prompt_template.render(
+            tool_descriptions=tool_descriptions,
+            recent_history=recent_history_text,
+            neuro_speech=neuro_speech,
+            num_contextual=num_contextual,
+            num_ambient=num_ambient,
+            **memory_sections,
         )
 
     async def build_neuro_prompt(self, messages: List[Dict[str, str]]) -> str:
@@ -190,11 +284,12 @@ class Chatbot(BaseAgent):
     ) -> str:
         """Builds the prompt for the Memory (Thinker) LLM."""
         assert path_manager is not None
-        with open(path_manager.chatbot_memory_agent_prompt_path, 'r', encoding='utf-8') as f:
-            prompt_template = f.read()
+        prompt_template = prompt_templates.get(
+            path_manager.chatbot_memory_agent_prompt_path, _MEMORY_PROMPT_FIELDS
+        )
         tool_descriptions = self._format_tool_schemas_for_prompt('chatbot_memory_manager')
         history_text = "\n".join([f"{msg.get('role')}: {msg.get('content')}" for msg in conversation_history])
-        return prompt_template.format(
+        return prompt_template.render(
             tool_descriptions=tool_descriptions, conversation_history=history_text
         )
 
@@ -259,20 +354,20 @@ class Chatbot(BaseAgent):
                 nickname = self.nickname_generator.generate_nickname()
                 message = {"username": nickname, "text": text_to_post}
                 generated_messages.append(message)
-                await self._append_to_history(
-                    path_manager.chatbot_history_path,
-                    {"role": "assistant", "content": f"{nickname}: {text_to_post}"},
-                )
+                entry = {"role": "assistant", "content": f"{nickname}: {text_to_post}"}
+                self._train_ambient_model(entry)
+                await self._append_to_history(path_manager.chatbot_history_path, entry)
 
     async def _build_ambient_prompt(self, num_messages: int) -> str:
         """Builds the prompt for the ambient Chatbot LLM."""
         assert path_manager is not None
-        with open(path_manager.chatbot_ambient_prompt_path, "r", encoding="utf-8") as f:
-            prompt_template = f.read()
+        prompt_template = prompt_templates.get(
+            path_manager.chatbot_ambient_prompt_path, _AMBIENT_PROMPT_FIELDS
+        )
 
         tool_descriptions = self._format_tool_schemas_for_prompt("chatbot")
 
-        return prompt_template.format(
+        return prompt_template.render(
             tool_descriptions=tool_descriptions,
             num_messages=num_messages,
         )
@@ -297,6 +392,19 @@ class Chatbot(BaseAgent):
 
         return await self._execute_tool_calls(tool_calls, "chatbot")
 
+    async def _generate_local_ambient_chats(self, num_local: int) -> List[Dict[str, str]]:
+        """Generates ambient chat messages with the local n-gram model, without an LLM call."""
+        assert path_manager is not None
+        messages = []
+        for text in self.ambient_model.sample(num_local):
+            nickname = self.nickname_generator.generate_nickname()
+            messages.append({"username": nickname, "text": text, "source": "local"})
+            await self._append_to_history(
+                path_manager.chatbot_history_path,
+                {"role": "assistant", "content": f"{nickname}: {text}", "source": "local"},
+            )
+        return messages
+
     async def _generate_ambient_chats(
         self, num_ambient: int
     ) -> List[Dict[str, str]]:
@@ -312,27 +420,92 @@ class Chatbot(BaseAgent):
 
         return await self._execute_tool_calls(tool_calls, "chatbot")
 
+    def _split_combined_calls(
+        self, tool_calls: List[Any], num_contextual: int, num_ambient: int
+    ) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Sorts the tool calls of a combined response by kind, keeping at most the
+        requested number of messages of each kind. Other tool calls are kept with
+        the contextual ones. Returns None if a chat message is not labelled.
+        """
+        limits = {"contextual": num_contextual, "ambient": num_ambient}
+        calls: Dict[str, List[Dict[str, Any]]] = {kind: [] for kind in _CHAT_KINDS}
+        messages = 0
+        for tool_call in tool_calls:
+            for call in tool_call if isinstance(tool_call, list) else [tool_call]:
+                if not isinstance(call, dict):
+                    return None
+                if call.get("name") != "post_chat_message":
+                    calls["contextual"].append(call)
+                    continue
+                kind = call.get("kind")
+                if kind not in limits:
+                    return None
+                messages += 1
+                if limits[kind] > 0:
+                    limits[kind] -= 1
+                    calls[kind].append(call)
+        return calls if messages else None
+
+    async def _generate_combined_chats(
+        self,
+        neuro_speech: str,
+        recent_history: List[Dict[str, str]],
+        num_contextual: int,
+        num_ambient: int,
+    ) -> Optional[List[Dict[str, str]]]:
+        """
+        Generates contextual and ambient chats with a single LLM call.
+        Returns None if the response could not be used.
+        """
+        try:
+            prompt = await self._build_combined_prompt(
+                neuro_speech, recent_history, num_contextual, num_ambient
+            )
+        except (OSError, ValueError) as e:
+            logger.warning(f"Combined chatbot prompt is unavailable: {e}")
+            return None
+        try:
+            response_text = await self.chatbot_llm.generate(prompt)
+        except Exception as e:
+            logger.warning(f"Combined chatbot generation failed: {e}. Falling back to separate calls.")
+            return None
+        if not response_text:
+            return None
+
+        calls = self._split_combined_calls(
+            self._parse_tool_calls(response_text), num_contextual, num_ambient
+        )
+        if calls is None:
+            logger.warning("Could not use the combined chatbot response. Falling back to separate calls.")
+            return None
+
+        contextual = await self._execute_tool_calls(calls["contextual"], "chatbot")
+        ambient = await self._execute_tool_calls(calls["ambient"], "chatbot")
+        return contextual + ambient
+
     async def generate_chat_messages(
         self,
         neuro_speech: Optional[str],
         recent_history: List[Dict[str, str]],
+        num_messages: Optional[int] = None,
     ) -> List[Dict[str, str]]:
         """
         The main actor loop to generate chat messages.
         It splits the generation into two parallel tasks:
         1. Contextual chats based on Neuro's speech.
         2. Ambient chats to add diversity.
+        With `combined_generation`, both kinds are first requested in one call.
+        `num_messages` overrides the configured `chats_per_batch`.
         """
         if not self.chatbot_llm:
             logger.warning("Chatbot LLM is not configured. Skipping message generation.")
             return []
 
-        assert path_manager is not None
-        for entry in recent_history:
-            await self._append_to_history(path_manager.chatbot_history_path, entry)
+        await self.record_recent_history(recent_history)
 
         settings = config_manager.settings.chatbot
-        chats_per_batch = settings.chats_per_batch
+        chats_per_batch = num_messages or settings.chats_per_batch
         ambient_ratio = settings.ambient_chat_ratio
 
         # Determine the contextual speech to use
@@ -343,6 +516,22 @@ class Chatbot(BaseAgent):
         num_ambient = round(chats_per_batch * ambient_ratio)
         num_contextual = chats_per_batch - num_ambient
 
+        local_messages = []
+        if num_ambient > 0 and len(self.ambient_model) >= settings.local_ambient_min_messages:
+            num_local = round(num_ambient * settings.local_ambient_share)
+            if num_local > 0:
+                local_messages = await self._generate_local_ambient_chats(num_local)
+                num_ambient -= len(local_messages)
+
+        combined = None
+        if settings.combined_generation and num_contextual > 0 and num_ambient > 0:
+            combined = await self._generate_combined_chats(
+                contextual_speech, recent_history, num_contextual, num_ambient
+            )
+        if combined is not None:
+            self._count_turn()
+            return combined + local_messages
+
         tasks = []
         if num_contextual > 0:
             tasks.append(
@@ -354,20 +543,24 @@ class Chatbot(BaseAgent):
             tasks.append(self._generate_ambient_chats(num_ambient))
 
         if not tasks:
-            return []
+            return local_messages
 
         generated_messages_lists = await asyncio.gather(*tasks)
         
         all_messages = []
         for msg_list in generated_messages_lists:
             all_messages.extend(msg_list)
+        all_messages.extend(local_messages)
 
+        self._count_turn()
+        return all_messages
+
+    def _count_turn(self):
+        """Counts a generation and starts memory consolidation when due."""
         self.turn_counter += 1
         if self.reflection_threshold > 0 and self.turn_counter >= self.reflection_threshold:
             asyncio.create_task(self._reflect_and_consolidate())
 
-        return all_messages
-
     async def _reflect_and_consolidate(self):
         """The main thinker loop to consolidate memories."""
         if not self.reflection_threshold > 0:
@@ -0,0 +1,157 @@
+# neuro_simulator/agents/chatbot/reservoir.py
+"""
+A reservoir of pre-generated audience chat messages.
+Chats are generated ahead of time in large batches and released one at a time
+at a steady rate, so chat density does not depend on when the LLM answers.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from ...core.config import config_manager
+from ...utils.state import app_state
+
+logger = logging.getLogger(__name__)
+
+
+class _ReservedChat:
+    __slots__ = ("chat", "speech_id", "created")
+
+    def __init__(self, chat: Dict[str, Any], speech_id: int):
+        self.chat = chat
+        # The Neuro speech the chat was generated in response to
+        self.speech_id = speech_id
+        self.created = time.monotonic()
+
+
+class ChatReservoir:
+    """
+    Holds generated chats until they are due. A chat expires when it is older
+    than `chatbot.reservoir_max_age_sec`, or when Neuro has moved on by more
+    than one speech since the one it reacts to.
+    """
+
+    def __init__(self):
+        self._chats: Deque[_ReservedChat] = deque()
+        self._available = asyncio.Event()
+        self.added = 0
+        self.released = 0
+        self.expired = 0
+        self.trimmed = 0
+        self.empty_waits = 0
+
+    def __len__(self) -> int:
+        return len(self._chats)
+
+    def release_rate(self) -> float:
+        """Chats released per second."""
+        assert config_manager.settings is not None
+        settings = config_manager.settings.chatbot
+        if settings.target_chats_per_minute > 0:
+            return settings.target_chats_per_minute / 60.0
+        return settings.chats_per_batch / max(1, settings.generation_interval_sec)
+
+    def target_size(self) -> int:
+        """
+        How many chats to keep in stock: the capacity, but no more than can be
+        released before they expire.
+        """
+        assert config_manager.settings is not None
+        settings = config_manager.settings.chatbot
+        return min(settings.reservoir_capacity, int(self.release_rate() * settings.reservoir_max_age_sec))
+
+    def needs_refill(self) -> bool:
+        """Whether the reservoir is empty, or another batch fits below the target size."""
+        assert config_manager.settings is not None
+        self._drop_expired()
+        batch_size = config_manager.settings.chatbot.reservoir_batch_size
+        return not self._chats or len(self._chats) + batch_size <= self.target_size()
+
+    def put(self, chats: List[Dict[str, Any]], speech_id: int):
+        """
+        Adds a batch generated in response to the given speech. Refills that ran
+        at the same time can overshoot, so the oldest chats beyond the target
+        size are dropped.
+        """
+        for chat in chats:
+            self._chats.append(_ReservedChat(chat, speech_id))
+        self.added += len(chats)
+        assert config_manager.settings is not None
+        # One batch is always kept, as needs_refill() allows it into an empty reservoir
+        limit = max(self.target_size(), config_manager.settings.chatbot.reservoir_batch_size)
+        excess = len(self._chats) - limit
+        for _ in range(excess):
+            self._chats.popleft()
+        self.trimmed += max(0, excess)
+        if self._chats:
+            self._available.set()
+
+    def take(self) -> Optional[Dict[str, Any]]:
+        """Returns the oldest chat that has not expired, or None if there is none."""
+        self._drop_expired()
+        if not self._chats:
+            return None
+        self.released += 1
+        return self._chats.popleft().chat
+
+    def clear(self):
+        self._chats.clear()
+        self._available.clear()
+
+    async def release_loop(self, publish: Callable[[Dict[str, Any]], Awaitable[None]]):
+        """Publishes chats at the release rate, with some jitter, until cancelled."""
+        while True:
+            chat = self.take()
+            if chat is None:
+                self.empty_waits += 1
+                self._available.clear()
+                await self._available.wait()
+                continue
+            try:
+                await publish(chat)
+            except Exception as e:
+                logger.error(f"Error publishing a reserved chat: {e}", exc_info=True)
+            rate = self.release_rate()
+            await asyncio.sleep(random.uniform(0.5, 1.5) / rate if rate > 0 else 1.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns the fill level and counters for the admin panel."""
+        assert config_manager.settings is not None
+        settings = config_manager.settings.chatbot
+        oldest = time.monotonic() - self._chats[0].created if self._chats else 0.0
+        return {
+            "enabled": settings.reservoir_enabled,
+            "size": len(self._chats),
+            "capacity": settings.reservoir_capacity,
+            "target_size": self.target_size(),
+            "release_chats_per_minute": round(self.release_rate() * 60, 2),
+            "oldest_age_sec": round(oldest, 1),
+            "added": self.added,
+            "released": self.released,
+            "expired": self.expired,
+            "trimmed": self.trimmed,
+            "empty_waits": self.empty_waits,
+        }
+
+    # --- Internals ---
+
+    def _drop_expired(self):
+        assert config_manager.settings is not None
+        max_age = config_manager.settings.chatbot.reservoir_max_age_sec
+        now = time.monotonic()
+        kept = [
+            reserved
+            for reserved in self._chats
+            if now - reserved.created <= max_age and app_state.neuro_speech_id - reserved.speech_id <= 1
+        ]
+        if len(kept) != len(self._chats):
+            self.expired += len(self._chats) - len(kept)
+            self._chats = deque(kept)
+
+
+# Global instance, kept across Chatbot rebuilds
+chat_reservoir = ChatReservoir()
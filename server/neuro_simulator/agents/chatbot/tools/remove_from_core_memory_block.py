@@ -45,23 +45,8 @@ class RemoveFromCoreMemoryBlockTool(BaseTool):
         if not block_id or index is None:
             raise ValueError("The 'block_id' and 'index' parameters are required.")
 
-        block = await self.memory_manager.get_core_memory_block(block_id)
-        if block is None:
-            raise ValueError(f"Block '{block_id}' not found.")
-
-        content = block.get("content", [])
-        if not isinstance(content, list):
-            raise TypeError(f"Content of block '{block_id}' is not a list.")
-
-        try:
-            removed_item = content.pop(index)
-        except IndexError:
-            raise IndexError(
-                f"Index {index} is out of bounds for content in block '{block_id}'."
-            )
-
-        await self.memory_manager.update_core_memory_block(
-            block_id=block_id, content=content
+        removed_item = await self.memory_manager.remove_from_core_memory_block(
+            block_id, index
         )
 
         return {
@@ -4,8 +4,11 @@ Unified LLM client for all agents in the Neuro Simulator.
 """
 
 import asyncio
+import concurrent.futures
 import logging
-from typing import Any, AsyncGenerator, Optional
+import threading
+import weakref
+from typing import Any, AsyncGenerator, Callable, Iterator, Optional, Tuple
 
 from google import genai
 from google.genai import types
@@ -13,9 +16,95 @@ from openai import AsyncOpenAI
 
 
 from ..core.config import LLMProviderSettings
+from ..core.http_pool import PoolKey, http_pool_manager
 
 logger = logging.getLogger(__name__)
 
+# How many streamed chunks may wait for the consumer before the producer thread pauses
+_STREAM_BUFFER_SIZE = 32
+
+
+def _release_pool_later(loop: Optional[asyncio.AbstractEventLoop], key: PoolKey):
+    """
+    Releases an HTTP pool reference from an LLM client's finalizer. Garbage
+    collection may run it on any thread, so the release is handed to the loop
+    the pool was acquired on instead of touching the pool manager here.
+    """
+    if loop is not None and not loop.is_closed():
+        try:
+            loop.call_soon_threadsafe(http_pool_manager.release, key)
+            return
+        except RuntimeError:
+            pass  # The loop was closed in the meantime
+    http_pool_manager.release(key)
+
+
+class _StreamClosed(Exception):
+    """Raised inside a producer thread once its consumer has gone away."""
+
+
+async def _iterate_in_thread(
+    make_iterator: Callable[[], Iterator[Any]], thread_name: str
+) -> AsyncGenerator[Any, None]:
+    """
+    Runs a blocking iterator on its own thread and yields its items on the event loop.
+
+    Items are passed through a bounded queue, so the thread pauses while the
+    consumer is behind. When the consumer stops early (or is cancelled), the thread
+    stops at its next item and closes the iterator.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=_STREAM_BUFFER_SIZE)
+    stopped = threading.Event()
+
+    def put(entry: Tuple[str, Any]):
+        future = asyncio.run_coroutine_threadsafe(queue.put(entry), loop)
+        while True:
+            try:
+                future.result(timeout=0.1)
+                return
+            except concurrent.futures.TimeoutError:
+                if stopped.is_set():
+                    future.cancel()
+                    raise _StreamClosed()
+
+    def produce():
+        iterator = None
+        try:
+            iterator = make_iterator()
+            for item in iterator:
+                if stopped.is_set():
+                    return
+                put(("item", item))
+            put(("done", None))
+        except _StreamClosed:
+            pass
+        except BaseException as e:
+            try:
+                put(("error", e))
+            except (_StreamClosed, RuntimeError):
+                pass  # Nobody is listening anymore, or the loop is gone
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+
+    threading.Thread(target=produce, name=thread_name, daemon=True).start()
+    try:
+        while True:
+            kind, value = await queue.get()
+            if kind == "item":
+                yield value
+            elif kind == "error":
+                raise value
+            else:
+                return
+    finally:
+        stopped.set()
+
 
 class LLMClient:
     """
@@ -35,7 +124,10 @@ class LLMClient:
             raise ValueError("provider_config cannot be None.")
 
         self.provider_id = provider_config.provider_id
+        self.provider_config = provider_config
         self.client: Any = None
+        self._pool_key: Optional[PoolKey] = None
+        self._pool_release: Optional[weakref.finalize] = None
         self.model_name: str = provider_config.model_name
         self._generate_func = None
         self._generate_func_stream = None
@@ -60,7 +152,14 @@ class LLMClient:
                 raise ValueError(
                     f"API key for Gemini provider '{provider_config.display_name}' is not set."
                 )
-            self.client = genai.Client(api_key=provider_config.api_key)
+            self._pool_key, http_client = http_pool_manager.acquire_gemini(
+                provider_config.api_key
+            )
+            self._pool_release = self._finalize_pool_release(self._pool_key)
+            self.client = genai.Client(
+                api_key=provider_config.api_key,
+                http_options=types.HttpOptions(httpx_client=http_client),
+            )
             self._generate_func = self._generate_gemini
             self._generate_func_stream = self._generate_gemini_stream
 
@@ -69,8 +168,14 @@ class LLMClient:
                 raise ValueError(
                     f"API key for OpenAI provider '{provider_config.display_name}' is not set."
                 )
+            self._pool_key, http_client = http_pool_manager.acquire_openai(
+                provider_config.base_url, provider_config.api_key
+            )
+            self._pool_release = self._finalize_pool_release(self._pool_key)
             self.client = AsyncOpenAI(
-                api_key=provider_config.api_key, base_url=provider_config.base_url
+                api_key=provider_config.api_key,
+                base_url=provider_config.base_url,
+                http_client=http_client,
             )
             self._generate_func = self._generate_openai
             self._generate_func_stream = self._generate_openai_stream
@@ -83,6 +188,22 @@ class LLMClient:
             f"LLM client for '{self.provider_id}' initialized. Provider: {provider_type.upper()}, Model: {self.model_name}"
         )
 
+    def _finalize_pool_release(self, key: PoolKey) -> weakref.finalize:
+        try:
+            loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        return weakref.finalize(self, _release_pool_later, loop, key)
+
+    def close(self):
+        """
+        Releases this client's shared HTTP pool. Safe to call more than once.
+        A client that is never closed releases its pool once it is garbage collected.
+        """
+        # Detaching the finalizer makes sure the pool is released only once
+        if self._pool_release is not None and self._pool_release.detach() is not None:
+            http_pool_manager.release(self._pool_key)
+
     async def _generate_gemini(self, prompt: str, max_tokens: int) -> str:
         """Generates text using the Gemini model."""
         
@@ -180,8 +301,11 @@ class LLMClient:
             )
 
         try:
-            response_iterator = await asyncio.to_thread(run_generation)
-            for chunk in response_iterator:
+            # Both the request and every chunk read block, so they all run on a
+            # producer thread and only the chunks are handed to the event loop.
+            async for chunk in _iterate_in_thread(
+                run_generation, thread_name=f"gemini-stream-{self.provider_id}"
+            ):
                 if chunk.text:
                     yield chunk.text
         except Exception as e:
@@ -0,0 +1,165 @@
+# neuro_simulator/agents/memory/history.py
+"""
+Append-only JSON Lines history logs with cheap tail reads.
+Agents read the last few entries of their history after every turn, while the
+file itself grows for the whole stream, so reads must not depend on its size.
+"""
+
+import json
+import logging
+import os
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import IO, Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# How many parsed entries each log keeps in memory
+DEFAULT_TAIL_SIZE = 200
+_SCAN_CHUNK_SIZE = 1024 * 1024
+
+
+class HistoryLog:
+    """
+    A JSON Lines file with an in-memory tail and a line offset index.
+
+    The last `tail_size` entries are served from memory. Older entries are read
+    by seeking straight to their line using the offset index, so a tail read
+    costs O(limit) regardless of the file size. All appends go through a single
+    file handle that is kept open.
+    """
+
+    def __init__(self, file_path: Path, tail_size: int = DEFAULT_TAIL_SIZE):
+        self.file_path = file_path
+        self.tail_size = tail_size
+        self._tail: Deque[Dict[str, Any]] = deque(maxlen=tail_size)
+        # Byte offset at which each line starts
+        self._offsets = array("q")
+        self._end = 0
+        self._ends_with_newline = True
+        self._writer: Optional[IO[bytes]] = None
+        self._loaded = False
+
+    # --- Public API ---
+
+    def read_tail(self, limit: int) -> List[Dict[str, Any]]:
+        """Returns up to the last `limit` entries, oldest first."""
+        self._ensure_loaded()
+        if limit <= 0:
+            return []
+        if limit <= len(self._tail) or len(self._tail) == len(self._offsets):
+            return [dict(entry) for entry in list(self._tail)[-limit:]]
+        start = self._offsets[max(0, len(self._offsets) - limit)]
+        with open(self.file_path, "rb") as f:
+            f.seek(start)
+            data = f.read(self._end - start)
+        return self._parse_lines(data.splitlines())
+
+    def append(self, data: Dict[str, Any]):
+        """Appends one entry to the file and the in-memory tail."""
+        self._ensure_loaded()
+        line = json.dumps(data, ensure_ascii=False).encode("utf-8") + b"\n"
+        if not self._ends_with_newline:
+            line = b"\n" + line
+            self._end += 1
+        if self._writer is None:
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = open(self.file_path, "ab")
+        self._writer.write(line)
+        # Flushed right away so that seeking readers always see complete lines
+        self._writer.flush()
+
+        self._offsets.append(self._end)
+        self._end += len(line) - (0 if self._ends_with_newline else 1)
+        self._ends_with_newline = True
+        self._tail.append(dict(data))
+
+    def reset(self):
+        """Truncates the file and forgets everything cached."""
+        self.close()
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        open(self.file_path, "w").close()
+        self._tail.clear()
+        self._offsets = array("q")
+        self._end = 0
+        self._ends_with_newline = True
+        self._loaded = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    # --- Internals ---
+
+    def _ensure_loaded(self):
+        """Builds the index on first use, and rebuilds it if the file was changed behind our back."""
+        try:
+            size = os.path.getsize(self.file_path)
+        except OSError:
+            size = 0
+        if self._loaded and size == self._end:
+            return
+        if self._loaded:
+            logger.warning(f"History file {self.file_path} changed externally. Re-indexing it.")
+        self.close()
+        self._build_index()
+        self._loaded = True
+
+    def _build_index(self):
+        self._tail.clear()
+        self._offsets = array("q")
+        self._end = 0
+        self._ends_with_newline = True
+        if not self.file_path.exists():
+            return
+
+        with open(self.file_path, "rb") as f:
+            line_start = 0
+            position = 0
+            while True:
+                chunk = f.read(_SCAN_CHUNK_SIZE)
+                if not chunk:
+                    break
+                newline = chunk.find(b"\n")
+                while newline != -1:
+                    if position + newline > line_start:  # Skip empty lines
+                        self._offsets.append(line_start)
+                    line_start = position + newline + 1
+                    newline = chunk.find(b"\n", newline + 1)
+                position += len(chunk)
+            if position > line_start:
+                # The last line has no trailing newline
+                self._offsets.append(line_start)
+                self._ends_with_newline = False
+            self._end = position
+
+            if self._offsets:
+                tail_start = self._offsets[max(0, len(self._offsets) - self.tail_size)]
+                f.seek(tail_start)
+                self._tail.extend(self._parse_lines(f.read().splitlines()))
+
+    def _parse_lines(self, lines: List[bytes]) -> List[Dict[str, Any]]:
+        entries = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                logger.error(f"Skipping unreadable line in history {self.file_path}: {e}")
+        return entries
+
+
+_history_logs: Dict[Path, HistoryLog] = {}
+
+
+def get_history_log(file_path: Path) -> HistoryLog:
+    """Returns the shared HistoryLog for a file, so all readers and writers use the same cache."""
+    key = Path(file_path).resolve()
+    log = _history_logs.get(key)
+    if log is None:
+        log = HistoryLog(key)
+        _history_logs[key] = log
+    return log
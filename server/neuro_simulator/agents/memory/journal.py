@@ -0,0 +1,249 @@
+# neuro_simulator/agents/memory/journal.py
+"""
+Append-only operation journals for core and temp memory.
+Each change is stored as one small JSON line instead of rewriting the whole
+memory file, and the journal is periodically compacted into a snapshot.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Temp memory only keeps the most recent items
+TEMP_MEMORY_LIMIT = 20
+
+
+# --- Operations ---
+# Memory is only ever changed through these functions, both live and when a
+# journal is replayed, so the two can never disagree.
+
+
+def apply_core_op(core_memory: Dict[str, Any], op: Dict[str, Any]):
+    """Applies one operation to a core memory object in place."""
+    blocks = core_memory.setdefault("blocks", {})
+    kind = op["op"]
+    if kind == "create":
+        block = dict(op["block"])
+        blocks[block["id"]] = block
+    elif kind == "delete":
+        blocks.pop(op["id"], None)
+    elif kind == "replace":
+        core_memory.clear()
+        core_memory.update(op["data"])
+    else:
+        block = blocks.get(op["id"])
+        if block is None:
+            raise ValueError(f"Block '{op['id']}' not found")
+        if kind == "update":
+            block.update(op["fields"])
+        elif kind == "append":
+            block.setdefault("content", []).append(op["item"])
+        elif kind == "remove":
+            block.get("content", []).pop(op["index"])
+        else:
+            raise ValueError(f"Unknown core memory operation '{kind}'")
+
+
+def apply_temp_op(temp_memory: List[Dict[str, Any]], op: Dict[str, Any]):
+    """Applies one operation to a temp memory list in place."""
+    kind = op["op"]
+    if kind == "add":
+        temp_memory.append(op["item"])
+        del temp_memory[:-TEMP_MEMORY_LIMIT]
+    elif kind == "delete":
+        temp_memory[:] = [item for item in temp_memory if item.get("id") != op["id"]]
+    elif kind == "reset":
+        temp_memory.clear()
+    else:
+        raise ValueError(f"Unknown temp memory operation '{kind}'")
+
+
+# --- Journal ---
+
+
+def _write_file_atomic(path: Path, text: str):
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _encode(op: Dict[str, Any]) -> str:
+    return json.dumps(op, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+class MemoryJournal:
+    """
+    A JSON Lines file whose first line is a snapshot of the memory and whose
+    other lines are the operations applied since.
+
+    Appending an operation costs O(size of the change). Once `compact_after`
+    operations have been appended, a new journal holding only a fresh snapshot
+    atomically replaces the old one, so loading never replays more than that.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        apply_op: Callable[[Any, Dict[str, Any]], None],
+        compact_after: int,
+    ):
+        self.path = path
+        self._apply_op = apply_op
+        self.compact_after = compact_after
+        self.ops_since_snapshot = 0
+        self.compactions = 0
+        self._writer: Optional[IO[str]] = None
+        self._get_state: Optional[Callable[[], Any]] = None
+        # Lines appended while a compaction is writing the new journal
+        self._held_lines: Optional[List[str]] = None
+        self._compaction: Optional[asyncio.Task] = None
+        self._on_compacted: Optional[Callable[[], None]] = None
+        # Set once the journal was removed from under us, e.g. by a manager in JSON mode
+        self._detached = False
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> Any:
+        """Reads the snapshot and replays the operations after it."""
+        state: Any = None
+        self.ops_since_snapshot = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    op = json.loads(line)
+                except json.JSONDecodeError:
+                    # Most likely the last line of a write cut short by a crash
+                    logger.warning(f"Skipping unreadable line {line_number} in memory journal {self.path}.")
+                    continue
+                if op.get("op") == "snapshot":
+                    state = op["data"]
+                    self.ops_since_snapshot = 0
+                    continue
+                if state is None:
+                    raise ValueError(f"Memory journal {self.path} does not start with a snapshot.")
+                try:
+                    self._apply_op(state, op)
+                except (KeyError, IndexError, ValueError) as e:
+                    logger.warning(f"Skipping inapplicable operation on line {line_number} of {self.path}: {e}")
+                self.ops_since_snapshot += 1
+        if state is None:
+            raise ValueError(f"Memory journal {self.path} is empty.")
+        return state
+
+    def start(self, get_state: Callable[[], Any], on_compacted: Optional[Callable[[], None]] = None):
+        """
+        Prepares the journal for appending. `get_state` returns the live memory,
+        which is what compaction snapshots. A journal that does not exist yet
+        is created from the current state.
+        """
+        self._get_state = get_state
+        self._on_compacted = on_compacted
+        if not self.path.exists():
+            _write_file_atomic(self.path, _encode({"op": "snapshot", "data": get_state()}))
+            self.ops_since_snapshot = 0
+
+    def append(self, op: Dict[str, Any]):
+        """Records an operation that has already been applied to the live memory."""
+        if self._detached:
+            return
+        line = _encode(op)
+        if self._held_lines is not None:
+            self._held_lines.append(line)
+        else:
+            self._write(line)
+        self.ops_since_snapshot += 1
+        if self._detached:
+            return
+        if self.ops_since_snapshot >= self.compact_after and self._compaction is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.compact_sync()
+                return
+            self._compaction = loop.create_task(self._compact())
+
+    async def wait_idle(self):
+        """Waits for a running compaction to finish."""
+        if self._compaction is not None:
+            await asyncio.gather(self._compaction, return_exceptions=True)
+
+    def compact_sync(self):
+        """Replaces the journal with a snapshot of the live memory right away."""
+        if self._detached or not self.path.exists():
+            self._detached = True
+            return
+        self._replace_journal(self._snapshot_text())
+        self.ops_since_snapshot = 0
+        self._compacted()
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    # --- Internals ---
+
+    def _write(self, text: str):
+        if self._writer is None:
+            # Never creates the file: a journal without its snapshot could not be loaded
+            try:
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+            except FileNotFoundError:
+                logger.warning(f"Memory journal {self.path} was removed. No longer appending to it.")
+                self._detached = True
+                return
+            self._writer = os.fdopen(fd, "a", encoding="utf-8")
+        self._writer.write(text)
+        # Flushed right away so that a crash only loses what the OS has not written yet
+        self._writer.flush()
+
+    def _snapshot_text(self) -> str:
+        assert self._get_state is not None
+        return _encode({"op": "snapshot", "data": self._get_state()})
+
+    def _replace_journal(self, text: str):
+        self.close()
+        _write_file_atomic(self.path, text)
+
+    async def _compact(self):
+        # Serialized on the loop, so the snapshot is consistent with the operations held back below
+        text = self._snapshot_text()
+        self._held_lines = []
+        try:
+            self.close()
+            if not self.path.exists():
+                # Removed since it was started; writing a snapshot would bring it back
+                self._detached = True
+                self._held_lines = None
+                return
+            await asyncio.get_running_loop().run_in_executor(None, _write_file_atomic, self.path, text)
+        except Exception as e:
+            logger.error(f"Failed to compact memory journal {self.path}: {e}", exc_info=True)
+            # The old journal is still in place; keep appending to it
+            held, self._held_lines = self._held_lines, None
+            self._write("".join(held))
+            return
+        finally:
+            self._compaction = None
+        held, self._held_lines = self._held_lines, None
+        self.ops_since_snapshot = len(held)
+        if held:
+            self._write("".join(held))
+        self._compacted()
+
+    def _compacted(self):
+        self.compactions += 1
+        logger.debug(f"Compacted memory journal {self.path}.")
+        if self._on_compacted is not None:
+            self._on_compacted()
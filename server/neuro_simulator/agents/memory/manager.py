@@ -4,14 +4,21 @@ Manages an agent's shared memory state (init, core, temp).
 This is a generic manager designed to be used by any agent.
 """
 
+import copy
 import json
 import logging
 import random
 import string
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 
+from ...core.config import config_manager
+from .journal import MemoryJournal, apply_core_op, apply_temp_op
+from .persistence import memory_persistence
+from .relevance import BM25Index, block_text
+from .rendering import MemoryRenderCache, MemoryRenderStyle
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,9 +54,31 @@ class MemoryManager:
         self.init_memory: Dict[str, Any] = {}
         self.core_memory: Dict[str, Any] = {}
         self.temp_memory: List[Dict[str, Any]] = []
+        self._render_cache = MemoryRenderCache()
+        # Keyword index over core memory blocks, for relevance ranking
+        self._block_index = BM25Index()
+        # The manager that took over this one's memory, see hand_over()
+        self._successor: Optional["MemoryManager"] = None
+
+        # In journal mode, core and temp memory changes are appended to a journal
+        # next to each file instead of rewriting the file
+        server_settings = config_manager.settings.server if config_manager.settings else None
+        self._core_journal: Optional[MemoryJournal] = None
+        self._temp_journal: Optional[MemoryJournal] = None
+        if server_settings is not None and server_settings.memory_storage == "journal":
+            compact_after = server_settings.memory_journal_compact_ops
+            self._core_journal = MemoryJournal(
+                self.core_memory_file.with_suffix(".journal"), apply_core_op, compact_after
+            )
+            self._temp_journal = MemoryJournal(
+                self.temp_memory_file.with_suffix(".journal"), apply_temp_op, compact_after
+            )
 
     async def initialize(self):
         """Load all memory types from their respective files."""
+        # Another manager (e.g. the agent being replaced) may still have unwritten changes
+        await self.flush()
+
         # Load init memory
         if self.init_memory_file.exists():
             with open(self.init_memory_file, "r", encoding="utf-8") as f:
@@ -61,7 +90,10 @@ class MemoryManager:
             self.init_memory = {}
 
         # Load core memory
-        if self.core_memory_file.exists():
+        core_memory = self._load_journal(self.core_memory_file, apply_core_op)
+        if core_memory is not None:
+            self.core_memory = core_memory
+        elif self.core_memory_file.exists():
             with open(self.core_memory_file, "r", encoding="utf-8") as f:
                 self.core_memory = json.load(f)
         else:
@@ -71,7 +103,10 @@ class MemoryManager:
             self.core_memory = {"blocks": {}}
 
         # Load temp memory
-        if self.temp_memory_file.exists():
+        temp_memory = self._load_journal(self.temp_memory_file, apply_temp_op)
+        if temp_memory is not None:
+            self.temp_memory = temp_memory
+        elif self.temp_memory_file.exists():
             with open(self.temp_memory_file, "r", encoding="utf-8") as f:
                 self.temp_memory = json.load(f)
         else:
@@ -79,21 +114,187 @@ class MemoryManager:
             self.temp_memory = []
             await self._save_temp_memory()
 
+        await self._set_up_storage(self._core_journal, self.core_memory_file, lambda: self.core_memory)
+        await self._set_up_storage(self._temp_journal, self.temp_memory_file, lambda: self.temp_memory)
+
+        self._render_cache.invalidate_all()
+        self._rebuild_block_index()
         logger.info(f"MemoryManager initialized from {self.init_memory_file.parent}.")
 
+    def _load_journal(self, file_path: Path, apply_op: Callable[[Any, Dict[str, Any]], None]) -> Any:
+        """
+        Loads memory from the journal next to a memory file. Returns None if
+        there is no usable journal, in which case the JSON file is used.
+        """
+        journal_path = file_path.with_suffix(".journal")
+        if not journal_path.exists():
+            return None
+        try:
+            return MemoryJournal(journal_path, apply_op, 0).load()
+        except ValueError as e:
+            logger.warning(f"{e} Loading {file_path.name} instead.")
+            # Moved aside, as it would otherwise shadow the JSON file on every start
+            journal_path.replace(journal_path.with_suffix(".journal.broken"))
+            return None
+
+    async def _set_up_storage(
+        self, journal: Optional[MemoryJournal], file_path: Path, get_state: Callable[[], Any]
+    ):
+        """
+        Starts the journal of a memory file in journal mode. A journal created
+        here starts from the JSON file, which migrates existing memory to it.
+        In JSON mode, a journal left over from journal mode is folded back into
+        the JSON file and removed.
+        """
+        if journal is not None:
+            # The JSON file is refreshed after each compaction, as a readable copy
+            journal.start(get_state, on_compacted=lambda: memory_persistence.schedule(file_path, get_state))
+            return
+        leftover = file_path.with_suffix(".journal")
+        if leftover.exists():
+            logger.info(f"Converting memory journal {leftover} back to {file_path.name}.")
+            memory_persistence.schedule(file_path, get_state)
+            await memory_persistence.flush([file_path])
+            leftover.unlink()
+
+    async def flush(self):
+        """Writes any pending changes of this manager's files to disk."""
+        for journal in (self._core_journal, self._temp_journal):
+            if journal is not None:
+                await journal.wait_idle()
+        await memory_persistence.flush(
+            [self.init_memory_file, self.core_memory_file, self.temp_memory_file]
+        )
+
+    def hand_over(self, successor: "MemoryManager"):
+        """
+        Hands this manager's memory over to the manager replacing it, which may
+        have loaded stale files while this one was still in use. Changes made
+        here afterwards, e.g. by a turn still in flight, are forwarded to it
+        and no longer written to disk by this manager.
+        """
+        successor.init_memory = copy.deepcopy(self.init_memory)
+        successor.core_memory = copy.deepcopy(self.core_memory)
+        successor.temp_memory = copy.deepcopy(self.temp_memory)
+        successor._render_cache.invalidate_all()
+        successor._rebuild_block_index()
+        memory_persistence.schedule(successor.init_memory_file, lambda: successor.init_memory)
+        for journal, file_path, get_state in (
+            (successor._core_journal, successor.core_memory_file, lambda: successor.core_memory),
+            (successor._temp_journal, successor.temp_memory_file, lambda: successor.temp_memory),
+        ):
+            if journal is not None:
+                journal.compact_sync()
+            else:
+                memory_persistence.schedule(file_path, get_state)
+        for journal in (self._core_journal, self._temp_journal):
+            if journal is not None:
+                journal.close()
+        self._core_journal = self._temp_journal = None
+        self._successor = successor
+
+    async def _forward_op(
+        self, op: Dict[str, Any], apply: Callable[["MemoryManager", Dict[str, Any]], Awaitable[None]]
+    ):
+        assert self._successor is not None
+        try:
+            await apply(self._successor, op)
+        except (KeyError, IndexError, ValueError) as e:
+            # The successor's memory has moved on since the handover
+            logger.warning(f"Dropping memory change {op.get('op')} made after the handover: {e}")
+
+    async def _apply_core_op(self, op: Dict[str, Any]):
+        apply_core_op(self.core_memory, op)
+        block_id = op["block"]["id"] if op["op"] == "create" else op.get("id", "")
+        self._render_cache.invalidate("core", block_id)
+        if not block_id:
+            self._rebuild_block_index()
+        elif block_id in self.core_memory.get("blocks", {}):
+            self._block_index.set(block_id, block_text(self.core_memory["blocks"][block_id]))
+        else:
+            self._block_index.remove(block_id)
+        if self._successor is not None:
+            await self._forward_op(op, MemoryManager._apply_core_op)
+        elif self._core_journal is not None:
+            self._core_journal.append(op)
+        else:
+            await self._save_core_memory()
+
+    async def _apply_temp_op(self, op: Dict[str, Any]):
+        apply_temp_op(self.temp_memory, op)
+        self._render_cache.invalidate("temp")
+        if self._successor is not None:
+            await self._forward_op(op, MemoryManager._apply_temp_op)
+        elif self._temp_journal is not None:
+            self._temp_journal.append(op)
+        else:
+            await self._save_temp_memory()
+
     # --- Private Save Methods ---
+    # Saves are write-behind: the file is written shortly after the last change.
 
     async def _save_init_memory(self):
-        with open(self.init_memory_file, "w", encoding="utf-8") as f:
-            json.dump(self.init_memory, f, ensure_ascii=False, indent=2)
+        self._render_cache.invalidate("init")
+        if self._successor is not None:
+            self._successor.init_memory = copy.deepcopy(self.init_memory)
+            await self._successor._save_init_memory()
+            return
+        memory_persistence.schedule(self.init_memory_file, lambda: self.init_memory)
 
     async def _save_core_memory(self):
-        with open(self.core_memory_file, "w", encoding="utf-8") as f:
-            json.dump(self.core_memory, f, ensure_ascii=False, indent=2)
+        memory_persistence.schedule(self.core_memory_file, lambda: self.core_memory)
 
     async def _save_temp_memory(self):
-        with open(self.temp_memory_file, "w", encoding="utf-8") as f:
-            json.dump(self.temp_memory, f, ensure_ascii=False, indent=2)
+        memory_persistence.schedule(self.temp_memory_file, lambda: self.temp_memory)
+
+    # --- Rendering ---
+
+    def render(
+        self, style: MemoryRenderStyle, core_block_ids: Optional[List[str]] = None
+    ) -> Dict[str, str]:
+        """
+        Returns init, core and temp memory rendered in the given style, keyed
+        `init_memory`, `core_memory` and `temp_memory`. Sections and core memory
+        blocks are only re-rendered after they change.
+
+        Args:
+            style: How to render the memory.
+            core_block_ids: If given, only these core memory blocks are included.
+        """
+        if core_block_ids is None:
+            core_text = self._render_cache.render(style, "core", self.core_memory)
+        else:
+            selected = set(core_block_ids)
+            core_text = style.join_blocks(
+                [
+                    fragment
+                    for block_id, fragment in self.render_core_memory_blocks(style)
+                    if block_id in selected
+                ]
+            )
+        return {
+            "init_memory": self._render_cache.render(style, "init", self.init_memory),
+            "core_memory": core_text,
+            "temp_memory": self._render_cache.render(style, "temp", self.temp_memory),
+        }
+
+    def render_core_memory_blocks(self, style: MemoryRenderStyle) -> List[Tuple[str, str]]:
+        """Returns (block ID, rendered text) for every core memory block, in order."""
+        return self._render_cache.render_blocks(style, self.core_memory)
+
+    def score_core_memory_blocks(self, query: str) -> Dict[str, float]:
+        """Returns the BM25 relevance of the core memory blocks that match the query."""
+        return self._block_index.score(query)
+
+    def _rebuild_block_index(self):
+        self._block_index.clear()
+        for block_id, block in self.core_memory.get("blocks", {}).items():
+            self._block_index.set(block_id, block_text(block))
+
+    @property
+    def versions(self) -> Dict[str, int]:
+        """Change counters of init, core and temp memory."""
+        return dict(self._render_cache.versions)
 
     # --- Init Memory Management ---
 
@@ -117,32 +318,23 @@ class MemoryManager:
 
     async def reset_temp_memory(self):
         """Reset temp memory to an empty list."""
-        self.temp_memory = []
-        await self._save_temp_memory()
+        await self._apply_temp_op({"op": "reset"})
         logger.debug(f"Temp memory at {self.temp_memory_file} has been reset.")
 
     async def add_temp_memory(self, content: str, role: str = "system"):
         """Adds an item to temp memory and ensures the list doesn't exceed 20 items."""
-        self.temp_memory.append(
-            {
-                "id": generate_id(),
-                "content": content,
-                "role": role,
-                "timestamp": datetime.now().isoformat(),
-            }
-        )
-        if len(self.temp_memory) > 20:
-            self.temp_memory = self.temp_memory[-20:]
-        await self._save_temp_memory()
+        item = {
+            "id": generate_id(),
+            "content": content,
+            "role": role,
+            "timestamp": datetime.now().isoformat(),
+        }
+        await self._apply_temp_op({"op": "add", "item": item})
 
     async def delete_temp_memory_item(self, item_id: str):
         """Deletes an item from temp memory by its ID."""
-        initial_len = len(self.temp_memory)
-        self.temp_memory = [
-            item for item in self.temp_memory if item.get("id") != item_id
-        ]
-        if len(self.temp_memory) < initial_len:
-            await self._save_temp_memory()
+        if any(item.get("id") == item_id for item in self.temp_memory):
+            await self._apply_temp_op({"op": "delete", "id": item_id})
 
     # --- Core Memory Management ---
 
@@ -159,15 +351,13 @@ class MemoryManager:
     ) -> str:
         """Creates a new block in core memory and returns its ID."""
         block_id = generate_id()
-        if "blocks" not in self.core_memory:
-            self.core_memory["blocks"] = {}
-        self.core_memory["blocks"][block_id] = {
+        block = {
             "id": block_id,
             "title": title,
             "description": description,
             "content": content or [],
         }
-        await self._save_core_memory()
+        await self._apply_core_op({"op": "create", "block": block})
         return block_id
 
     async def update_core_memory_block(
@@ -178,19 +368,44 @@ class MemoryManager:
         content: Optional[List[str]] = None,
     ):
         """Updates the fields of an existing block in core memory."""
-        block = self.core_memory.get("blocks", {}).get(block_id)
-        if not block:
+        if not self.core_memory.get("blocks", {}).get(block_id):
             raise ValueError(f"Block '{block_id}' not found")
+        fields: Dict[str, Any] = {}
         if title is not None:
-            block["title"] = title
+            fields["title"] = title
         if description is not None:
-            block["description"] = description
+            fields["description"] = description
         if content is not None:
-            block["content"] = content
-        await self._save_core_memory()
+            fields["content"] = content
+        await self._apply_core_op({"op": "update", "id": block_id, "fields": fields})
+
+    async def append_to_core_memory_block(self, block_id: str, item: str):
+        """Appends one item to the content of a core memory block."""
+        block = self.core_memory.get("blocks", {}).get(block_id)
+        if not block:
+            raise ValueError(f"Block '{block_id}' not found")
+        if not isinstance(block.get("content", []), list):
+            raise TypeError(f"Content of block '{block_id}' is not a list.")
+        await self._apply_core_op({"op": "append", "id": block_id, "item": item})
+
+    async def remove_from_core_memory_block(self, block_id: str, index: int) -> Any:
+        """Removes the item at `index` from the content of a core memory block and returns it."""
+        block = self.core_memory.get("blocks", {}).get(block_id)
+        if not block:
+            raise ValueError(f"Block '{block_id}' not found")
+        content = block.get("content", [])
+        if not isinstance(content, list):
+            raise TypeError(f"Content of block '{block_id}' is not a list.")
+        try:
+            removed_item = content[index]
+        except IndexError:
+            raise IndexError(
+                f"Index {index} is out of bounds for content in block '{block_id}'."
+            )
+        await self._apply_core_op({"op": "remove", "id": block_id, "index": index})
+        return removed_item
 
     async def delete_core_memory_block(self, block_id: str):
         """Deletes a block from core memory by its ID."""
         if "blocks" in self.core_memory and block_id in self.core_memory["blocks"]:
-            del self.core_memory["blocks"][block_id]
-            await self._save_core_memory()
+            await self._apply_core_op({"op": "delete", "id": block_id})
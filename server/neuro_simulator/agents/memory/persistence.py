@@ -0,0 +1,186 @@
+# neuro_simulator/agents/memory/persistence.py
+"""
+Write-behind persistence for memory files.
+Memory is mutated in bursts (a consolidation pass may call several tools in a
+row), so changes are collected for a short delay and each file is then written
+once, off the event loop, by replacing it atomically.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from ...core.config import config_manager
+
+logger = logging.getLogger(__name__)
+
+# Used when the configuration is not loaded (e.g. from the CLI)
+_DEFAULT_WRITE_DELAY_MS = 200
+
+
+def _atomic_write(path: Path, text: str):
+    """Writes a file so that readers and crashes only ever see the old or the new content."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class _PendingWrite:
+    """The write state of one file."""
+
+    __slots__ = ("get_data", "dirty", "timer", "task")
+
+    def __init__(self, get_data: Callable[[], Any]):
+        self.get_data = get_data
+        self.dirty = False
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class _MemoryPersistence:
+    """
+    Collects memory changes and writes each changed file once per delay window.
+    Data is serialized on the event loop when the write starts, so the file always
+    holds a consistent snapshot; only the disk I/O runs on a worker thread.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Path, _PendingWrite] = {}
+        self.writes = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._total_write_ms = 0.0
+        self._max_write_ms = 0.0
+        self._last_write_ms = 0.0
+
+    def schedule(self, path: Path, get_data: Callable[[], Any]):
+        """
+        Marks a file as changed. `get_data` is called when the write starts and
+        returns the object to store, so later changes are included in the same write.
+        """
+        entry = self._pending.get(path)
+        if entry is None:
+            entry = _PendingWrite(get_data)
+            self._pending[path] = entry
+        entry.get_data = get_data
+        if entry.dirty:
+            self.coalesced += 1
+        entry.dirty = True
+        if entry.timer is not None or entry.task is not None:
+            return  # The pending write picks this change up
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (e.g. CLI tools); write synchronously
+            self._pending.pop(path, None)
+            self._write_sync(path, entry)
+            return
+        entry.timer = loop.call_later(self._write_delay(), self._start_write, path)
+
+    async def flush(self, paths: Optional[Iterable[Path]] = None):
+        """Writes the pending changes of the given files (or all files) right away."""
+        targets = set(paths) if paths is not None else None
+        while True:
+            tasks = []
+            for path, entry in list(self._pending.items()):
+                if targets is not None and path not in targets:
+                    continue
+                if entry.timer is not None:
+                    entry.timer.cancel()
+                    entry.timer = None
+                    self._start_write(path)
+                if entry.task is not None:
+                    tasks.append(entry.task)
+            if not tasks:
+                return
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def discard(self):
+        """Drops all pending changes without writing them, e.g. before memory files are replaced."""
+        for entry in self._pending.values():
+            entry.dirty = False
+            if entry.timer is not None:
+                entry.timer.cancel()
+                entry.timer = None
+        tasks = [entry.task for entry in self._pending.values() if entry.task is not None]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._pending.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns write counts and latencies for the admin panel."""
+        return {
+            "writes": self.writes,
+            "coalesced_changes": self.coalesced,
+            "errors": self.errors,
+            "pending_files": sum(1 for entry in self._pending.values() if entry.dirty),
+            "last_write_ms": round(self._last_write_ms, 2),
+            "avg_write_ms": round(self._total_write_ms / self.writes, 2) if self.writes else 0.0,
+            "max_write_ms": round(self._max_write_ms, 2),
+            "write_delay_ms": round(self._write_delay() * 1000),
+        }
+
+    # --- Internals ---
+
+    def _write_delay(self) -> float:
+        if config_manager.settings is None:
+            return _DEFAULT_WRITE_DELAY_MS / 1000
+        return config_manager.settings.server.memory_write_delay_ms / 1000
+
+    def _start_write(self, path: Path):
+        entry = self._pending.get(path)
+        if entry is None:
+            return
+        entry.timer = None
+        if entry.task is None:
+            entry.task = asyncio.get_running_loop().create_task(self._write(path, entry))
+
+    async def _write(self, path: Path, entry: _PendingWrite):
+        loop = asyncio.get_running_loop()
+        try:
+            # Changes made while a write is running are written right after it
+            while entry.dirty:
+                entry.dirty = False
+                text = json.dumps(entry.get_data(), ensure_ascii=False, indent=2)
+                start = time.perf_counter()
+                try:
+                    await loop.run_in_executor(None, _atomic_write, path, text)
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"Failed to write memory file {path}: {e}", exc_info=True)
+                else:
+                    self._record_write(start)
+        finally:
+            entry.task = None
+            if not entry.dirty and entry.timer is None and self._pending.get(path) is entry:
+                del self._pending[path]
+
+    def _write_sync(self, path: Path, entry: _PendingWrite):
+        start = time.perf_counter()
+        try:
+            _atomic_write(path, json.dumps(entry.get_data(), ensure_ascii=False, indent=2))
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Failed to write memory file {path}: {e}", exc_info=True)
+        else:
+            self._record_write(start)
+
+    def _record_write(self, start: float):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.writes += 1
+        self._total_write_ms += elapsed_ms
+        self._last_write_ms = elapsed_ms
+        self._max_write_ms = max(self._max_write_ms, elapsed_ms)
+
+
+# Global instance shared by all memory managers
+memory_persistence = _MemoryPersistence()
@@ -0,0 +1,89 @@
+# neuro_simulator/agents/memory/relevance.py
+"""
+Lexical relevance ranking for core memory blocks.
+A small BM25 index is kept up to date as blocks change, so finding the blocks
+that match the current chat costs time proportional to the matching terms only.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+_CJK_CHARS = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af"
+# Single CJK characters (which are not separated by spaces), or runs of other letters and digits
+_TERM = re.compile(rf"[{_CJK_CHARS}]|(?:(?![{_CJK_CHARS}])[^\W_])+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into lowercase index terms."""
+    return _TERM.findall(text.lower())
+
+
+def block_text(block: Dict[str, Any]) -> str:
+    """The text of a core memory block that is indexed."""
+    content = block.get("content", [])
+    items = content if isinstance(content, list) else [content]
+    return " ".join(
+        [str(block.get("title", "")), str(block.get("description", ""))] + [str(item) for item in items]
+    )
+
+
+class BM25Index:
+    """An incrementally updated Okapi BM25 index over short documents."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def set(self, doc_id: str, text: str):
+        """Adds a document, or replaces it if it is already indexed."""
+        self.remove(doc_id)
+        terms = Counter(tokenize(text))
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+        length = sum(terms.values())
+        self._doc_terms[doc_id] = list(terms)
+        self._lengths[doc_id] = length
+        self._total_length += length
+
+    def remove(self, doc_id: str):
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+
+    def clear(self):
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._lengths.clear()
+        self._total_length = 0
+
+    def score(self, query: str) -> Dict[str, float]:
+        """Returns the BM25 score of every document matching at least one query term."""
+        doc_count = len(self._lengths)
+        if not doc_count:
+            return {}
+        average_length = self._total_length / doc_count or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
@@ -0,0 +1,126 @@
+# neuro_simulator/agents/memory/rendering.py
+"""
+Rendering of memory into prompt text, cached between turns.
+Memory changes far less often than prompts are built, so each section (and
+each core memory block) is rendered once and reused until it changes.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class MemoryRenderStyle:
+    """How each memory section is turned into text."""
+
+    def __init__(
+        self,
+        name: str,
+        render_init: Callable[[Dict[str, Any]], str],
+        render_block: Callable[[str, Dict[str, Any]], str],
+        join_blocks: Callable[[List[str]], str],
+        render_temp: Callable[[List[Dict[str, Any]]], str],
+    ):
+        self.name = name
+        self.render_init = render_init
+        self.render_block = render_block
+        self.join_blocks = join_blocks
+        self.render_temp = render_temp
+
+
+def _text_block(block_id: str, block: Dict[str, Any]) -> str:
+    return (
+        f"\nBlock: {block.get('title', '')} ({block_id})\nDescription: {block.get('description', '')}\nContent:\n"
+        + "\n".join(f"  - {item}" for item in block.get("content", []))
+    )
+
+
+# Human-readable text, as used in Neuro's prompt
+TEXT_STYLE = MemoryRenderStyle(
+    name="text",
+    render_init=lambda init_memory: "\n".join(f"{key}: {value}" for key, value in init_memory.items()),
+    render_block=_text_block,
+    join_blocks=lambda fragments: "\n".join(fragments) if fragments else "Not set.",
+    render_temp=lambda temp_memory: "\n".join(
+        f"[{item.get('role', 'system')}] {item.get('content', '')}" for item in temp_memory
+    )
+    if temp_memory
+    else "Empty.",
+)
+
+# JSON without indentation, as used in the Chatbot's prompt
+JSON_STYLE = MemoryRenderStyle(
+    name="json",
+    render_init=_compact_json,
+    render_block=lambda block_id, block: f"{_compact_json(block_id)}:{_compact_json(block)}",
+    join_blocks=lambda fragments: '{"blocks":{' + ",".join(fragments) + "}}",
+    render_temp=_compact_json,
+)
+
+
+class MemoryRenderCache:
+    """
+    Rendered memory text per style, per section and per core memory block.
+    The owner calls `invalidate` whenever memory changes; everything else is reused.
+    """
+
+    def __init__(self):
+        # Bumped on every change, so callers can tell whether memory changed since they last looked
+        self.versions: Dict[str, int] = {"init": 0, "core": 0, "temp": 0}
+        self._sections: Dict[Tuple[str, str], str] = {}
+        self._blocks: Dict[Tuple[str, str], str] = {}
+        self._styles: Dict[str, MemoryRenderStyle] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, section: str, block_id: str = ""):
+        """
+        Drops the cached text of a section. For core memory, only the given
+        block's text is dropped, or all blocks if no block is given.
+        """
+        self.versions[section] += 1
+        for style_name in self._styles:
+            self._sections.pop((style_name, section), None)
+            if section == "core":
+                if block_id:
+                    self._blocks.pop((style_name, block_id), None)
+        if section == "core" and not block_id:
+            self._blocks.clear()
+
+    def invalidate_all(self):
+        for section in self.versions:
+            self.invalidate(section)
+
+    def render(self, style: MemoryRenderStyle, section: str, memory: Any) -> str:
+        """Returns the text of a memory section, rendering only what changed."""
+        self._styles.setdefault(style.name, style)
+        key = (style.name, section)
+        text = self._sections.get(key)
+        if text is not None:
+            self.hits += 1
+            return text
+        self.misses += 1
+        if section == "init":
+            text = style.render_init(memory)
+        elif section == "temp":
+            text = style.render_temp(memory)
+        else:
+            text = style.join_blocks([fragment for _, fragment in self.render_blocks(style, memory)])
+        self._sections[key] = text
+        return text
+
+    def render_blocks(self, style: MemoryRenderStyle, core_memory: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """Returns (block ID, text) for every core memory block, rendering only changed blocks."""
+        self._styles.setdefault(style.name, style)
+        fragments = []
+        for block_id, block in core_memory.get("blocks", {}).items():
+            block_key = (style.name, block_id)
+            fragment = self._blocks.get(block_key)
+            if fragment is None:
+                fragment = style.render_block(block_id, block)
+                self._blocks[block_key] = fragment
+            fragments.append((block_id, fragment))
+        return fragments
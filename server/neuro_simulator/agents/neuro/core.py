@@ -9,21 +9,30 @@ import asyncio
 import json
 import logging
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncGenerator, Dict, List, Optional
 
-from ...core.agent_interface import BaseAgent
+from ...core.agent_interface import BaseAgent, SpeechSegment, TurnRecord
 from ...core.config import config_manager
 from ...core.llm_manager import llm_manager
 from ...core.path_manager import path_manager
 from ...utils import console
-from ..streaming_parser import parse_json_stream
+from ..streaming_parser import PartialField, SentenceSegmenter, parse_json_stream
+from ..memory.history import get_history_log
 from ..memory.manager import MemoryManager
+from ..memory.rendering import TEXT_STYLE
+from ..prompt_budget import get_token_estimator, select_within_budget
+from ..prompt_templates import PromptTemplate, prompt_templates
 from ..tools.manager import ToolManager
 from .filter.filter import NeuroFilter
 
 logger = logging.getLogger(__name__)
 
+# Placeholders available to each prompt template
+_NEURO_PROMPT_FIELDS = ("tool_descriptions", "init_memory", "core_memory", "temp_memory", "user_messages")
+_MEMORY_PROMPT_FIELDS = ("tool_descriptions", "conversation_history")
+
 
 class Neuro(BaseAgent):
     """
@@ -89,6 +98,9 @@ class Neuro(BaseAgent):
         self._initialized = False
         self.turn_counter = 0
         self.reflection_threshold = settings.neuro.reflection_threshold
+        # Token counts of rendered core memory blocks, for the prompt budget
+        self._fragment_tokens: Dict[str, int] = {}
+        self._fragment_token_estimator = ""
 
         console.box_it_up(
             ["Hello everyone, Neuro-sama here."],
@@ -113,9 +125,9 @@ class Neuro(BaseAgent):
         """Reset all agent memory types and clear history logs."""
         assert path_manager is not None
         await self.memory_manager.reset_temp_memory()
-        # Clear history files by overwriting them
-        open(path_manager.neuro_history_path, "w").close()
-        open(path_manager.memory_agent_history_path, "w").close()
+        # Clear history files by truncating them
+        get_history_log(path_manager.neuro_history_path).reset()
+        get_history_log(path_manager.memory_agent_history_path).reset()
         logger.debug("All agent memory and history logs have been reset.")
 
     async def get_message_history(self, limit: int = 20) -> List[Dict[str, Any]]:
@@ -123,25 +135,15 @@ class Neuro(BaseAgent):
         assert path_manager is not None
         return await self._read_history_log(path_manager.neuro_history_path, limit)
 
-    async def _append_to_history_log(self, file_path: Path, data: Dict[str, Any]):
-        """Appends a new entry to a JSON Lines history file."""
-        data["timestamp"] = datetime.now().isoformat()
-        with open(file_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(data, ensure_ascii=False) + "\n")
-
     async def _read_history_log(
         self,
         file_path: Path,
         limit: int,
     ) -> List[Dict[str, Any]]:
         """Reads the last N lines from a JSON Lines history file."""
-        if not file_path.exists():
-            return []
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            return [json.loads(line) for line in lines[-limit:]]
-        except (json.JSONDecodeError, IndexError) as e:
+            return get_history_log(file_path).read_tail(limit)
+        except OSError as e:
             logger.error(f"Could not read or parse history from {file_path}: {e}")
             return []
 
@@ -168,11 +170,12 @@ class Neuro(BaseAgent):
     async def build_neuro_prompt(self, messages: List[Dict[str, str]]) -> str:
         """Builds the prompt for the Neuro (Actor) LLM."""
         assert path_manager is not None
-        prompt_template = ""
-        if path_manager.neuro_prompt_path.exists():
-            with open(path_manager.neuro_prompt_path, "r", encoding="utf-8") as f:
-                prompt_template = f.read()
-        else:
+        try:
+            prompt_template: Optional[PromptTemplate] = prompt_templates.get(
+                path_manager.neuro_prompt_path, _NEURO_PROMPT_FIELDS
+            )
+        except FileNotFoundError:
+            prompt_template = None
             logger.warning(
                 f"Neuro prompt template not found at {path_manager.neuro_prompt_path}"
             )
@@ -180,42 +183,75 @@ class Neuro(BaseAgent):
         tool_schemas = self.tool_manager.get_tool_schemas_for_agent("neuro_agent")
         tool_descriptions = self._format_tool_schemas_for_prompt(tool_schemas)
 
-        init_memory_text = "\n".join(
-            f"{key}: {value}" for key, value in self.memory_manager.init_memory.items()
-        )
-
-        core_memory_blocks = await self.memory_manager.get_core_memory_blocks()
-        core_memory_parts = [
-            f"\nBlock: {b.get('title', '')} ({b_id})\nDescription: {b.get('description', '')}\nContent:\n"
-            + "\n".join([f"  - {item}" for item in b.get("content", [])])
-            for b_id, b in core_memory_blocks.items()
-        ]
-        core_memory_text = (
-            "\n".join(core_memory_parts) if core_memory_parts else "Not set."
-        )
-
-        temp_memory_text = (
-            "\n".join(
-                [
-                    f"[{item.get('role', 'system')}] {item.get('content', '')}"
-                    for item in self.memory_manager.temp_memory
-                ]
-            )
-            if self.memory_manager.temp_memory
-            else "Empty."
-        )
-
         user_messages_text = "\n".join(
             [f"{msg['username']}: {msg['text']}" for msg in messages]
         )
 
-        return prompt_template.format(
+        if prompt_template is None:
+            return ""
+        memory_sections = self.memory_manager.render(TEXT_STYLE)
+        core_block_ids = self._select_core_memory_blocks(
+            fixed_parts=[
+                prompt_template.text,
+                tool_descriptions,
+                user_messages_text,
+                memory_sections["init_memory"],
+                memory_sections["temp_memory"],
+            ],
+            query=user_messages_text,
+        )
+        if core_block_ids is not None:
+            memory_sections = self.memory_manager.render(TEXT_STYLE, core_block_ids)
+        return prompt_template.render(
             tool_descriptions=tool_descriptions,
-            init_memory=init_memory_text,
-            core_memory=core_memory_text,
-            temp_memory=temp_memory_text,
             user_messages=user_messages_text,
+            **memory_sections,
+        )
+
+    def _select_core_memory_blocks(
+        self, fixed_parts: List[str], query: str
+    ) -> Optional[List[str]]:
+        """
+        Picks the core memory blocks to include so that the prompt fits the token
+        budget, most relevant to `query` first. Returns None if every block fits.
+        """
+        assert config_manager.settings is not None
+        settings = config_manager.settings.neuro
+        budget = settings.prompt_token_budget
+        if not budget:
+            return None
+
+        estimate = get_token_estimator(settings.token_estimator)
+        if self._fragment_token_estimator != settings.token_estimator:
+            self._fragment_token_estimator = settings.token_estimator
+            self._fragment_tokens.clear()
+        blocks = self.memory_manager.render_core_memory_blocks(TEXT_STYLE)
+        if len(self._fragment_tokens) > 2 * len(blocks) + 64:
+            # Drop the sizes of blocks that have since changed
+            self._fragment_tokens.clear()
+        sized_blocks = []
+        for block_id, fragment in blocks:
+            tokens = self._fragment_tokens.get(fragment)
+            if tokens is None:
+                tokens = estimate(fragment)
+                self._fragment_tokens[fragment] = tokens
+            sized_blocks.append((block_id, tokens))
+
+        fixed_tokens = sum(estimate(part) for part in fixed_parts)
+        core_tokens = sum(tokens for _, tokens in sized_blocks)
+        if fixed_tokens + core_tokens <= budget:
+            return None
+
+        selected = select_within_budget(
+            sized_blocks,
+            self.memory_manager.score_core_memory_blocks(query),
+            max(0, budget - fixed_tokens),
+        )
+        logger.debug(
+            f"Prompt budget of {budget} tokens: kept {len(selected)} of {len(sized_blocks)} core memory blocks "
+            f"(~{fixed_tokens} fixed tokens, ~{core_tokens} core memory tokens)."
         )
+        return selected
 
     async def _build_memory_prompt(
         self,
@@ -223,13 +259,12 @@ class Neuro(BaseAgent):
     ) -> str:
         """Builds the prompt for the Memory (Thinker) LLM."""
         assert path_manager is not None
-        prompt_template = ""
-        if path_manager.memory_agent_prompt_path.exists():
-            with open(
-                path_manager.memory_agent_prompt_path, "r", encoding="utf-8"
-            ) as f:
-                prompt_template = f.read()
-        else:
+        try:
+            prompt_template: Optional[PromptTemplate] = prompt_templates.get(
+                path_manager.memory_agent_prompt_path, _MEMORY_PROMPT_FIELDS
+            )
+        except FileNotFoundError:
+            prompt_template = None
             logger.warning(
                 f"Memory prompt template not found at {path_manager.memory_agent_prompt_path}"
             )
@@ -243,36 +278,151 @@ class Neuro(BaseAgent):
             ]
         )
 
-        return prompt_template.format(
+        if prompt_template is None:
+            return ""
+        return prompt_template.render(
             tool_descriptions=tool_descriptions, conversation_history=history_text
         )
 
     async def process_and_respond(
         self, messages: List[Dict[str, str]]
     ) -> Dict[str, Any]:
+        execution_results = []
+        final_responses = []
+        async for execution in self._run_actor_turn(messages):
+            execution_results.append(execution)
+            spoken_text = self._get_spoken_text(execution)
+            if spoken_text:
+                final_responses.append(spoken_text)
+
+        return {
+            "tool_executions": execution_results,
+            "final_responses": final_responses,
+        }
+
+    async def stream_responses(
+        self, messages: List[Dict[str, str]], record: Optional[TurnRecord] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Yields spoken text as soon as it is available.
+        Unless the filter has to review each speak call as a whole, a speak call's
+        text is yielded sentence by sentence while the LLM is still writing it.
+        """
+        assert config_manager.settings is not None
+        settings = config_manager.settings.neuro
+        stream_speech = settings.stream_partial_speech and not (
+            self.filter and settings.filter_enabled
+        )
+        segmenter = SentenceSegmenter()
+        streamed_text = ""  # Text of the speak call currently being streamed
+        segments_yielded = 0
+
+        async for execution in self._run_actor_turn(
+            messages, stream_speech=stream_speech, record=record
+        ):
+            if "partial_text" in execution:
+                streamed_text += execution["partial_text"]
+                for sentence in segmenter.feed(execution["partial_text"]):
+                    yield SpeechSegment(sentence, continues_utterance=segments_yielded > 0)
+                    segments_yielded += 1
+                continue
+
+            if not streamed_text:
+                spoken_text = self._get_spoken_text(execution)
+                if spoken_text:
+                    yield spoken_text
+                continue
+
+            # The rest of a speak call that has been streamed so far. Its
+            # sentences have been heard already, so they are never repeated.
+            rest = segmenter.flush()
+            if rest:
+                yield SpeechSegment(rest, continues_utterance=segments_yielded > 0)
+            spoken_text = self._speech_of_streamed_call(streamed_text, execution)
+            extra = spoken_text[len(streamed_text):].strip()
+            if extra:
+                yield SpeechSegment(extra, continues_utterance=True)
+            streamed_text = ""
+            segments_yielded = 0
+
+        # A speak call whose text was streamed but that never arrived whole
+        rest = segmenter.flush()
+        if rest:
+            yield SpeechSegment(rest, continues_utterance=segments_yielded > 0)
+
+    @staticmethod
+    def _get_spoken_text(execution: Dict[str, Any]) -> str:
+        """Returns the spoken text of a successful speak execution, or an empty string."""
+        result = execution.get("result")
+        if (
+            execution.get("name") == "speak"
+            and isinstance(result, dict)
+            and result.get("status") == "success"
+        ):
+            return result.get("spoken_text", "")
+        return ""
+
+    @classmethod
+    def _speech_of_streamed_call(cls, streamed_text: str, execution: Dict[str, Any]) -> str:
+        """
+        Returns what was said for a speak call whose text was streamed. The
+        streamed text has been spoken even if the call then failed; the tool's
+        own text only counts where it goes beyond it.
+        """
+        spoken_text = cls._get_spoken_text(execution)
+        if spoken_text.startswith(streamed_text):
+            return spoken_text
+        return streamed_text
+
+    async def _run_actor_turn(
+        self,
+        messages: List[Dict[str, str]],
+        stream_speech: bool = False,
+        record: Optional[TurnRecord] = None,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Runs one Actor turn and yields each tool execution as soon as the streaming
+        parser has produced (and the filter has approved) its tool call.
+        With `stream_speech`, the text of a speak call is also yielded piece by
+        piece as `{"name": "speak", "partial_text": ...}` before the call executes.
+        With `record`, the history entries and turn count are held in it.
+        """
         assert path_manager is not None
         await self.initialize()
         logger.debug(f"Processing {len(messages)} messages in Actor flow.")
 
         if not self.neuro_llm:
             logger.warning("Neuro's Actor LLM is not configured. Skipping response.")
-            return {"tool_executions": [], "final_responses": []}
+            return
+
+        if record is None:
+            record = TurnRecord()
+            record.commit()
 
         for msg in messages:
-            await self._append_to_history_log(
-                path_manager.neuro_history_path,
-                {"role": "user", "content": f"{msg['username']}: {msg['text']}"},
+            record.add(
+                partial(
+                    self._write_history_entry,
+                    {"role": "user", "content": f"{msg['username']}: {msg['text']}"},
+                )
             )
 
         prompt = await self.build_neuro_prompt(messages)
         response_stream = self.neuro_llm.generate_stream(prompt)
 
-        execution_results = []
         final_responses = []
-
-        # The parser will yield each JSON object/list as it's parsed from the stream.
-        async for parsed_item in parse_json_stream(response_stream):
-            # The LLM may return a list of tool calls, or single tool calls one by one.
+        streamed_text = ""  # Text of the speak call currently being streamed
+
+        # The parser yields each top-level JSON object, or each element of a
+        # top-level array, as soon as it closes in the stream.
+        partial_fields = ["speak.params.text"] if stream_speech else None
+        async for parsed_item in parse_json_stream(response_stream, partial_fields):
+            if isinstance(parsed_item, PartialField):
+                streamed_text += parsed_item.delta
+                yield {"name": "speak", "partial_text": parsed_item.delta}
+                continue
+
+            # An element may itself be a list of tool calls.
             # We handle both cases by creating a list to iterate over.
             tool_calls_to_process = (
                 parsed_item if isinstance(parsed_item, list) else [parsed_item]
@@ -316,35 +466,46 @@ class Neuro(BaseAgent):
                 try:
                     result = await self.tool_manager.execute_tool(tool_name, **params)
                     logger.debug(f"Tool '{tool_name}' executed with result: {result}")
-                    execution_results.append(
-                        {"name": tool_name, "params": params, "result": result}
-                    )
-                    if tool_name == "speak" and result.get("status") == "success":
-                        spoken_text = result.get("spoken_text", "")
-                        if spoken_text:
-                            final_responses.append(spoken_text)
+                    execution = {"name": tool_name, "params": params, "result": result}
                 except Exception as e:
                     logger.error(f"Error executing tool {tool_name}: {e}")
-                    execution_results.append(
-                        {"name": tool_name, "params": params, "error": str(e)}
-                    )
+                    execution = {"name": tool_name, "params": params, "error": str(e)}
+
+                if streamed_text:
+                    spoken_text = self._speech_of_streamed_call(streamed_text, execution).strip()
+                    streamed_text = ""
+                else:
+                    spoken_text = self._get_spoken_text(execution)
+                if spoken_text:
+                    final_responses.append(spoken_text)
+                yield execution
+
+        if streamed_text.strip():
+            final_responses.append(streamed_text.strip())
 
         if final_responses:
             full_response = " ".join(final_responses)
-            await self._append_to_history_log(
-                path_manager.neuro_history_path,
-                {"role": "assistant", "content": full_response},
+            record.add(
+                partial(
+                    self._write_history_entry,
+                    {"role": "assistant", "content": full_response},
+                )
             )
 
+        record.add(self._count_turn)
+
+    def _write_history_entry(self, data: Dict[str, Any]):
+        """Appends a new entry to Neuro's JSON Lines history file."""
+        assert path_manager is not None
+        data["timestamp"] = datetime.now().isoformat()
+        get_history_log(path_manager.neuro_history_path).append(data)
+
+    def _count_turn(self):
+        """Counts a turn and starts memory consolidation when due."""
         self.turn_counter += 1
         if self.turn_counter >= self.reflection_threshold:
             asyncio.create_task(self._reflect_and_consolidate())
 
-        return {
-            "tool_executions": execution_results,
-            "final_responses": final_responses,
-        }
-
     async def _reflect_and_consolidate(self):
         """The main thinker loop to consolidate memories for the Neuro agent."""
         if not self.reflection_threshold > 0:
@@ -5,6 +5,7 @@ from typing import Any, Dict, List, Optional
 
 from ....core.llm_manager import LLMClient, llm_manager
 from ....core.path_manager import path_manager
+from ...prompt_templates import PromptTemplate, prompt_templates
 
 logger = logging.getLogger(__name__)
 
@@ -20,18 +21,16 @@ class NeuroFilter:
             self.llm: Optional[LLMClient] = llm_manager.get_client(llm_provider_id)
         else:
             self.llm = None
-        self._prompt_template = self._load_prompt_template()
 
-    def _load_prompt_template(self) -> str:
-        """Loads the prompt template from the file."""
+    def _load_prompt_template(self) -> Optional[PromptTemplate]:
+        """Gets the prompt template, picking up any edits to the file."""
         assert path_manager is not None
         prompt_path = path_manager.neuro_agent_dir / "filter_prompt.txt"
         try:
-            with open(prompt_path, "r", encoding="utf-8") as f:
-                return f.read()
+            return prompt_templates.get(prompt_path, ("original_output",))
         except FileNotFoundError:
             logger.error(f"Filter prompt template not found at {prompt_path}")
-            return ""
+            return None
 
     def _parse_tool_calls(self, response_text: str) -> List[Dict[str, Any]]:
         """Parses tool calls from the LLM's response."""
@@ -58,11 +57,12 @@ class NeuroFilter:
         Returns:
             A list of tool calls (usually a single 'speak' call).
         """
-        if not self.llm or not self._prompt_template:
+        prompt_template = self._load_prompt_template() if self.llm else None
+        if not self.llm or not prompt_template or not prompt_template.text:
             logger.warning("Filter LLM or prompt not configured. Passing through output.")
             return [{"name": "speak", "params": {"text": original_output}}]
 
-        prompt = self._prompt_template.format(
+        prompt = prompt_template.render(
             original_output=original_output,
         )
 
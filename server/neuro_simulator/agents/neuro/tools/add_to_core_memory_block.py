@@ -45,22 +45,7 @@ class AddToCoreMemoryBlockTool(BaseTool):
         if not block_id or not item:
             raise ValueError("The 'block_id' and 'item' parameters are required.")
 
-        # This functionality doesn't exist in MemoryManager, so we need to implement it here.
-        # It's a common pattern: get, modify, save.
-        block = await self.memory_manager.get_core_memory_block(block_id)
-        if block is None:
-            raise ValueError(f"Block '{block_id}' not found.")
-
-        content = block.get("content", [])
-        if not isinstance(content, list):
-            # Handle case where content might not be a list
-            raise TypeError(f"Content of block '{block_id}' is not a list.")
-
-        content.append(item)
-
-        await self.memory_manager.update_core_memory_block(
-            block_id=block_id, content=content
-        )
+        await self.memory_manager.append_to_core_memory_block(block_id, item)
 
         console.box_it_up(
             [f"Block ID: {block_id}", f"Added Item: {item}"],
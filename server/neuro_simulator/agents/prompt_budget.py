@@ -0,0 +1,80 @@
+# neuro_simulator/agents/prompt_budget.py
+"""
+Token estimation and budgeting for prompt assembly.
+Prompt size drives LLM latency, so sections that can grow without limit (such
+as core memory) are trimmed to fit a token budget, keeping the most relevant parts.
+"""
+
+import importlib.util
+import logging
+import re
+from typing import Callable, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+TokenEstimator = Callable[[str], int]
+
+_WIDE_CHAR = re.compile("[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]")
+
+
+def estimate_tokens_heuristic(text: str) -> int:
+    """
+    A fast, dependency-free estimate: about four characters per token for
+    Latin text, and one token per CJK character.
+    """
+    wide = len(_WIDE_CHAR.findall(text))
+    return wide + (len(text) - wide + 3) // 4
+
+
+_estimators: Dict[str, TokenEstimator] = {"heuristic": estimate_tokens_heuristic}
+
+
+def register_token_estimator(name: str, estimator: TokenEstimator):
+    """Makes a token estimator available to the `neuro.token_estimator` setting."""
+    _estimators[name] = estimator
+
+
+def get_token_estimator(name: str) -> TokenEstimator:
+    """Returns the named estimator, falling back to the heuristic one."""
+    if name == "tiktoken" and name not in _estimators:
+        if importlib.util.find_spec("tiktoken") is not None:
+            import tiktoken
+
+            encoding = tiktoken.get_encoding("cl100k_base")
+            register_token_estimator("tiktoken", lambda text: len(encoding.encode(text, disallowed_special=())))
+        else:
+            logger.warning("Token estimator 'tiktoken' is selected but tiktoken is not installed. Using the heuristic estimator.")
+            register_token_estimator("tiktoken", estimate_tokens_heuristic)
+    estimator = _estimators.get(name)
+    if estimator is None:
+        logger.warning(f"Unknown token estimator '{name}'. Using the heuristic estimator.")
+        return estimate_tokens_heuristic
+    return estimator
+
+
+def select_within_budget(
+    items: Sequence[Tuple[str, int]],
+    scores: Dict[str, float],
+    budget: int,
+) -> List[str]:
+    """
+    Picks items to fit a token budget, most relevant first.
+
+    Args:
+        items: (item ID, token count) pairs in their natural order.
+        scores: Relevance of the items; missing items count as 0. Ties keep
+            the natural order.
+        budget: The number of tokens available.
+
+    Returns:
+        The IDs of the chosen items, in their natural order.
+    """
+    order = {item_id: position for position, (item_id, _) in enumerate(items)}
+    ranked = sorted(items, key=lambda item: (-scores.get(item[0], 0.0), order[item[0]]))
+    chosen = set()
+    remaining = budget
+    for item_id, tokens in ranked:
+        if tokens <= remaining:
+            chosen.add(item_id)
+            remaining -= tokens
+    return [item_id for item_id, _ in items if item_id in chosen]
@@ -0,0 +1,157 @@
+# neuro_simulator/agents/prompt_templates.py
+"""
+A shared cache of prompt templates.
+Templates are read and checked once, and reloaded only when their file changes,
+so edits made from the dashboard still take effect on the next prompt.
+"""
+
+import logging
+import os
+import string
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def _field_root(field_name: str) -> str:
+    return field_name.split(".")[0].split("[")[0]
+
+
+def _compile(text: str, expected: Set[str]) -> Tuple[str, Set[str]]:
+    """
+    Parses a template and returns it as a format string in which only the
+    expected placeholders remain fields, along with every field name it uses.
+    Any other placeholder, e.g. a JSON example with single braces, is escaped
+    exactly as written, including its conversion and format spec.
+
+    Raises:
+        ValueError: If the template is malformed.
+    """
+    parser = string.Formatter()
+    parts = []
+    fields: Set[str] = set()
+    for literal, field_name, format_spec, conversion in parser.parse(text):
+        parts.append(_escape(literal))
+        if field_name is None:
+            continue
+        fields.add(_field_root(field_name))
+        nested = {
+            _field_root(name) for _, name, _, _ in parser.parse(format_spec or "") if name is not None
+        }
+        placeholder = "{" + field_name
+        if conversion:
+            placeholder += "!" + conversion
+        if format_spec:
+            placeholder += ":" + format_spec
+        placeholder += "}"
+        known = field_name != "" and _field_root(field_name) in expected and nested <= expected
+        parts.append(placeholder if known else _escape(placeholder))
+    return "".join(parts), fields
+
+
+class PromptTemplate:
+    """A prompt template file, parsed and checked when it is loaded."""
+
+    def __init__(self, path: Path, text: str, version: Tuple[int, int], expected: Set[str]):
+        self.path = path
+        self.text = text
+        self.version = version
+        self.fields: Set[str] = set()
+        self._format_text = ""
+        self.error: Optional[str] = None
+        self.renders = 0
+        self.total_render_ms = 0.0
+        self.max_render_ms = 0.0
+
+        try:
+            self._format_text, self.fields = _compile(text, expected)
+        except ValueError as e:
+            self.error = str(e)
+            logger.error(f"Prompt template {path} is malformed and cannot be used: {e}")
+            return
+
+        unknown = self.fields - expected
+        if unknown:
+            logger.warning(
+                f"Prompt template {path.name} uses unknown placeholders {sorted(unknown)}; they will be left as is. "
+                f"Available placeholders: {sorted(expected)}"
+            )
+        unused = expected - self.fields
+        if unused:
+            logger.debug(f"Prompt template {path.name} does not use {sorted(unused)}.")
+
+    def render(self, **values: Any) -> str:
+        """Fills in the placeholders."""
+        if self.error is not None:
+            raise ValueError(f"Prompt template {self.path} is malformed: {self.error}")
+        start = time.perf_counter()
+        result = self._format_text.format_map(values)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.renders += 1
+        self.total_render_ms += elapsed_ms
+        self.max_render_ms = max(self.max_render_ms, elapsed_ms)
+        return result
+
+
+class _PromptTemplateRegistry:
+    """Loads each template file once and reloads it when its modification time or size changes."""
+
+    def __init__(self):
+        self._templates: Dict[Path, PromptTemplate] = {}
+        self.loads = 0
+
+    def get(self, path: Path, placeholders: Iterable[str]) -> PromptTemplate:
+        """
+        Returns the template stored at `path`, reloading it if the file changed.
+
+        Args:
+            path: The template file.
+            placeholders: The names the caller will provide when rendering. The
+                template is checked against them when it is (re)loaded.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        template = self._templates.get(path)
+        if template is not None and template.version == version:
+            return template
+
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        if template is not None:
+            logger.info(f"Prompt template {path.name} changed on disk. Reloading it.")
+        template = PromptTemplate(path, text, version, set(placeholders))
+        self._templates[path] = template
+        self.loads += 1
+        return template
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns load counts and render timings for the admin panel."""
+        return {
+            "loads": self.loads,
+            "templates": [
+                {
+                    "path": str(template.path),
+                    "placeholders": sorted(template.fields),
+                    "valid": template.error is None,
+                    "renders": template.renders,
+                    "avg_render_ms": round(template.total_render_ms / template.renders, 4)
+                    if template.renders
+                    else 0.0,
+                    "max_render_ms": round(template.max_render_ms, 4),
+                }
+                for template in self._templates.values()
+            ],
+        }
+
+
+# Global instance shared by all agents
+prompt_templates = _PromptTemplateRegistry()
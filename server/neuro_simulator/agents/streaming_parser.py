@@ -4,45 +4,292 @@ A utility for parsing complete JSON objects from a streaming text source.
 """
 import json
 import logging
-from typing import Any, AsyncGenerator, Dict, List, Union
+import re
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Iterable, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Characters that matter to the scanner in each state; everything in between is skipped in one jump
+_VALUE_START = re.compile(r"[\[{]")
+_OUTSIDE_STRING = re.compile(r'[\[\]{}",]')
+_INSIDE_STRING = re.compile(r'["\\]')
+# The longest escape sequence that can be split across chunks (a \uXXXX surrogate pair)
+_MAX_ESCAPE_LENGTH = 12
+_TRAILING_HIGH_SURROGATE = re.compile(r"\\u[dD][89abAB][0-9a-fA-F]{2}$")
+
+
+@dataclass
+class PartialField:
+    """A newly generated piece of a string field whose object is still open."""
+
+    field: str  # "<name>.<path>", e.g. "speak.params.text"
+    delta: str
+
+
+class _Frame:
+    """An object or array that is open inside the value being parsed."""
+
+    __slots__ = ("is_object", "key", "expect_key")
+
+    def __init__(self, is_object: bool):
+        self.is_object = is_object
+        self.key: Optional[str] = None
+        self.expect_key = is_object
+
+
+def _decode_json_string(raw: str) -> Optional[str]:
+    try:
+        return json.loads(f'"{raw}"', strict=False)
+    except json.JSONDecodeError:
+        return None
+
+
+class IncrementalJSONParser:
+    """
+    Scans streamed text for JSON values, looking at every character only once.
+
+    String, escape and bracket depth state is kept across chunks, so each chunk
+    costs time proportional to its own length. A top-level object is produced
+    once it closes. For a top-level array, each element is produced as soon as
+    it is complete instead of when the whole array closes. Text outside of JSON
+    values (such as Markdown code fences) is skipped.
+
+    `partial_fields` lists string fields that should also be reported while they
+    are still being generated, as `"<name>.<path>"` where `<name>` is the value
+    of the object's own `name` key (e.g. `"speak.params.text"`). Each new piece
+    of such a field is produced as a `PartialField` before its object closes.
+    """
+
+    def __init__(self, partial_fields: Optional[Iterable[str]] = None):
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._in_array = False
+        # Text of the value currently being captured, from previous chunks
+        self._capturing = False
+        self._parts: List[str] = []
+
+        # Key path tracking inside the current value, only needed for partial fields
+        self._partial_fields = set(partial_fields or ())
+        self._frames: List[_Frame] = []
+        self._element_name: Optional[str] = None
+        self._string_role: Optional[str] = None  # "key", "name" or "partial"
+        self._string_parts: List[str] = []
+        self._partial_field = ""
+        self._partial_pending = ""
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consumes a chunk of text and returns the values completed by it."""
+        values: List[Any] = []
+        segment_start = 0  # Where the captured text starts within this chunk
+        string_start = 0  # Where the current string's content starts within this chunk
+        tracking = bool(self._partial_fields)
+        i, length = 0, len(chunk)
+
+        while i < length:
+            if self._escape:
+                self._escape = False
+                i += 1
+                continue
+
+            if self._in_string:
+                match = _INSIDE_STRING.search(chunk, i)
+                if not match:
+                    break
+                i = match.start()
+                if chunk[i] == "\\":
+                    self._escape = True
+                else:
+                    self._in_string = False
+                    if self._string_role:
+                        self._end_string(chunk[string_start:i], values)
+                i += 1
+                continue
+
+            if self._depth == 0:
+                match = _VALUE_START.search(chunk, i)
+                if not match:
+                    break
+                i = match.start()
+                self._depth = 1
+                self._in_array = chunk[i] == "["
+                # Array elements are captured one by one, objects as a whole
+                segment_start = i + 1 if self._in_array else i
+                self._begin_capture()
+                if tracking and not self._in_array:
+                    self._frames.append(_Frame(is_object=True))
+                i += 1
+                continue
+
+            match = _OUTSIDE_STRING.search(chunk, i)
+            if not match:
+                break
+            i = match.start()
+            char = chunk[i]
+            if char == '"':
+                self._in_string = True
+                if tracking:
+                    string_start = i + 1
+                    self._begin_string()
+            elif char in "[{":
+                self._depth += 1
+                if tracking:
+                    self._frames.append(_Frame(is_object=char == "{"))
+            elif char in "]}":
+                self._depth -= 1
+                if self._frames:
+                    self._frames.pop()
+                if self._in_array and self._depth == 1:
+                    # An array or object element of the top-level array has closed
+                    self._emit(chunk[segment_start : i + 1], values)
+                elif self._depth == 0:
+                    if not self._in_array:
+                        self._emit(chunk[segment_start : i + 1], values)
+                    elif self._capturing:
+                        self._emit(chunk[segment_start:i], values, allow_empty=True)
+                    self._in_array = False
+            elif self._in_array and self._depth == 1:  # A comma between elements
+                if self._capturing:
+                    self._emit(chunk[segment_start:i], values, allow_empty=True)
+                segment_start = i + 1
+                self._begin_capture()
+            elif self._frames and self._frames[-1].is_object:  # A comma between members
+                self._frames[-1].expect_key = True
+            i += 1
+
+        if self._capturing:
+            self._parts.append(chunk[segment_start:])
+        if self._in_string and self._string_role:
+            if self._string_role == "partial":
+                self._stream_partial(chunk[string_start:], values, closed=False)
+            else:
+                self._string_parts.append(chunk[string_start:])
+        return values
+
+    def _begin_capture(self):
+        self._capturing = True
+        self._parts = []
+        self._frames = []
+        self._element_name = None
+
+    def _begin_string(self):
+        """Works out whether the string that just opened needs its content."""
+        self._string_role = None
+        self._string_parts = []
+        if not self._frames:
+            return
+        frame = self._frames[-1]
+        if frame.is_object and frame.expect_key:
+            self._string_role = "key"
+        elif len(self._frames) == 1 and frame.key == "name":
+            self._string_role = "name"
+        elif self._element_name is not None:
+            path = ".".join(f.key or "" if f.is_object else "*" for f in self._frames)
+            field = f"{self._element_name}.{path}"
+            if field in self._partial_fields:
+                self._string_role = "partial"
+                self._partial_field = field
+                self._partial_pending = ""
+
+    def _end_string(self, tail: str, values: List[Any]):
+        role, self._string_role = self._string_role, None
+        if role == "partial":
+            self._stream_partial(tail, values, closed=True)
+            return
+        text = _decode_json_string("".join(self._string_parts) + tail)
+        self._string_parts = []
+        if role == "key" and self._frames:
+            self._frames[-1].key = text
+            self._frames[-1].expect_key = False
+        elif role == "name":
+            self._element_name = text
+
+    def _stream_partial(self, raw: str, values: List[Any], closed: bool):
+        pending = self._partial_pending + raw
+        cut = len(pending)
+        if not closed:
+            # Hold back a possibly incomplete escape sequence until the next chunk
+            backslash = pending.find("\\", max(0, len(pending) - _MAX_ESCAPE_LENGTH))
+            if backslash != -1:
+                cut = backslash
+            # Keep both halves of a surrogate pair together
+            high_surrogate = _TRAILING_HIGH_SURROGATE.search(pending, 0, cut)
+            if high_surrogate:
+                cut = high_surrogate.start()
+        text = _decode_json_string(pending[:cut]) if cut else ""
+        if text is None:
+            if not closed:
+                self._partial_pending = pending
+                return
+            text = pending
+        self._partial_pending = pending[cut:]
+        if text:
+            values.append(PartialField(self._partial_field, text))
+
+    def _emit(self, tail: str, values: List[Any], allow_empty: bool = False):
+        text = "".join(self._parts) + tail
+        self._capturing = False
+        self._parts = []
+        if allow_empty and not text.strip():
+            return
+        try:
+            values.append(json.loads(text))
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping malformed JSON value in stream: {e}")
+
+
+# A sentence ends at terminal punctuation (and any closing quotes or brackets)
+# followed by whitespace, or at CJK terminal punctuation
+_SENTENCE_END = re.compile(r"""(?:[.!?…]+["'”’)\]]*(?=\s)|[。！？]+["”’」』)]*)""")
+
+
+class SentenceSegmenter:
+    """Splits text that arrives in pieces into sentences as soon as each one is complete."""
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Adds text and returns the sentences it completed."""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            sentence = self._buffer[start : match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> str:
+        """Returns whatever text is left and resets the segmenter."""
+        rest, self._buffer = self._buffer.strip(), ""
+        return rest
+
 
 async def parse_json_stream(
     text_stream: AsyncGenerator[str, None],
-) -> AsyncGenerator[Union[Dict[str, Any], List[Any]], None]:
+    partial_fields: Optional[Iterable[str]] = None,
+) -> AsyncGenerator[Any, None]:
     """
-    Parses a stream of text chunks to find and yield complete JSON objects or arrays.
-    This parser uses the built-in json.JSONDecoder to robustly find JSON objects
-    in a stream.
+    Parses a stream of text chunks to find and yield complete JSON values.
+    Top-level objects are yielded as they close; the elements of a top-level
+    array are yielded one by one as each of them closes.
 
     Args:
         text_stream: An async generator yielding text chunks.
+        partial_fields: String fields to also report while they are still being
+            generated, e.g. `["speak.params.text"]`. See `IncrementalJSONParser`.
 
     Yields:
-        A parsed JSON object (dict) or array (list).
+        A parsed JSON object (dict), an element of a top-level array, or a
+        `PartialField` for one of the requested fields.
     """
-    buffer = ""
-    decoder = json.JSONDecoder()
+    parser = IncrementalJSONParser(partial_fields)
 
     async for chunk in text_stream:
-        # Add new data to the buffer and remove leading whitespace
-        buffer = (buffer + chunk).lstrip()
-
-        while buffer:
-            try:
-                # Try to decode a JSON object from the beginning of the buffer
-                obj, end_index = decoder.raw_decode(buffer)
-
-                # If successful, yield the object
-                logger.debug("Successfully parsed a JSON object from stream.")
-                yield obj
-
-                # Remove the parsed object from the buffer and any leading whitespace
-                buffer = buffer[end_index:].lstrip()
-
-            except json.JSONDecodeError:
-                # Not enough data to form a complete JSON object, break the inner loop
-                # and wait for more chunks to arrive.
-                break
\ No newline at end of file
+        for value in parser.feed(chunk):
+            logger.debug("Successfully parsed a JSON value from stream.")
+            yield value
@@ -99,6 +99,10 @@ def main():
             chatbot_source_path / "prompts" / "ambient_prompt.txt",
             path_manager.path_manager.chatbot_ambient_prompt_path,
         )
+        copy_if_not_exists(
+            chatbot_source_path / "prompts" / "combined_prompt.txt",
+            path_manager.path_manager.chatbot_combined_prompt_path,
+        )
         copy_if_not_exists(
             chatbot_source_path / "prompts" / "memory_prompt.txt",
             path_manager.path_manager.chatbot_memory_agent_prompt_path,
@@ -1,4 +1,5 @@
 # neuro_simulator/core/agent_factory.py
+import asyncio
 import logging
 from typing import Optional
 
@@ -10,17 +11,77 @@ logger = logging.getLogger(__name__)
 
 # A cache for the agent instance to avoid re-initialization
 _agent_instance: Optional[BaseAgent] = None
+# A replacement agent being built after a config update
+_rebuild_task: Optional[asyncio.Task] = None
 
+# Settings the agent reads only when it is created. Everything else is read live.
+_AGENT_SETTINGS = [
+    "neuro.neuro_llm_provider_id",
+    "neuro.neuro_memory_llm_provider_id",
+    "neuro.neuro_filter_llm_provider_id",
+    "neuro.reflection_threshold",
+    # The memory manager picks its storage mode when it is created
+    "server.memory_storage",
+    "server.memory_journal_compact_ops",
+]
 
-def _reset_agent_on_config_update(new_settings: AppSettings):
-    """Resets the cached agent instance when configuration is updated."""
+
+def _agent_needs_rebuild(settings: AppSettings) -> bool:
+    """Checks whether the last update changed anything the agent was created with."""
+    diff = config_manager.last_diff
+    if diff is None or diff.touches(*_AGENT_SETTINGS):
+        return True
+    neuro = settings.neuro
+    provider_ids = {
+        neuro.neuro_llm_provider_id,
+        neuro.neuro_memory_llm_provider_id,
+        neuro.neuro_filter_llm_provider_id or neuro.neuro_llm_provider_id,
+    }
+    # Only the providers the agent actually uses matter
+    return diff.touches(*(f"llm_providers.{pid}" for pid in provider_ids if pid))
+
+
+async def _build_agent() -> BaseAgent:
+    agent = Neuro()
+    await agent.initialize()
+    return agent
+
+
+async def _rebuild_agent():
+    """Builds an agent for the new configuration, then swaps it in for the old one."""
     global _agent_instance
-    logger.info("Configuration has been updated. Resetting cached agent instance.")
-    _agent_instance = None
+    try:
+        agent = await _build_agent()
+    except Exception as e:
+        logger.error(f"Failed to rebuild Neuro agent after config update: {e}", exc_info=True)
+        # The next create_agent() call retries and reports the error
+        _agent_instance = None
+        return
+    if isinstance(_agent_instance, Neuro):
+        # The old agent kept changing memory while the new one loaded it from disk
+        _agent_instance.memory_manager.hand_over(agent.memory_manager)
+    _agent_instance = agent
+    logger.info("Neuro agent rebuilt for the new configuration.")
+
+
+def _reset_agent_on_config_update(new_settings: AppSettings):
+    """Rebuilds the agent in the background if the update affects it."""
+    global _rebuild_task
+    if not _agent_needs_rebuild(new_settings):
+        return
+    if _rebuild_task is not None and not _rebuild_task.done():
+        _rebuild_task.cancel()
+    if _agent_instance is None:
+        return  # Nothing to keep warm; the next create_agent() builds one
+    logger.info("Configuration affecting the Neuro agent has changed. Rebuilding it in the background.")
+    # The current agent keeps serving until the new one is ready
+    _rebuild_task = asyncio.create_task(_rebuild_agent())
 
 
 # Register the callback to the config manager
-config_manager.register_update_callback(_reset_agent_on_config_update)
+config_manager.register_update_callback(
+    _reset_agent_on_config_update, sections=[*_AGENT_SETTINGS, "llm_providers"]
+)
 
 
 async def create_agent(force_recreate: bool = False) -> BaseAgent:
@@ -35,16 +96,15 @@ async def create_agent(force_recreate: bool = False) -> BaseAgent:
 
     if force_recreate:
         logger.info("Forcing recreation of agent instance.")
+        if _rebuild_task is not None and not _rebuild_task.done():
+            _rebuild_task.cancel()
         _agent_instance = None
 
     if _agent_instance is not None:
         return _agent_instance
 
     try:
-        # Directly instantiate and initialize the Neuro agent
-        agent = Neuro()
-        await agent.initialize()
-        _agent_instance = agent
+        _agent_instance = await _build_agent()
         logger.info("New Neuro agent instance created and cached.")
         return _agent_instance
     except Exception as e:
@@ -1,6 +1,56 @@
 # neuro_simulator/core/agent_interface.py
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import AsyncGenerator, Callable, List, Dict, Any, Optional
+
+
+class SpeechSegment(str):
+    """
+    A piece of spoken text yielded by `stream_responses`.
+    `continues_utterance` marks a segment that directly continues the previous
+    one (e.g. the next sentence of the same speak call), so no pause belongs
+    between the two.
+    """
+
+    continues_utterance: bool = False
+
+    def __new__(cls, text: str, continues_utterance: bool = False):
+        segment = super().__new__(cls, text)
+        segment.continues_utterance = continues_utterance
+        return segment
+
+
+class TurnRecord:
+    """
+    Collects what an agent turn records about itself (history entries, turn
+    counts), so that a turn generated ahead of time only takes effect if it is
+    actually used. Actions are held until `commit()` and run right away after
+    it; `discard()` drops them.
+    """
+
+    def __init__(self):
+        self._pending: List[Callable[[], None]] = []
+        self.committed = False
+        self.discarded = False
+
+    def add(self, action: Callable[[], None]):
+        if self.discarded:
+            return
+        if self.committed:
+            action()
+        else:
+            self._pending.append(action)
+
+    def commit(self):
+        if self.committed or self.discarded:
+            return
+        self.committed = True
+        pending, self._pending = self._pending, []
+        for action in pending:
+            action()
+
+    def discard(self):
+        self.discarded = True
+        self._pending.clear()
 
 
 class BaseAgent(ABC):
@@ -29,6 +79,20 @@ class BaseAgent(ABC):
         """Process messages and generate a response."""
         pass
 
+    async def stream_responses(
+        self, messages: List[Dict[str, str]], record: Optional[TurnRecord] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Process messages and yield each spoken response as soon as it is available.
+        Responses may be plain strings or `SpeechSegment`s. With `record`, the
+        turn's history entries are held in it until it is committed.
+        Agents without streaming support fall back to process_and_respond,
+        which records the turn right away.
+        """
+        result = await self.process_and_respond(messages)
+        for text in result.get("final_responses", []):
+            yield text
+
     # Memory Block Management
     @abstractmethod
     async def get_memory_blocks(self) -> List[Dict[str, Any]]:
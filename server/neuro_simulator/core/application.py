@@ -2,12 +2,13 @@
 """Main application file: FastAPI app instance, events, and websockets."""
 
 import asyncio
+import contextlib
 import json
 import logging
 import random
 import time
 import os
-from typing import Any, Dict
+from typing import Any, AsyncGenerator, Dict, List, Optional
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
@@ -17,8 +18,10 @@ from starlette.websockets import WebSocketState
 # --- Core Imports ---
 from .config import config_manager, AppSettings
 from ..core.agent_factory import create_agent
+from ..core.agent_interface import BaseAgent, TurnRecord
 from ..core.chatbot_factory import create_chatbot
 from ..agents.chatbot.core import Chatbot
+from ..agents.chatbot.reservoir import chat_reservoir
 
 # --- API Routers ---
 from ..api.system import router as system_router
@@ -29,9 +32,12 @@ from starlette.staticfiles import StaticFiles
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 # --- Services and Utilities ---
-from ..services.audio import synthesize_audio_segment
+from ..services.audio import SynthesisPipeline
+from ..services.chat_scheduler import audience_chat_scheduler
 from ..services.stream import live_stream_manager
-from ..utils.logging import configure_server_logging, server_log_queue, agent_log_queue
+from ..services.tts_cache import tts_audio_cache
+from ..services.tts_pool import tts_pool_manager
+from ..utils.logging import LogBus, configure_server_logging, server_log_bus, agent_log_bus
 from ..utils.process import process_manager
 from ..utils.queue import (
     add_to_audience_buffer,
@@ -46,6 +52,10 @@ from ..utils.state import app_state
 from ..utils.websocket import connection_manager
 from ..utils.banner import display_banner
 from .data_manager import reset_data_directories_to_defaults
+from .llm_manager import llm_manager
+from .http_pool import http_pool_manager
+from ..agents.memory.persistence import memory_persistence
+from ..agents.prompt_templates import prompt_templates
 
 
 # --- Logger Setup ---
@@ -164,61 +174,220 @@ async def broadcast_events_task():
             logger.error(f"Error in broadcast_events_task: {e}", exc_info=True)
 
 
-async def fetch_and_process_audience_chats():
-    """Generates a batch of audience chat messages using the new ChatbotAgent."""
+async def _publish_audience_chat(chat: Dict[str, Any], delay: float = 0.0):
+    """Shows a generated chat message to viewers and passes it on to Neuro."""
+    # The source (e.g. "local") only matters to the chatbot reading the buffer
+    message = {key: value for key, value in chat.items() if key != "source"}
+    add_to_audience_buffer({**chat, "is_user_message": False})
+    add_to_neuro_input_queue(message)
+    broadcast_message = {
+        "type": "chat_message",
+        **message,
+        "is_user_message": False,
+    }
+    await connection_manager.broadcast_chat(broadcast_message, delay=delay)
+
+
+async def _publish_user_chat(user_message: Dict[str, Any]):
+    """Shows a message sent by a real viewer to everyone and passes it on to Neuro."""
+    add_to_audience_buffer({**user_message, "is_user_message": True})
+    add_to_neuro_input_queue(user_message)
+    await connection_manager.broadcast_chat(
+        {
+            "type": "chat_message",
+            **user_message,
+            "is_user_message": True,
+        }
+    )
+
+
+async def fetch_and_process_audience_chats() -> Optional[int]:
+    """
+    Generates a batch of audience chat messages using the new ChatbotAgent.
+    Returns the number of messages generated, or None if the chat reservoir
+    did not need a refill. Errors are left to the chat scheduler, which counts
+    them as failed generations.
+    """
+    assert config_manager.settings is not None
+    settings = config_manager.settings.chatbot
+    use_reservoir = settings.reservoir_enabled
+    if use_reservoir and not chat_reservoir.needs_refill():
+        return None
+
     chatbot = await create_chatbot()
     if not chatbot:
-        logger.warning("Chatbot is not available or configured, skipping chat generation.")
-        return
+        raise RuntimeError("Chatbot is not available or configured.")
+
+    # Get context for the chatbot
+    current_neuro_speech = app_state.neuro_last_speech
+    speech_id = app_state.neuro_speech_id
+    recent_history = get_recent_audience_chats_for_chatbot(limit=10)
+
+    # Generate messages
+    generated_messages = await chatbot.generate_chat_messages(
+        neuro_speech=current_neuro_speech,
+        recent_history=recent_history,
+        num_messages=settings.reservoir_batch_size if use_reservoir else None,
+    )
+
+    if not generated_messages:
+        return 0
+
+    if use_reservoir:
+        # Released one at a time by the reservoir
+        chat_reservoir.put(generated_messages, speech_id)
+        return len(generated_messages)
+
+    # Process and broadcast generated messages
+    display_delay = 0.0
+    for chat in generated_messages:
+        await _publish_audience_chat(chat, delay=display_delay)
+        # Stagger the messages slightly to feel more natural
+        display_delay += random.uniform(0.2, 0.8)
+    return len(generated_messages)
+
+
+async def generate_audience_chat_task():
+    """Periodically triggers audience chat generation, paced by the chat scheduler."""
+    # Chats generated during a previous stream are out of date
+    chat_reservoir.clear()
+    release = asyncio.ensure_future(chat_reservoir.release_loop(_publish_audience_chat))
     try:
-        # Get context for the chatbot
-        current_neuro_speech = app_state.neuro_last_speech
-        recent_history = get_recent_audience_chats_for_chatbot(limit=10)
+        await audience_chat_scheduler.run(fetch_and_process_audience_chats)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        release.cancel()
+
+
+@contextlib.contextmanager
+def _neuro_turn_generating():
+    """Marks a Neuro turn as being generated, so background LLM work gives way to it."""
+    app_state.neuro_turns_generating += 1
+    app_state.neuro_idle_event.clear()
+    try:
+        yield
+    finally:
+        app_state.neuro_turns_generating -= 1
+        if not app_state.neuro_turns_generating:
+            app_state.neuro_idle_event.set()
 
-        # Generate messages
-        generated_messages = await chatbot.generate_chat_messages(
-            neuro_speech=current_neuro_speech, recent_history=recent_history
+
+class _AgentTurn:
+    """
+    An agent turn running in the background, whose spoken sentences are buffered
+    until they are consumed. The turn is drained independently of the consumer,
+    so time spent playing earlier sentences does not count against its timeout.
+
+    A speculative turn only records itself in the agent's history once `use()`
+    is called; `discard()` drops it and puts its chats back on Neuro's input queue.
+    """
+
+    def __init__(
+        self,
+        agent: BaseAgent,
+        messages: List[Dict[str, str]],
+        timeout: float,
+        speculative: bool = False,
+    ):
+        self.agent = agent
+        self.messages = messages
+        self.record = TurnRecord()
+        if not speculative:
+            self.record.commit()
+        self._responses: asyncio.Queue = asyncio.Queue()
+        self.producer = asyncio.ensure_future(
+            asyncio.wait_for(self._drain(agent), timeout=timeout)
         )
 
-        if not generated_messages:
+    async def _drain(self, agent: BaseAgent):
+        try:
+            with _neuro_turn_generating():
+                async for text in agent.stream_responses(self.messages, record=self.record):
+                    self._responses.put_nowait(text)
+        finally:
+            self._responses.put_nowait(None)
+
+    async def responses(self) -> AsyncGenerator[str, None]:
+        """Yields the turn's sentences as they arrive."""
+        try:
+            while True:
+                text = await self._responses.get()
+                if text is None:
+                    break
+                yield text
+            # Re-raise a timeout or agent error once all produced sentences are consumed
+            await self.producer
+        finally:
+            self.producer.cancel()
+
+    def use(self):
+        """Commits the turn, as it is about to be spoken."""
+        self.record.commit()
+
+    def cancel(self):
+        self.producer.cancel()
+
+    def discard(self):
+        """Drops a turn that will not be spoken, and returns its chats to Neuro's input queue."""
+        self.cancel()
+        if self.record.committed:
             return
-
-        # Process and broadcast generated messages
-        for chat in generated_messages:
-            add_to_audience_buffer(chat)
+        self.record.discard()
+        for chat in self.messages:
             add_to_neuro_input_queue(chat)
-            broadcast_message = {
-                "type": "chat_message",
-                **chat,
-                "is_user_message": False,
-            }
-            await connection_manager.broadcast(broadcast_message)
-            # Stagger the messages slightly to feel more natural
-            await asyncio.sleep(random.uniform(0.2, 0.8))
 
-    except Exception as e:
-        logger.error(
-            f"Error in new fetch_and_process_audience_chats: {e}", exc_info=True
-        )
 
+def _superchat_due() -> bool:
+    """Whether a superchat is waiting and the minimum spacing since the last one has passed."""
+    return bool(app_state.superchat_queue) and (
+        time.time() - app_state.last_superchat_time > 10
+    )
 
-async def generate_audience_chat_task():
-    """Periodically triggers the audience chat generation task."""
-    while True:
-        try:
-            assert config_manager.settings is not None
-            # Wait until the live phase starts
-            # await app_state.live_phase_started_event.wait()
 
-            asyncio.create_task(fetch_and_process_audience_chats())
+def _sample_input_chats() -> List[Dict[str, str]]:
+    """Takes everything in Neuro's input queue and returns a random sample of it."""
+    assert config_manager.settings is not None
+    current_queue_snapshot = get_all_neuro_input_chats()
+    sample_size = min(
+        config_manager.settings.neuro.input_chat_sample_size,
+        len(current_queue_snapshot),
+    )
+    return random.sample(current_queue_snapshot, sample_size)
 
-            # Use the interval from the new chatbot config
-            await asyncio.sleep(config_manager.settings.chatbot.generation_interval_sec)
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            logger.error(f"Error in generate_audience_chat_task: {e}", exc_info=True)
-            await asyncio.sleep(10)  # Avoid fast-looping on persistent errors
+
+def _start_speculative_turn(agent: BaseAgent) -> Optional[_AgentTurn]:
+    """
+    Starts generating the next turn from the chats received so far, while the
+    current one is still being spoken. Returns None if there is nothing to respond
+    to, or if a superchat will be handled next anyway.
+    """
+    assert config_manager.settings is not None
+    if not config_manager.settings.neuro.speculative_next_turn:
+        return None
+    if _superchat_due() or is_neuro_input_queue_empty():
+        return None
+    selected_chats = _sample_input_chats()
+    if not selected_chats:
+        return None
+    logger.debug(f"Speculatively generating the next turn from {len(selected_chats)} messages.")
+    return _AgentTurn(agent, selected_chats, timeout=20.0, speculative=True)
+
+
+async def _publish_agent_turn(agent: BaseAgent, response_texts: List[str]):
+    """Pushes the agent's updated context to admins and records its last speech."""
+    updated_context = await agent.get_message_history()
+    await connection_manager.broadcast_to_admins(
+        {
+            "type": "agent_context",
+            "action": "update",
+            "messages": updated_context,
+        }
+    )
+
+    response_text = " ".join(response_texts)
+    async with app_state.neuro_last_speech_lock:
+        app_state.neuro_last_speech = response_text
 
 
 async def neuro_response_cycle():
@@ -226,14 +395,36 @@ async def neuro_response_cycle():
     assert config_manager.settings is not None
     await app_state.live_phase_started_event.wait()
     agent = await create_agent()
+    # A turn generated while the previous one was still being spoken
+    next_turn: Optional[_AgentTurn] = None
+
+    def _speculate(producer: asyncio.Future):
+        nonlocal next_turn
+        # Starts once the current turn has been fully generated, so it is part of the next prompt
+        if producer.cancelled() or producer.exception() is not None or next_turn is not None:
+            return
+        next_turn = _start_speculative_turn(agent)
 
     while True:
         try:
             selected_chats = []
+            # Picks up an agent rebuilt after a config update
+            agent = await create_agent()
+            turn, next_turn = next_turn, None
+            if turn is not None and _superchat_due():
+                logger.info("A superchat arrived while Neuro was speaking. Discarding the prepared turn.")
+                turn.discard()
+                turn = None
+            elif turn is not None and turn.agent is not agent:
+                logger.info("The agent was rebuilt while Neuro was speaking. Discarding the prepared turn.")
+                turn.discard()
+                turn = None
+
+            if turn is not None:
+                turn.use()
+                selected_chats = turn.messages
             # Superchat logic
-            if app_state.superchat_queue and (
-                time.time() - app_state.last_superchat_time > 10
-            ):
+            elif _superchat_due():
                 sc = app_state.superchat_queue.popleft()
                 app_state.last_superchat_time = time.time()
                 await connection_manager.broadcast(
@@ -258,121 +449,122 @@ async def neuro_response_cycle():
                     await asyncio.sleep(1)
                     continue
 
-                current_queue_snapshot = get_all_neuro_input_chats()
-                if not current_queue_snapshot:
-                    continue
-                sample_size = min(
-                    config_manager.settings.neuro.input_chat_sample_size,
-                    len(current_queue_snapshot),
-                )
-                selected_chats = random.sample(current_queue_snapshot, sample_size)
+                selected_chats = _sample_input_chats()
 
             if not selected_chats:
                 continue
 
-            response_result = await asyncio.wait_for(
-                agent.process_and_respond(selected_chats), timeout=20.0
-            )
-
-            response_texts = response_result.get("final_responses", [])
-            if not response_texts:
-                continue
-
-            # Push updated agent context to admin clients immediately after processing
-            updated_context = await agent.get_message_history()
-            await connection_manager.broadcast_to_admins(
-                {
-                    "type": "agent_context",
-                    "action": "update",
-                    "messages": updated_context,
-                }
-            )
-
-            response_text = " ".join(response_texts)
-            async with app_state.neuro_last_speech_lock:
-                app_state.neuro_last_speech = response_text
-
-            sentences = response_texts
-
             tts_id = config_manager.settings.neuro.tts_provider_id
             if not tts_id:
-                logger.warning(
-                    "TTS Provider ID is not set for the agent. Skipping speech synthesis."
-                )
+                if turn is not None:
+                    response_texts = [text async for text in turn.responses()]
+                else:
+                    with _neuro_turn_generating():
+                        response_result = await asyncio.wait_for(
+                            agent.process_and_respond(selected_chats), timeout=20.0
+                        )
+                    response_texts = response_result.get("final_responses", [])
+                if response_texts:
+                    app_state.neuro_speech_id += 1
+                    await _publish_agent_turn(agent, response_texts)
+                    logger.warning(
+                        "TTS Provider ID is not set for the agent. Skipping speech synthesis."
+                    )
                 continue
 
-            num_responses = len(sentences)
-            for i, sentence in enumerate(sentences):
-                try:
-                    # Synthesize audio for each sentence individually
-                    synthesis_result = await synthesize_audio_segment(
-                        sentence, tts_provider_id=tts_id
-                    )
+            if turn is None:
+                turn = _AgentTurn(agent, selected_chats, timeout=20.0)
+            turn.producer.add_done_callback(_speculate)
+            response_texts = []
+            has_spoken = False
+            lookahead = config_manager.settings.neuro.tts_lookahead_sentences
+            # Sentences are synthesized and played as soon as the agent produces them,
+            # while the rest of its turn is still being generated.
+            async with SynthesisPipeline(
+                turn.responses(),
+                tts_provider_id=tts_id,
+                lookahead=lookahead,
+            ) as pipeline:
+                async for sentence, synthesis_result in pipeline:
+                    if turn.producer.done():
+                        # Chats that arrived since the turn finished generating
+                        _speculate(turn.producer)
+                    if not response_texts:
+                        app_state.neuro_speech_id += 1
+                    response_texts.append(sentence)
+                    async with app_state.neuro_last_speech_lock:
+                        app_state.neuro_last_speech = " ".join(response_texts)
+
+                    try:
+                        # Handle TTS timeout
+                        if synthesis_result is None:
+                            logger.warning(
+                                "TTS synthesis timed out for a sentence. Broadcasting TTS error."
+                            )
+                            await connection_manager.broadcast({"type": "neuro_error_signal"})
+                            continue  # Move to the next sentence
+
+                        # Handle other synthesis errors
+                        if isinstance(synthesis_result, Exception):
+                            raise synthesis_result
+
+                        # If a sentence has already been spoken, apply the cooldown first,
+                        # unless this one continues the same utterance
+                        if has_spoken and not getattr(sentence, "continues_utterance", False):
+                            cooldown_range = (
+                                config_manager.settings.neuro.post_speech_cooldown_sec
+                            )
+                            delay = 1.0  # Fallback default
+                            if isinstance(cooldown_range, list):
+                                if len(cooldown_range) == 1:
+                                    delay = cooldown_range[0]
+                                elif len(cooldown_range) >= 2:
+                                    min_delay = min(cooldown_range[0], cooldown_range[1])
+                                    max_delay = max(cooldown_range[0], cooldown_range[1])
+                                    delay = random.uniform(min_delay, max_delay)
+
+                            await asyncio.sleep(delay)
+
+                        audio_data, duration = synthesis_result
+                        speech_package = {
+                            "segment_id": 0,  # Each sentence is its own single-segment message
+                            "text": sentence,
+                            "duration": duration,
+                        }
 
-                    # Handle TTS timeout
-                    if (
-                        isinstance(synthesis_result, tuple)
-                        and synthesis_result[0] == "timeout"
-                    ):
-                        logger.warning(
-                            "TTS synthesis timed out for a sentence. Broadcasting TTS error."
+                        # Process this single sentence as a complete speech event
+                        live_stream_manager.set_neuro_speaking_status(True)
+                        await connection_manager.broadcast_speech_segment(
+                            {"type": "neuro_speech_segment", **speech_package, "is_end": False},
+                            audio_data,
                         )
-                        await connection_manager.broadcast({"type": "neuro_error_signal"})
-                        continue  # Move to the next sentence
-
-                    # Handle other synthesis errors
-                    if isinstance(synthesis_result, Exception):
-                        raise synthesis_result
-
-                    speech_package = {
-                        "segment_id": 0,  # Each sentence is its own single-segment message
-                        "text": sentence,
-                        "audio_base64": synthesis_result[0],
-                        "duration": synthesis_result[1],
-                    }
-
-                    # Process this single sentence as a complete speech event
-                    live_stream_manager.set_neuro_speaking_status(True)
-                    await connection_manager.broadcast(
-                        {"type": "neuro_speech_segment", **speech_package, "is_end": False}
-                    )
-                    await asyncio.sleep(speech_package["duration"])
-                    await connection_manager.broadcast(
-                        {"type": "neuro_speech_segment", "is_end": True}
-                    )
-                    live_stream_manager.set_neuro_speaking_status(False)
+                        await asyncio.sleep(duration)
+                        await connection_manager.broadcast(
+                            {"type": "neuro_speech_segment", "is_end": True}
+                        )
+                        live_stream_manager.set_neuro_speaking_status(False)
+                        has_spoken = True
 
-                    # If there are more sentences to follow, apply the cooldown
-                    if i < num_responses - 1:
-                        cooldown_range = (
-                            config_manager.settings.neuro.post_speech_cooldown_sec
+                    except Exception as e:
+                        logger.error(
+                            f"Error processing sentence '{sentence}': {e}", exc_info=True
                         )
-                        delay = 1.0  # Fallback default
-                        if isinstance(cooldown_range, list):
-                            if len(cooldown_range) == 1:
-                                delay = cooldown_range[0]
-                            elif len(cooldown_range) >= 2:
-                                min_delay = min(cooldown_range[0], cooldown_range[1])
-                                max_delay = max(cooldown_range[0], cooldown_range[1])
-                                delay = random.uniform(min_delay, max_delay)
-
-                        await asyncio.sleep(delay)
-
-                except Exception as e:
-                    logger.error(
-                        f"Error processing sentence '{sentence}': {e}", exc_info=True
-                    )
-                    # In case of an error with one sentence, signal it and try the next one
-                    await connection_manager.broadcast({"type": "neuro_error_signal"})
-                    live_stream_manager.set_neuro_speaking_status(
-                        False
-                    )  # Ensure status is reset
-                    continue
+                        # In case of an error with one sentence, signal it and try the next one
+                        await connection_manager.broadcast({"type": "neuro_error_signal"})
+                        live_stream_manager.set_neuro_speaking_status(
+                            False
+                        )  # Ensure status is reset
+                        continue
+
+            if response_texts:
+                await _publish_agent_turn(agent, response_texts)
 
         except asyncio.TimeoutError:
             logger.warning("Agent response timed out, skipping this cycle.")
             await asyncio.sleep(5)
         except asyncio.CancelledError:
+            if next_turn is not None:
+                next_turn.discard()
             live_stream_manager.set_neuro_speaking_status(False)
             break
         except Exception as e:
@@ -547,7 +739,7 @@ async def startup_event():
     async def metadata_callback(settings: AppSettings):
         await live_stream_manager.broadcast_stream_metadata()
 
-    config_manager.register_update_callback(metadata_callback)
+    config_manager.register_update_callback(metadata_callback, sections=["stream"])
 
     # 5. Initialize main agent (which will load its own configs)
     try:
@@ -561,10 +753,13 @@ async def startup_event():
 
 
 @app.on_event("shutdown")
-def shutdown_event():
+async def shutdown_event():
     """Actions to perform on application shutdown."""
     if process_manager.is_running:
         process_manager.stop_live_processes()
+    tts_pool_manager.close_all()
+    await llm_manager.close_all()
+    await memory_persistence.flush()
     logger.info("FastAPI application has shut down.")
 
 
@@ -591,8 +786,9 @@ async def websocket_stream_endpoint(websocket: WebSocket):
             config_manager.settings.server.initial_chat_backlog_limit
         )
         for chat in initial_chats:
+            message = {key: value for key, value in chat.items() if key != "source"}
             await connection_manager.send_personal_message(
-                {"type": "chat_message", **chat, "is_user_message": False}, websocket
+                {"type": "chat_message", "is_user_message": False, **message}, websocket
             )
             await asyncio.sleep(0.01)
 
@@ -605,15 +801,11 @@ async def websocket_stream_endpoint(websocket: WebSocket):
                     "text": data.get("text", "").strip(),
                 }
                 if user_message["text"]:
-                    add_to_audience_buffer(user_message)
-                    add_to_neuro_input_queue(user_message)
-                    await connection_manager.broadcast(
-                        {
-                            "type": "chat_message",
-                            **user_message,
-                            "is_user_message": True,
-                        }
-                    )
+                    await _publish_user_chat(user_message)
+            elif data.get("type") == "client_hello":
+                connection_manager.set_client_capabilities(
+                    websocket, data.get("capabilities", [])
+                )
             elif data.get("type") == "superchat":
                 sc_message = {
                     "username": data.get("username", "User"),
@@ -629,21 +821,51 @@ async def websocket_stream_endpoint(websocket: WebSocket):
         connection_manager.disconnect(websocket)
 
 
+# How long the log pusher keeps collecting a burst of log lines before sending them
+_ADMIN_LOG_BATCH_WINDOW_SEC = 0.05
+
+
+async def _push_admin_logs(websocket: WebSocket, cursors: Dict[str, int]):
+    """
+    Pushes new log lines to one admin client as batched frames.
+    Sleeps until a log bus signals new entries, so an idle connection costs nothing.
+    """
+    buses: Dict[str, LogBus] = {"server_log": server_log_bus, "agent_log": agent_log_bus}
+    wakeup = asyncio.Event()
+    for bus in buses.values():
+        bus.add_listener(wakeup)
+    try:
+        while websocket.client_state == WebSocketState.CONNECTED:
+            await wakeup.wait()
+            await asyncio.sleep(_ADMIN_LOG_BATCH_WINDOW_SEC)
+            wakeup.clear()
+            for log_type, bus in buses.items():
+                entries, cursors[log_type] = bus.read_since(cursors[log_type])
+                if entries:
+                    await websocket.send_json({"type": f"{log_type}_batch", "data": entries})
+    except (WebSocketDisconnect, ConnectionResetError, RuntimeError):
+        # The client went away; the endpoint's reader notices and cleans up
+        pass
+    finally:
+        for bus in buses.values():
+            bus.remove_listener(wakeup)
+
+
 @app.websocket("/ws/admin")
 async def websocket_admin_endpoint(websocket: WebSocket):
     await websocket.accept()
     # Add the new admin client to a dedicated list
     connection_manager.admin_connections.append(websocket)
+    log_pusher: Optional[asyncio.Task] = None
     try:
         # Wrap initial state sending in its own try-except block.
         try:
-            # Send initial state
-            for log_entry in list(server_log_queue):
-                await websocket.send_json({"type": "server_log", "data": log_entry})
-            for log_entry in list(agent_log_queue):
-                await websocket.send_json(
-                    {"type": "agent_log", "data": agent_log_queue.popleft()}
-                )
+            # Send initial state, and remember where this client is in each log
+            cursors: Dict[str, int] = {}
+            for log_type, bus in (("server_log", server_log_bus), ("agent_log", agent_log_bus)):
+                entries, cursors[log_type] = bus.read_since(0)
+                if entries:
+                    await websocket.send_json({"type": f"{log_type}_batch", "data": entries})
 
             agent = await create_agent()
             initial_context = await agent.get_message_history()
@@ -668,33 +890,19 @@ async def websocket_admin_endpoint(websocket: WebSocket):
             # The 'finally' block will ensure cleanup.
             return
 
-        # Main loop for receiving messages from the client and pushing log updates
+        # Logs are pushed by their own task; this loop only reads admin actions
+        log_pusher = asyncio.create_task(_push_admin_logs(websocket, cursors))
         while websocket.client_state == WebSocketState.CONNECTED:
             try:
-                # Check for incoming messages
-                try:
-                    raw_data = await asyncio.wait_for(
-                        websocket.receive_text(), timeout=0.01
-                    )
-                    data = json.loads(raw_data)
-                    await handle_admin_ws_message(websocket, data)
-                except asyncio.TimeoutError:
-                    pass  # No message received, continue to push logs
-
-                # Push log updates
-                if server_log_queue:
-                    await websocket.send_json(
-                        {"type": "server_log", "data": server_log_queue.popleft()}
-                    )
-                if agent_log_queue:
-                    await websocket.send_json(
-                        {"type": "agent_log", "data": agent_log_queue.popleft()}
-                    )
-                await asyncio.sleep(0.1)
+                raw_data = await websocket.receive_text()
+                data = json.loads(raw_data)
+                await handle_admin_ws_message(websocket, data)
             except (WebSocketDisconnect, ConnectionResetError):
                 # Client disconnected, break the loop to allow cleanup.
                 break
     finally:
+        if log_pusher is not None:
+            log_pusher.cancel()
         if websocket in connection_manager.admin_connections:
             connection_manager.admin_connections.remove(websocket)
         logger.info("Admin WebSocket client disconnected.")
@@ -992,6 +1200,30 @@ async def handle_admin_ws_message(websocket: WebSocket, data: dict):
                 {"type": "stream_status", "payload": status}
             )
 
+        elif action == "get_tts_cache_stats":
+            response["payload"] = tts_audio_cache.get_stats()
+
+        elif action == "get_tts_pool_stats":
+            response["payload"] = tts_pool_manager.get_stats()
+
+        elif action == "get_websocket_stats":
+            response["payload"] = connection_manager.get_stats()
+
+        elif action == "get_llm_pool_stats":
+            response["payload"] = http_pool_manager.get_stats()
+
+        elif action == "get_memory_persistence_stats":
+            response["payload"] = memory_persistence.get_stats()
+
+        elif action == "get_prompt_template_stats":
+            response["payload"] = prompt_templates.get_stats()
+
+        elif action == "get_chat_scheduler_stats":
+            response["payload"] = audience_chat_scheduler.get_stats()
+
+        elif action == "get_chat_reservoir_stats":
+            response["payload"] = chat_reservoir.get_stats()
+
         elif action == "get_stream_status":
             status = {
                 "is_running": process_manager.is_running,
@@ -1017,7 +1249,7 @@ async def handle_admin_ws_message(websocket: WebSocket, data: dict):
             )
 
         elif action == "reload_configs":
-            await config_manager.update_settings({})
+            await config_manager.update_settings({}, force=True)
             response["payload"] = {
                 "status": "success",
                 "message": "Configuration reloaded",
@@ -1044,6 +1276,8 @@ async def handle_admin_ws_message(websocket: WebSocket, data: dict):
             )
 
         elif action == "reset_data_directories":
+            # Unwritten changes belong to the old data and must not land in the new files
+            await memory_persistence.discard()
             reset_data_directories_to_defaults()
             
             # Re-initialize agents to pick up the new default data
@@ -1,4 +1,5 @@
 # neuro_simulator/core/chatbot_factory.py
+import asyncio
 import logging
 from typing import Optional
 
@@ -10,17 +11,76 @@ logger = logging.getLogger(__name__)
 
 # A cache for the chatbot instance to avoid re-initialization
 _chatbot_instance: Optional[BaseAgent] = None
+# A replacement chatbot being built after a config update
+_rebuild_task: Optional[asyncio.Task] = None
 
+# Settings the chatbot reads only when it is created. Everything else is read live.
+_CHATBOT_SETTINGS = [
+    "chatbot.chatbot_llm_provider_id",
+    "chatbot.chatbot_memory_llm_provider_id",
+    "chatbot.reflection_threshold",
+    "chatbot.enable_dynamic_pool",
+    "chatbot.dynamic_pool_size",
+    # The memory manager picks its storage mode when it is created
+    "server.memory_storage",
+    "server.memory_journal_compact_ops",
+]
 
-def _reset_chatbot_on_config_update(new_settings: AppSettings):
-    """Resets the cached chatbot instance when configuration is updated."""
+
+def _chatbot_needs_rebuild(settings: AppSettings) -> bool:
+    """Checks whether the last update changed anything the chatbot was created with."""
+    diff = config_manager.last_diff
+    if diff is None or diff.touches(*_CHATBOT_SETTINGS):
+        return True
+    chatbot = settings.chatbot
+    provider_ids = {chatbot.chatbot_llm_provider_id, chatbot.chatbot_memory_llm_provider_id}
+    # Only the providers the chatbot actually uses matter
+    return diff.touches(*(f"llm_providers.{pid}" for pid in provider_ids if pid))
+
+
+async def _build_chatbot() -> Chatbot:
+    agent = Chatbot()
+    await agent.initialize()
+    return agent
+
+
+async def _rebuild_chatbot(previous: BaseAgent):
+    """Builds a chatbot for the new configuration, then swaps it in for the old one."""
     global _chatbot_instance
-    logger.info("Configuration has been updated. Resetting cached Chatbot instance.")
-    _chatbot_instance = None
+    try:
+        agent = await _build_chatbot()
+        if isinstance(previous, Chatbot) and previous.runtime_initialized:
+            await agent.initialize_runtime_components()
+    except Exception as e:
+        logger.error(f"Failed to rebuild Chatbot after config update: {e}", exc_info=True)
+        # The next create_chatbot() call retries
+        _chatbot_instance = None
+        return
+    if isinstance(previous, Chatbot):
+        # The old chatbot kept changing memory while the new one loaded it from disk
+        previous.memory_manager.hand_over(agent.memory_manager)
+    _chatbot_instance = agent
+    logger.info("Chatbot rebuilt for the new configuration.")
+
+
+def _reset_chatbot_on_config_update(new_settings: AppSettings):
+    """Rebuilds the chatbot in the background if the update affects it."""
+    global _rebuild_task
+    if not _chatbot_needs_rebuild(new_settings):
+        return
+    if _rebuild_task is not None and not _rebuild_task.done():
+        _rebuild_task.cancel()
+    if _chatbot_instance is None:
+        return  # Nothing to keep warm; the next create_chatbot() builds one
+    logger.info("Configuration affecting the Chatbot has changed. Rebuilding it in the background.")
+    # The current chatbot keeps serving until the new one is ready
+    _rebuild_task = asyncio.create_task(_rebuild_chatbot(_chatbot_instance))
 
 
 # Register the callback to the config manager
-config_manager.register_update_callback(_reset_chatbot_on_config_update)
+config_manager.register_update_callback(
+    _reset_chatbot_on_config_update, sections=[*_CHATBOT_SETTINGS, "llm_providers"]
+)
 
 
 async def create_chatbot(force_recreate: bool = False) -> Optional[BaseAgent]:
@@ -36,6 +96,8 @@ async def create_chatbot(force_recreate: bool = False) -> Optional[BaseAgent]:
 
     if force_recreate:
         logger.info("Forcing recreation of Chatbot instance.")
+        if _rebuild_task is not None and not _rebuild_task.done():
+            _rebuild_task.cancel()
         _chatbot_instance = None
 
     if _chatbot_instance is not None:
@@ -44,10 +106,7 @@ async def create_chatbot(force_recreate: bool = False) -> Optional[BaseAgent]:
     logger.debug("Creating new Chatbot agent instance...")
 
     try:
-        # Directly instantiate and initialize the Chatbot agent
-        agent = Chatbot()
-        await agent.initialize()
-        _chatbot_instance = agent
+        _chatbot_instance = await _build_chatbot()
         logger.debug("New Chatbot agent instance created and cached.")
         return _chatbot_instance
     except Exception as e:
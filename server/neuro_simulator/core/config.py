@@ -1,6 +1,6 @@
 import yaml
 import asyncio
-from typing import Any, List, Optional, Literal
+from typing import Any, Callable, Iterable, List, Optional, Literal, Set, Tuple
 from pydantic import BaseModel, Field, field_validator
 
 # --- Provider Models ---
@@ -35,6 +35,7 @@ class TTSProviderSettings(BaseModel):
     api_key: Optional[str] = Field(default=None, title="API Key", description="API key for authentication.")
     region: Optional[str] = Field(default=None, title="Region", description="The service region for the provider (e.g., eastus).")
     tts_timeout: float = Field(10.0, title="TTS Timeout (sec)", description="Timeout in seconds for the TTS synthesis request.")
+    synthesizer_pool_size: int = Field(2, ge=1, title="Synthesizer Pool Size", description="Number of synthesizer connections kept open and reused for this provider.")
 
 
 # --- Core Application Settings Models ---
@@ -52,6 +53,11 @@ class NeuroSettings(BaseModel):
     initial_greeting: str = Field("The stream has just started. Greet your audience and say hello!", title="Initial Greeting", format="text-area", description="The message Neuro will see when the stream first starts.")  # type: ignore[call-overload]
     neuro_input_queue_max_size: int = Field(200, title="Neuro Input Queue Max Size", description="Max number of incoming events (chats, etc.) to hold in the queue.")
     reflection_threshold: int = Field(5, title="Reflection Threshold", description="Number of turns before triggering memory consolidation. Set to 0 to disable.")
+    tts_lookahead_sentences: int = Field(2, ge=0, title="TTS Look-ahead Sentences", description="How many upcoming sentences are synthesized while the current one is playing. Set to 0 to synthesize each sentence only when it is about to be played.")
+    stream_partial_speech: bool = Field(True, title="Stream Partial Speech", description="Start speaking each sentence of a speak call while the LLM is still writing the rest of it. Has no effect while the filter is enabled, since the filter reviews whole speak calls.")
+    speculative_next_turn: bool = Field(False, title="Speculative Next Turn", description="While Neuro is still speaking, start generating her next turn from the chat messages already received, so it can start as soon as the current one ends. It is only written to Neuro's history once it is spoken. If a superchat arrives or the agent is rebuilt first, it is discarded and its chat messages go back to the queue. Tool calls of a prepared turn, such as memory changes, take effect when it is generated.")
+    prompt_token_budget: int = Field(0, ge=0, title="Prompt Token Budget", description="Approximate maximum size of Neuro's prompt in tokens. When the prompt would be larger, only the core memory blocks most relevant to the current chat messages are included. Set to 0 to always include every block.")
+    token_estimator: Literal["heuristic", "tiktoken"] = Field("heuristic", title="Token Estimator", description="How prompt sizes are measured for the token budget. 'tiktoken' is more accurate but requires the tiktoken package; without it the heuristic is used.")
     recent_history_lines: int = Field(10, title="Recent History Lines", description="Number of recent spoken lines to include in the prompt context.")
     filter_enabled: bool = Field(default=False, title="Enable Filter", description="If true, a second LLM call is made via the Filter module to review and potentially revise Neuro's response.")
 
@@ -68,9 +74,18 @@ class ChatbotSettings(BaseModel):
 
     chatbot_llm_provider_id: Optional[str] = Field(default=None, title="Chatbot LLM Provider ID", description="The ID of the LLM provider for the audience-facing chatbot.")
     chatbot_memory_llm_provider_id: Optional[str] = Field(default=None, title="Chatbot Memory LLM Provider ID", description="The ID of the LLM provider for the chatbot's memory operations.")
-    generation_interval_sec: int = Field(3, title="Generation Interval (sec)", description="How often (in seconds) the chatbot should try to generate a message.")
+    generation_interval_sec: int = Field(3, title="Generation Interval (sec)", description="How often (in seconds) the chatbot should try to generate a message. Not used when a target chat rate is set.")
+    target_chats_per_minute: float = Field(0.0, ge=0, title="Target Chats per Minute", description="The audience chat rate to aim for. The generation interval is derived from it and from the number of messages each generation actually produces. With the chat reservoir, it is the rate at which pre-generated messages are released. Set to 0 to use the fixed generation interval instead.")
+    reservoir_enabled: bool = Field(False, title="Enable Chat Reservoir", description="Generate audience chat ahead of time in larger batches and release it one message at a time at the target chat rate, so chat stays steady while the chatbot LLM is slow or busy.")
+    reservoir_batch_size: int = Field(12, ge=1, title="Reservoir Batch Size", description="How many chat messages each LLM call generates when refilling the reservoir.")
+    reservoir_capacity: int = Field(40, ge=1, title="Reservoir Capacity", description="The maximum number of pre-generated chat messages held at once. The reservoir is refilled whenever another batch fits, but never holds more messages than can be released before they expire.")
+    reservoir_max_age_sec: float = Field(60.0, gt=0, title="Reservoir Max Age (sec)", description="Pre-generated chat messages older than this are discarded instead of shown. Messages reacting to a speech are also discarded once Neuro has moved on by more than one speech.")
+    max_concurrent_generations: int = Field(1, ge=1, title="Max Concurrent Generations", description="How many chat generations may run at the same time. When the chatbot LLM is slower than the interval, generations are started less often instead of piling up.")
     chats_per_batch: int = Field(4, title="Chats per Batch", description="How many chat messages the chatbot should generate at once.")
     ambient_chat_ratio: float = Field(default=0.1, ge=0.0, le=1.0, title="Ambient Chat Ratio", description="The proportion of chat messages in a batch that should be ambient/random instead of reacting to Neuro.")
+    local_ambient_share: float = Field(default=0.0, ge=0.0, le=1.0, title="Local Ambient Share", description="The share of ambient chat messages produced by a local n-gram model trained on the chat history, instead of by the LLM. The LLM produces the rest, and all of them until the model has learned enough messages.")
+    local_ambient_min_messages: int = Field(200, ge=1, title="Local Ambient Minimum Messages", description="How many distinct chat messages the local ambient model must have learned before it is used.")
+    combined_generation: bool = Field(False, title="Combined Generation", description="Generate contextual and ambient chat messages with a single LLM call that labels each message by kind, instead of one call for each kind. Falls back to separate calls if the combined response cannot be used.")
     reflection_threshold: int = Field(50, title="Reflection Threshold", description="Number of turns before triggering memory consolidation. Set to 0 to disable.")
     enable_dynamic_pool: bool = Field(False, title="Enable Dynamic Nickname Pool", description="Whether to dynamically generate nicknames for viewers.")
     dynamic_pool_size: int = Field(256, title="Dynamic Nickname Pool Size", description="The number of dynamically generated nicknames to maintain.")
@@ -96,6 +111,17 @@ class ServerSettings(BaseModel):
     client_origins: List[str] = Field(default_factory=lambda: ["http://localhost:5173", "http://127.0.0.1:5173"], title="Client Origins", description="Allowed origins for CORS (whitelist for remote dashboard).")
     audience_chat_buffer_max_size: int = Field(1000, title="Audience Chat Buffer Max Size", description="How many recent chat messages to keep in buffer for new clients.")
     initial_chat_backlog_limit: int = Field(50, title="Initial Chat Backlog Limit", description="How many messages from buffer to send to a new client.")
+    tts_cache_enabled: bool = Field(True, title="Enable TTS Cache", description="Reuse previously synthesized audio for repeated phrases instead of calling the TTS provider again.")
+    tts_cache_memory_mb: float = Field(32.0, gt=0, title="TTS Cache Memory Budget (MB)", description="Maximum size of the in-memory TTS audio cache. The least recently used entries are evicted first.")
+    tts_executor_max_workers: int = Field(4, ge=1, title="TTS Executor Max Workers", description="Maximum number of threads running blocking TTS SDK calls at the same time.")
+    tts_cache_disk_enabled: bool = Field(False, title="Enable TTS Disk Cache", description="Also persist cached TTS audio under the working directory's tts_cache folder so it survives restarts.")
+    tts_cache_disk_mb: float = Field(256.0, gt=0, title="TTS Disk Cache Budget (MB)", description="Maximum size of the TTS disk cache. The least recently used entries are deleted first.")
+    chat_batch_window_ms: int = Field(250, ge=0, title="Chat Batch Window (ms)", description="How long chat messages are collected before being sent together to clients that support chat batches.")
+    websocket_send_queue_size: int = Field(256, ge=1, title="WebSocket Send Queue Size", description="Maximum number of messages queued for a single stream client. Older chat messages are dropped first; a client that still cannot keep up is disconnected.")
+    memory_write_delay_ms: int = Field(200, ge=0, title="Memory Write Delay (ms)", description="How long memory changes are collected before the memory files are written. Several changes within this window result in a single write.")
+    memory_storage: Literal["json", "journal"] = Field("json", title="Memory Storage", description="How core and temp memory are stored. 'json' rewrites each memory file after changes. 'journal' appends each change to a journal next to the file and periodically compacts it, which keeps changes cheap when memory is large. Existing files are converted automatically in both directions.")
+    memory_journal_compact_ops: int = Field(1000, ge=1, title="Memory Journal Compaction Interval", description="In journal storage mode, the number of changes after which a memory journal is compacted into a fresh snapshot. Lower values make startup faster, higher values write less.")
+    websocket_send_timeout: float = Field(5.0, gt=0, title="WebSocket Send Timeout (s)", description="How long a single broadcast send may take before the client is considered too slow and is disconnected.")
 
 
 class AppSettings(BaseModel):
@@ -109,6 +135,56 @@ class AppSettings(BaseModel):
     server: ServerSettings = Field(default_factory=ServerSettings, title="Server", description="Settings for the server and performance.")
 
 
+# --- Configuration Diff ---
+
+
+def _collect_changes(old: Any, new: Any, path: str, changes: Set[str]):
+    """Records the dotted path of every value that differs between two dumped settings."""
+    if old == new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old.keys() | new.keys():
+            _collect_changes(old.get(key), new.get(key), f"{path}.{key}" if path else key, changes)
+        return
+    if isinstance(old, list) and isinstance(new, list) and all(
+        isinstance(item, dict) and "provider_id" in item for item in old + new
+    ):
+        # Provider lists are compared per provider, so each one has its own path
+        old_items = {item["provider_id"]: item for item in old}
+        new_items = {item["provider_id"]: item for item in new}
+        for provider_id in old_items.keys() | new_items.keys():
+            _collect_changes(
+                old_items.get(provider_id), new_items.get(provider_id), f"{path}.{provider_id}", changes
+            )
+        return
+    changes.add(path)
+
+
+class ConfigDiff:
+    """
+    The set of settings that changed in one update, as dotted paths such as
+    `stream.stream_title`. Providers are addressed by ID, e.g. `llm_providers.<provider_id>.model_name`.
+    """
+
+    def __init__(self, old: AppSettings, new: AppSettings):
+        self.changed: Set[str] = set()
+        _collect_changes(old.model_dump(), new.model_dump(), "", self.changed)
+
+    def touches(self, *sections: str) -> bool:
+        """Returns True if anything at, below or above one of the given paths changed."""
+        for section in sections:
+            for path in self.changed:
+                if path == section or path.startswith(section + ".") or section.startswith(path + "."):
+                    return True
+        return False
+
+    def __bool__(self) -> bool:
+        return bool(self.changed)
+
+    def __repr__(self) -> str:
+        return f"ConfigDiff({sorted(self.changed)})"
+
+
 # --- Configuration Manager ---
 
 
@@ -118,7 +194,10 @@ class ConfigManager:
     def __init__(self):
         self.file_path: Optional[str] = None
         self.settings: Optional[AppSettings] = None
-        self.update_callbacks = []
+        self.update_callbacks: List[Tuple[Callable, Optional[Tuple[str, ...]]]] = []
+        # The diff of the update whose callbacks are running, for callbacks that need
+        # details. None outside of the callbacks.
+        self.last_diff: Optional[ConfigDiff] = None
 
     def load(self, file_path: str):
         self.file_path = file_path
@@ -163,21 +242,46 @@ class ConfigManager:
     def get_settings_schema(self):
         return AppSettings.model_json_schema()
 
-    async def update_settings(self, updated_data: dict):
+    async def update_settings(self, updated_data: dict, force: bool = False):
+        """
+        Applies and saves a settings update, then notifies the callbacks whose
+        sections changed. With `force`, every callback runs even if nothing
+        changed, and `last_diff` is None so that listeners reload everything.
+        """
         if self.settings:
             updated_model_dict = self.settings.model_dump()
             updated_model_dict.update(updated_data)
 
-            self.settings = AppSettings.model_validate(updated_model_dict)
+            new_settings = AppSettings.model_validate(updated_model_dict)
+            diff = ConfigDiff(self.settings, new_settings)
+            self.settings = new_settings
             self.save_settings()
-            for callback in self.update_callbacks:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback(self.settings)
-                else:
-                    callback(self.settings)
-
-    def register_update_callback(self, callback):
-        self.update_callbacks.append(callback)
+            if not diff and not force:
+                return
+            self.last_diff = None if force else diff
+            try:
+                for callback, sections in self.update_callbacks:
+                    if not force and sections is not None and not diff.touches(*sections):
+                        continue
+                    if asyncio.iscoroutinefunction(callback):
+                        await callback(self.settings)
+                    else:
+                        callback(self.settings)
+            finally:
+                # A stale diff would make a later reader skip a rebuild it needs
+                self.last_diff = None
+
+    def register_update_callback(self, callback, sections: Optional[Iterable[str]] = None):
+        """
+        Registers a function to call after the settings are updated.
+
+        Args:
+            callback: Called with the new AppSettings; may be a coroutine function.
+            sections: Dotted settings paths the callback depends on (e.g. `["stream"]`
+                or `["neuro.tts_provider_id"]`). If given, the callback only runs when
+                one of them changed. If omitted, it runs on every change.
+        """
+        self.update_callbacks.append((callback, tuple(sections) if sections is not None else None))
 
 
 config_manager = ConfigManager()
@@ -83,6 +83,10 @@ def reset_data_directories_to_defaults():
         chatbot_source_path / "prompts" / "ambient_prompt.txt",
         path_manager.chatbot_ambient_prompt_path,
     )
+    copy_default_file(
+        chatbot_source_path / "prompts" / "combined_prompt.txt",
+        path_manager.chatbot_combined_prompt_path,
+    )
     copy_default_file(
         chatbot_source_path / "prompts" / "memory_prompt.txt",
         path_manager.chatbot_memory_agent_prompt_path,
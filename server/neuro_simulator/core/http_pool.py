@@ -0,0 +1,158 @@
+# neuro_simulator/core/http_pool.py
+"""
+Shared HTTP connection pools for LLM provider clients.
+Clients that talk to the same endpoint with the same credentials share one
+keep-alive pool, so connections and TLS sessions survive client re-creation.
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import openai
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 is only used when the optional `h2` package is installed
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+_POOL_LIMITS = httpx.Limits(
+    max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0
+)
+# Gemini generations can take a while; only connecting should fail fast
+_GEMINI_TIMEOUT = httpx.Timeout(600.0, connect=10.0)
+# How long an unused pool stays open, so a client re-created right after a
+# config edit (or a turn still running on the old client) can keep using it
+_CLOSE_GRACE_SEC = 30.0
+
+PoolKey = Tuple[str, str, str]  # (provider type, base URL, credentials fingerprint)
+
+
+class _PooledClient:
+    """One shared HTTP client and the number of LLM clients using it."""
+
+    def __init__(self, key: PoolKey, client: Any):
+        self.key = key
+        self.client = client
+        self.references = 0
+        self.created_at = time.time()
+        self.close_handle: Optional[asyncio.TimerHandle] = None
+
+
+class _HTTPPoolManager:
+    """
+    Manages the lifecycle of shared HTTP clients.
+    One client is kept per endpoint and credentials, reference counted by the
+    LLM clients using it, and closed once it has been unused for a grace period.
+    """
+
+    def __init__(self):
+        self._pools: Dict[PoolKey, _PooledClient] = {}
+        logger.info("HTTPPoolManager initialized.")
+
+    @staticmethod
+    def make_key(provider_type: str, base_url: Optional[str], api_key: Optional[str]) -> PoolKey:
+        credentials = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+        return (provider_type, base_url or "", credentials)
+
+    def acquire_openai(self, base_url: Optional[str], api_key: Optional[str]) -> Tuple[PoolKey, Any]:
+        """Returns a shared async HTTP client for an OpenAI-compatible endpoint."""
+        key = self.make_key("openai", base_url, api_key)
+        return key, self._acquire(
+            key,
+            lambda: openai.DefaultAsyncHttpxClient(
+                http2=_HTTP2_AVAILABLE, limits=_POOL_LIMITS
+            ),
+        )
+
+    def acquire_gemini(self, api_key: Optional[str]) -> Tuple[PoolKey, Any]:
+        """Returns a shared sync HTTP client for the Gemini API."""
+        key = self.make_key("gemini", None, api_key)
+        return key, self._acquire(
+            key,
+            lambda: httpx.Client(
+                http2=_HTTP2_AVAILABLE, limits=_POOL_LIMITS, timeout=_GEMINI_TIMEOUT
+            ),
+        )
+
+    def release(self, key: PoolKey):
+        """Drops one reference. An unused pool is closed after the grace period."""
+        pooled = self._pools.get(key)
+        if pooled is None:
+            return
+        pooled.references -= 1
+        if pooled.references > 0:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._close(pooled)
+            return
+        pooled.close_handle = loop.call_later(_CLOSE_GRACE_SEC, self._close_if_unused, key)
+
+    async def close_all(self):
+        """Closes every pool immediately."""
+        pools = list(self._pools.values())
+        self._pools.clear()
+        for pooled in pools:
+            if pooled.close_handle is not None:
+                pooled.close_handle.cancel()
+            try:
+                if hasattr(pooled.client, "aclose"):
+                    await pooled.client.aclose()
+                else:
+                    pooled.client.close()
+            except Exception as e:
+                logger.debug(f"Error closing HTTP pool: {e}")
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Returns one entry per pool for the admin panel. Credentials are not included."""
+        now = time.time()
+        return [
+            {
+                "provider_type": pooled.key[0],
+                "base_url": pooled.key[1] or None,
+                "http2": _HTTP2_AVAILABLE,
+                "references": pooled.references,
+                "idle_closing": pooled.close_handle is not None,
+                "age_sec": round(now - pooled.created_at, 1),
+            }
+            for pooled in self._pools.values()
+        ]
+
+    # --- Internals ---
+
+    def _acquire(self, key: PoolKey, factory: Callable[[], Any]) -> Any:
+        pooled = self._pools.get(key)
+        if pooled is None:
+            logger.debug(f"Creating HTTP pool for {key[0]} endpoint '{key[1] or 'default'}'")
+            pooled = _PooledClient(key, factory())
+            self._pools[key] = pooled
+        if pooled.close_handle is not None:
+            pooled.close_handle.cancel()
+            pooled.close_handle = None
+        pooled.references += 1
+        return pooled.client
+
+    def _close_if_unused(self, key: PoolKey):
+        pooled = self._pools.get(key)
+        if pooled is not None and pooled.references <= 0:
+            self._close(pooled)
+
+    def _close(self, pooled: _PooledClient):
+        self._pools.pop(pooled.key, None)
+        logger.debug(f"Closing unused HTTP pool for {pooled.key[0]} endpoint '{pooled.key[1] or 'default'}'")
+        if hasattr(pooled.client, "aclose"):
+            try:
+                asyncio.get_running_loop().create_task(pooled.client.aclose())
+            except RuntimeError:
+                pass  # No running loop; the client is garbage collected with its sockets
+        else:
+            pooled.client.close()
+
+
+# Global instance of the manager
+http_pool_manager = _HTTPPoolManager()
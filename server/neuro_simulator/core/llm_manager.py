@@ -9,6 +9,7 @@ from typing import Dict, Optional
 
 from ..agents.llm import LLMClient
 from .config import AppSettings, config_manager
+from .http_pool import http_pool_manager
 
 logger = logging.getLogger(__name__)
 
@@ -65,16 +66,38 @@ class _LLMManager:
         return client
 
 
+    def reconcile(self, new_settings: AppSettings):
+        """
+        Drops the cached clients whose provider configuration changed or was removed.
+        Clients of unchanged providers are kept, along with their warm connections.
+        A dropped client is not closed, since an agent may still be using it; its
+        HTTP pool is released once the last reference to it is gone.
+        """
+        providers = {p.provider_id: p for p in new_settings.llm_providers}
+        for provider_id, client in list(self._clients.items()):
+            if providers.get(provider_id) == client.provider_config:
+                continue
+            logger.info(f"LLM provider '{provider_id}' changed. Its client will be re-created on next use.")
+            del self._clients[provider_id]
+
+    async def close_all(self):
+        """Closes every cached client and the HTTP pools behind them."""
+        for client in self._clients.values():
+            client.close()
+        self._clients.clear()
+        await http_pool_manager.close_all()
+
+
 # Global instance of the manager
 llm_manager = _LLMManager()
 
 
 def _reset_llm_clients_on_config_update(new_settings: AppSettings):
-    """Resets the cached LLM clients when configuration is updated."""
-    global llm_manager
-    logger.info("Configuration has been updated. Resetting cached LLMClient instances.")
-    llm_manager._clients.clear()
+    """Resets the cached LLM clients whose provider changed when configuration is updated."""
+    llm_manager.reconcile(new_settings)
 
 
 # Register the callback to the config manager
-config_manager.register_update_callback(_reset_llm_clients_on_config_update)
+config_manager.register_update_callback(
+    _reset_llm_clients_on_config_update, sections=["llm_providers"]
+)
@@ -20,6 +20,7 @@ class PathManager:
         self.memory_agent_dir = self.neuro_data_dir / "memory_manager"
         self.shared_memories_dir = self.neuro_data_dir / "memories"
         self.user_tools_dir = self.neuro_data_dir / "tools"
+        self.tts_cache_dir = self.working_dir / "tts_cache"
 
         self.neuro_tools_path = self.neuro_agent_dir / "tools.json"
         self.neuro_history_path = self.neuro_agent_dir / "history.jsonl"
@@ -42,6 +43,7 @@ class PathManager:
 
         self.chatbot_prompt_path = self.chatbot_dir / "chatbot_prompt.txt"
         self.chatbot_ambient_prompt_path = self.chatbot_dir / "ambient_prompt.txt"
+        self.chatbot_combined_prompt_path = self.chatbot_dir / "combined_prompt.txt"
         self.chatbot_tools_path = self.chatbot_dir / "tools.json"
         self.chatbot_history_path = self.chatbot_dir / "history.jsonl"
 
@@ -1,16 +1,22 @@
 # neuro_simulator/services/audio.py
 import asyncio
-import base64
 import html
 import logging
 import re
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Tuple, Union
 
 import azure.cognitiveservices.speech as speechsdk  # type: ignore
 
-from ..core.config import config_manager
+from ..core.config import TTSProviderSettings, config_manager
+from .tts_cache import make_cache_key, tts_audio_cache
+from .tts_pool import tts_pool_manager
 
 logger = logging.getLogger(__name__)
 
+# Hardcoded voice and pitch as per design
+_AZURE_VOICE_NAME = "en-US-AshleyNeural"
+_AZURE_PITCH = 1.25
+
 
 def _remove_emoji(text: str) -> str:
     """Removes emoji characters from a string."""
@@ -36,18 +42,20 @@ def _remove_emoji(text: str) -> str:
     return emoji_pattern.sub(r"", text).strip()
 
 
-async def synthesize_audio_segment(
+async def synthesize_audio_bytes(
     text: str, tts_provider_id: str
-) -> tuple[str, float]:
+) -> Optional[Tuple[bytes, float]]:
     """
-    Synthesizes audio using a configured TTS provider.
-    Returns a Base64 encoded audio string and the audio duration in seconds.
+    Synthesizes audio using a configured TTS provider, serving repeated phrases
+    from the TTS audio cache.
+    Returns the raw MP3 bytes and the audio duration in seconds, or None if the
+    synthesis timed out.
     """
     assert config_manager.settings is not None
     # Clean emojis from the text before synthesis
     text = _remove_emoji(text)
     if not text:
-        return "", 0.0
+        return b"", 0.0
 
     # Find the specified TTS provider in the configuration
     provider_config = next(
@@ -67,81 +75,187 @@ async def synthesize_audio_segment(
     # --- Dispatch based on provider type ---
     # Currently, only Azure is supported.
     if provider_config.provider_type == "azure":
-        if not provider_config.api_key or not provider_config.region:
-            raise ValueError(
-                f"Azure TTS provider '{provider_config.display_name}' is missing API key or region."
-            )
+        cache_key = make_cache_key(
+            provider_config.provider_id, _AZURE_VOICE_NAME, _AZURE_PITCH, text
+        )
+        cached = await tts_audio_cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"TTS cache hit: '{text[:30]}...'")
+            return cached
+
+        result = await _synthesize_azure(provider_config, text)
+        if result is not None:
+            await tts_audio_cache.put(cache_key, *result)
+        return result
+    else:
+        raise NotImplementedError(
+            f"TTS provider type '{provider_config.provider_type}' is not supported."
+        )
 
-        # Hardcoded voice and pitch as per design
-        voice_name = "en-US-AshleyNeural"
-        pitch = 1.25
 
-        speech_config = speechsdk.SpeechConfig(
-            subscription=provider_config.api_key, region=provider_config.region
+async def _synthesize_azure(
+    provider_config: TTSProviderSettings, text: str
+) -> Optional[Tuple[bytes, float]]:
+    """Synthesizes audio with Azure. Returns None if the synthesis timed out."""
+    if not provider_config.api_key or not provider_config.region:
+        raise ValueError(
+            f"Azure TTS provider '{provider_config.display_name}' is missing API key or region."
         )
-        speech_config.set_speech_synthesis_output_format(
-            speechsdk.SpeechSynthesisOutputFormat.Audio16Khz32KBitRateMonoMp3
+
+    pitch_percent = int((_AZURE_PITCH - 1.0) * 100)
+    pitch_ssml_value = (
+        f"+{pitch_percent}%" if pitch_percent >= 0 else f"{pitch_percent}%"
+    )
+
+    escaped_text = html.escape(text)
+
+    ssml_string = f"""
+    <speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="en-US">
+        <voice name="{_AZURE_VOICE_NAME}">
+            <prosody pitch="{pitch_ssml_value}">
+                {escaped_text}
+            </prosody>
+        </voice>
+    </speak>
+    """
+
+    try:
+        timeout_sec = provider_config.tts_timeout
+        # Use asyncio.wait_for to apply a timeout to the pooled blocking call
+        result = await asyncio.wait_for(
+            tts_pool_manager.speak_ssml(provider_config, ssml_string),
+            timeout=timeout_sec,
         )
 
-        pitch_percent = int((pitch - 1.0) * 100)
-        pitch_ssml_value = (
-            f"+{pitch_percent}%" if pitch_percent >= 0 else f"{pitch_percent}%"
+        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+            audio_data = result.audio_data
+            audio_duration_sec = result.audio_duration.total_seconds()
+            logger.debug(
+                f"TTS synthesis completed: '{text[:30]}...' (Duration: {audio_duration_sec:.2f}s)"
+            )
+            return audio_data, audio_duration_sec
+        else:
+            cancellation_details = result.cancellation_details
+            error_message = f"TTS synthesis failed (Reason: {cancellation_details.reason}). Text: '{text}'"
+            if cancellation_details.error_details:
+                error_message += f" | Details: {cancellation_details.error_details}"
+            logger.error(error_message)
+            raise Exception(error_message)
+    except asyncio.TimeoutError:
+        logger.error(
+            f"TTS synthesis timed out after {timeout_sec} seconds for text: '{text[:30]}...'"
         )
+        return None
+    except Exception as e:
+        logger.error(
+            f"An exception occurred during the Azure TTS SDK call: {e}",
+            exc_info=True,
+        )
+        raise
 
-        escaped_text = html.escape(text)
 
-        ssml_string = f"""
-        <speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="en-US">
-            <voice name="{voice_name}">
-                <prosody pitch="{pitch_ssml_value}">
-                    {escaped_text}
-                </prosody>
-            </voice>
-        </speak>
-        """
+SynthesisResult = Union[Tuple[bytes, float], None, Exception]
 
-        synthesizer = speechsdk.SpeechSynthesizer(
-            speech_config=speech_config, audio_config=None
-        )
 
-        def _perform_synthesis_sync():
-            # This function is fully blocking, as intended for to_thread
-            return synthesizer.speak_ssml_async(ssml_string).get()
+async def _iterate(sentences: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[str]:
+    """Iterates over a sync or async iterable of sentences asynchronously."""
+    if isinstance(sentences, AsyncIterable):
+        async for sentence in sentences:
+            yield sentence
+    else:
+        for sentence in sentences:
+            yield sentence
 
-        try:
-            timeout_sec = provider_config.tts_timeout
-            # Use asyncio.wait_for to apply a timeout to the threaded blocking call
-            result = await asyncio.wait_for(
-                asyncio.to_thread(_perform_synthesis_sync), timeout=timeout_sec
-            )
 
-            if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                audio_data = result.audio_data
-                encoded_audio = base64.b64encode(audio_data).decode("utf-8")
-                audio_duration_sec = result.audio_duration.total_seconds()
-                logger.debug(
-                    f"TTS synthesis completed: '{text[:30]}...' (Duration: {audio_duration_sec:.2f}s)"
-                )
-                return encoded_audio, audio_duration_sec
-            else:
-                cancellation_details = result.cancellation_details
-                error_message = f"TTS synthesis failed (Reason: {cancellation_details.reason}). Text: '{text}'"
-                if cancellation_details.error_details:
-                    error_message += f" | Details: {cancellation_details.error_details}"
-                logger.error(error_message)
-                raise Exception(error_message)
-        except asyncio.TimeoutError:
-            logger.error(
-                f"TTS synthesis timed out after {timeout_sec} seconds for text: '{text[:30]}...'"
+class SynthesisPipeline:
+    """
+    Synthesizes upcoming sentences while the current one is playing.
+
+    Sentences may come from a list or from an async iterable that is still being
+    produced (e.g. an agent turn that is streaming from the LLM). Up to `lookahead`
+    sentences are synthesized concurrently ahead of the one being consumed. Results
+    are yielded in the original sentence order as `(sentence, result)` pairs, where
+    `result` is either the value returned by `synthesize_audio_bytes` (raw audio
+    bytes and duration, or None on timeout) or the exception it raised. An exception raised
+    by the sentence source is re-raised to the consumer after the sentences that
+    preceded it. Use it as an async context manager so that the source and any
+    pending syntheses are cancelled when the consumer stops early (e.g. on stream
+    stop).
+    """
+
+    _END = object()
+
+    def __init__(
+        self,
+        sentences: Union[Iterable[str], AsyncIterable[str]],
+        tts_provider_id: str,
+        lookahead: int = 2,
+    ):
+        self._sentences = sentences
+        self._tts_provider_id = tts_provider_id
+        # One slot for the sentence being consumed plus the look-ahead window.
+        self._slots = asyncio.Semaphore(max(0, lookahead) + 1)
+        self._holding_slot = False
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._feeder: Optional[asyncio.Task] = None
+
+    async def _synthesize(self, sentence: str) -> SynthesisResult:
+        try:
+            return await synthesize_audio_bytes(
+                sentence, tts_provider_id=self._tts_provider_id
             )
-            return "timeout", 0.0
         except Exception as e:
-            logger.error(
-                f"An exception occurred during the Azure TTS SDK call: {e}",
-                exc_info=True,
-            )
+            return e
+
+    async def _feed(self):
+        """Pulls sentences from the source and schedules their synthesis."""
+        try:
+            async for sentence in _iterate(self._sentences):
+                await self._slots.acquire()
+                task = asyncio.create_task(self._synthesize(sentence))
+                self._ready.put_nowait((sentence, task))
+            self._ready.put_nowait(self._END)
+        except asyncio.CancelledError:
             raise
-    else:
-        raise NotImplementedError(
-            f"TTS provider type '{provider_config.provider_type}' is not supported."
-        )
+        except Exception as e:
+            self._ready.put_nowait(e)
+
+    def __aiter__(self) -> "SynthesisPipeline":
+        return self
+
+    async def __anext__(self) -> Tuple[str, SynthesisResult]:
+        if self._feeder is None:
+            self._feeder = asyncio.create_task(self._feed())
+        # The previous sentence has been consumed, free its slot for the window.
+        if self._holding_slot:
+            self._slots.release()
+            self._holding_slot = False
+
+        item = await self._ready.get()
+        if item is self._END:
+            raise StopAsyncIteration
+        if isinstance(item, Exception):
+            raise item
+        self._holding_slot = True
+        sentence, task = item
+        return sentence, await task
+
+    async def aclose(self):
+        """Stops the sentence source and cancels all unconsumed synthesis tasks."""
+        tasks = []
+        if self._feeder is not None:
+            tasks.append(self._feeder)
+        while not self._ready.empty():
+            item = self._ready.get_nowait()
+            if isinstance(item, tuple):
+                tasks.append(item[1])
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def __aenter__(self) -> "SynthesisPipeline":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
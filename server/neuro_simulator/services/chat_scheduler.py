@@ -0,0 +1,184 @@
+# neuro_simulator/services/chat_scheduler.py
+"""
+Scheduling of audience chat generation.
+Generations are started at an interval that adapts to the chatbot's measured LLM
+latency and to a target chat rate, with a bounded number in flight, and new ones
+wait while Neuro's own turn is being generated.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+from ..core.config import config_manager
+from ..utils.state import app_state
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest measurement in the moving averages
+_EMA_ALPHA = 0.3
+# Window over which the effective chat rate is measured
+_RATE_WINDOW_SEC = 60.0
+# Chat generation waits at most this long for Neuro's turn, so the chat never stalls entirely
+_NEURO_PRIORITY_MAX_WAIT_SEC = 20.0
+
+
+class AudienceChatScheduler:
+    """Starts chatbot generations without letting them pile up."""
+
+    def __init__(self):
+        self._in_flight: Set[asyncio.Task] = set()
+        self._slot_freed = asyncio.Event()
+        self._last_start = 0.0
+        self._run_started = 0.0
+        self._recent_chats: Deque[Tuple[float, int]] = deque()
+        self.latency_ema: Optional[float] = None
+        self.chats_per_generation_ema: Optional[float] = None
+        self.waiting_for: Optional[str] = None
+        self.last_start_delay = 0.0
+        self.generations = 0
+        self.failures = 0
+        self.deferred_for_neuro = 0
+
+    def current_interval(self) -> float:
+        """Seconds between generation starts, given the settings and what has been measured."""
+        assert config_manager.settings is not None
+        settings = config_manager.settings.chatbot
+        interval = float(settings.generation_interval_sec)
+        # With the chat reservoir, the reservoir releases chats at the target rate
+        # and generation only has to keep it stocked
+        if settings.target_chats_per_minute > 0 and not settings.reservoir_enabled:
+            per_generation = self.chats_per_generation_ema or float(settings.chats_per_batch)
+            interval = per_generation * 60.0 / settings.target_chats_per_minute
+        if self.latency_ema is not None:
+            # Starting more often than generations finish would only build a backlog
+            interval = max(interval, self.latency_ema / settings.max_concurrent_generations)
+        return interval
+
+    async def run(self, generate: Callable[[], Awaitable[Optional[int]]]):
+        """
+        Runs generations until cancelled. `generate` produces one batch of chat
+        messages and returns how many it produced, or None if it had nothing to do.
+        A generation that raises or produces nothing counts as failed and is kept
+        out of the latency and rate measurements, since failures tend to be fast.
+        """
+        self._run_started = time.monotonic()
+        self._last_start = 0.0
+        self._recent_chats.clear()
+        try:
+            while True:
+                try:
+                    await self._wait_until_due()
+                    due = self._last_start + self.current_interval()
+                    await self._wait_for_slot()
+                    await self._wait_for_neuro()
+                    self.waiting_for = None
+                    now = time.monotonic()
+                    self.last_start_delay = max(0.0, now - due) if self._last_start else 0.0
+                    self._last_start = now
+                    task = asyncio.ensure_future(self._generate(generate))
+                    self._in_flight.add(task)
+                    task.add_done_callback(self._finished)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error in audience chat scheduler: {e}", exc_info=True)
+                    await asyncio.sleep(10)  # Avoid fast-looping on persistent errors
+        finally:
+            self.waiting_for = None
+            for task in list(self._in_flight):
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns the effective rate and backlog for the admin panel."""
+        assert config_manager.settings is not None
+        settings = config_manager.settings.chatbot
+        return {
+            "effective_chats_per_minute": round(self._effective_rate(), 2),
+            "target_chats_per_minute": settings.target_chats_per_minute,
+            "interval_sec": round(self.current_interval(), 3),
+            "llm_latency_ms": round(self.latency_ema * 1000, 1) if self.latency_ema is not None else None,
+            "chats_per_generation": round(self.chats_per_generation_ema, 2)
+            if self.chats_per_generation_ema is not None
+            else None,
+            "in_flight": len(self._in_flight),
+            "max_concurrent_generations": settings.max_concurrent_generations,
+            "waiting_for": self.waiting_for,
+            "last_start_delay_ms": round(self.last_start_delay * 1000, 1),
+            "generations": self.generations,
+            "failures": self.failures,
+            "deferred_for_neuro": self.deferred_for_neuro,
+        }
+
+    # --- Internals ---
+
+    async def _wait_until_due(self):
+        self.waiting_for = "interval"
+        while True:
+            # Re-checked after sleeping, since the interval adapts while we wait
+            delay = self._last_start + self.current_interval() - time.monotonic()
+            if not self._last_start or delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    async def _wait_for_slot(self):
+        assert config_manager.settings is not None
+        while len(self._in_flight) >= config_manager.settings.chatbot.max_concurrent_generations:
+            self.waiting_for = "slot"
+            self._slot_freed.clear()
+            await self._slot_freed.wait()
+
+    async def _wait_for_neuro(self):
+        if app_state.neuro_idle_event.is_set():
+            return
+        self.waiting_for = "neuro"
+        self.deferred_for_neuro += 1
+        try:
+            await asyncio.wait_for(app_state.neuro_idle_event.wait(), timeout=_NEURO_PRIORITY_MAX_WAIT_SEC)
+        except asyncio.TimeoutError:
+            logger.debug("Neuro's turn is taking long. Generating audience chat anyway.")
+
+    async def _generate(self, generate: Callable[[], Awaitable[Optional[int]]]):
+        start = time.monotonic()
+        try:
+            count = await generate()
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Audience chat generation failed: {e}", exc_info=True)
+            return
+        if count is None:
+            return
+        if not count:
+            # The chatbot logs why; an LLM error usually ends up as an empty batch
+            self.failures += 1
+            return
+        latency = time.monotonic() - start
+        self.generations += 1
+        self.latency_ema = latency if self.latency_ema is None else (
+            _EMA_ALPHA * latency + (1 - _EMA_ALPHA) * self.latency_ema
+        )
+        self.chats_per_generation_ema = count if self.chats_per_generation_ema is None else (
+            _EMA_ALPHA * count + (1 - _EMA_ALPHA) * self.chats_per_generation_ema
+        )
+        self._recent_chats.append((time.monotonic(), count))
+
+    def _finished(self, task: asyncio.Task):
+        self._in_flight.discard(task)
+        self._slot_freed.set()
+
+    def _effective_rate(self) -> float:
+        now = time.monotonic()
+        while self._recent_chats and now - self._recent_chats[0][0] > _RATE_WINDOW_SEC:
+            self._recent_chats.popleft()
+        if not self._run_started:
+            return 0.0
+        window = min(_RATE_WINDOW_SEC, now - self._run_started)
+        if window <= 0:
+            return 0.0
+        return sum(count for _, count in self._recent_chats) * 60.0 / window
+
+
+# Global instance
+audience_chat_scheduler = AudienceChatScheduler()
@@ -0,0 +1,239 @@
+# neuro_simulator/services/tts_cache.py
+"""
+Content-addressed cache for synthesized TTS audio.
+Repeated phrases (greetings, filter fallbacks, error lines) are served without
+calling the TTS provider again.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from ..core.config import config_manager
+from ..core.path_manager import path_manager
+
+logger = logging.getLogger(__name__)
+
+# A sweep frees the disk tier down to this fraction of its budget
+_DISK_SWEEP_TARGET = 0.9
+
+
+def normalize_tts_text(text: str) -> str:
+    """Collapses whitespace so that trivially different texts share a cache entry."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def make_cache_key(provider_id: str, voice_name: str, pitch: float, text: str) -> str:
+    """Builds a content-addressed key from everything that affects the audio output."""
+    raw = json.dumps(
+        [provider_id, voice_name, pitch, normalize_tts_text(text)], ensure_ascii=False
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TTSAudioCache:
+    """
+    A two-tier cache for synthesized audio.
+
+    The memory tier is an LRU bounded by a byte budget. The optional disk tier
+    stores each entry as `<key>.mp3` plus a `<key>.json` sidecar holding its
+    duration, under the working directory's `tts_cache` folder. It has its own
+    byte budget, enforced by deleting the entries with the oldest modification
+    time, which is refreshed on every disk hit.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        # Size of the disk tier, counted on the first write after startup
+        self._disk_bytes: Optional[int] = None
+        # Disk reads and writes run in worker threads
+        self._disk_lock = threading.Lock()
+
+    # --- Settings ---
+
+    @property
+    def enabled(self) -> bool:
+        return bool(config_manager.settings and config_manager.settings.server.tts_cache_enabled)
+
+    @property
+    def _memory_budget(self) -> int:
+        assert config_manager.settings is not None
+        return int(config_manager.settings.server.tts_cache_memory_mb * 1024 * 1024)
+
+    @property
+    def _disk_budget(self) -> int:
+        assert config_manager.settings is not None
+        return int(config_manager.settings.server.tts_cache_disk_mb * 1024 * 1024)
+
+    @property
+    def _disk_dir(self) -> Optional[Path]:
+        settings = config_manager.settings
+        if not settings or not settings.server.tts_cache_disk_enabled or not path_manager:
+            return None
+        return path_manager.tts_cache_dir
+
+    # --- Public API ---
+
+    async def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """Returns the cached (audio bytes, duration) for a key, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return entry
+
+        disk_dir = self._disk_dir
+        if disk_dir is not None:
+            entry = await asyncio.to_thread(self._read_from_disk, disk_dir, key)
+            if entry is not None:
+                self.disk_hits += 1
+                self._store_in_memory(key, entry)
+                return entry
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, audio_data: bytes, duration: float):
+        """Stores synthesized audio in the memory tier and, if enabled, on disk."""
+        if not self.enabled or not audio_data:
+            return
+        entry = (audio_data, duration)
+        self._store_in_memory(key, entry)
+
+        disk_dir = self._disk_dir
+        if disk_dir is not None:
+            try:
+                await asyncio.to_thread(self._write_to_disk, disk_dir, key, entry, self._disk_budget)
+            except OSError as e:
+                logger.warning(f"Could not write TTS cache entry to disk: {e}")
+
+    def clear(self):
+        """Drops the memory tier. The disk tier is left untouched."""
+        self._entries.clear()
+        self._memory_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and memory usage for the admin panel."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "memory_bytes": self._memory_bytes,
+            "memory_budget_bytes": self._memory_budget if config_manager.settings else 0,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_bytes": self._disk_bytes,
+            "disk_evictions": self.disk_evictions,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    # --- Internals ---
+
+    def _store_in_memory(self, key: str, entry: Tuple[bytes, float]):
+        size = len(entry[0])
+        budget = self._memory_budget
+        if size > budget:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous[0])
+
+        self._entries[key] = entry
+        self._memory_bytes += size
+
+        while self._memory_bytes > budget and self._entries:
+            _, (evicted_audio, _) = self._entries.popitem(last=False)
+            self._memory_bytes -= len(evicted_audio)
+            self.evictions += 1
+
+    @staticmethod
+    def _read_from_disk(disk_dir: Path, key: str) -> Optional[Tuple[bytes, float]]:
+        audio_path = disk_dir / f"{key}.mp3"
+        meta_path = disk_dir / f"{key}.json"
+        if not audio_path.exists() or not meta_path.exists():
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                duration = float(json.load(f)["duration"])
+            with open(audio_path, "rb") as f:
+                audio_data = f.read()
+            # Marks the entry as recently used for the disk budget
+            os.utime(meta_path)
+            return audio_data, duration
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable TTS cache entry '{key}': {e}")
+            return None
+
+    def _write_to_disk(self, disk_dir: Path, key: str, entry: Tuple[bytes, float], budget: int):
+        audio_data, duration = entry
+        if len(audio_data) > budget:
+            return
+        os.makedirs(disk_dir, exist_ok=True)
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._scan_disk(disk_dir))
+            audio_path = disk_dir / f"{key}.mp3"
+            if audio_path.exists():
+                self._disk_bytes -= audio_path.stat().st_size
+            with open(audio_path, "wb") as f:
+                f.write(audio_data)
+            # The sidecar is written last, so a half-written entry is never read back.
+            with open(disk_dir / f"{key}.json", "w", encoding="utf-8") as f:
+                json.dump({"duration": duration}, f)
+            self._disk_bytes += len(audio_data)
+            if self._disk_bytes > budget:
+                self._sweep_disk(disk_dir, budget)
+
+    @staticmethod
+    def _scan_disk(disk_dir: Path) -> Iterator[Tuple[str, int, float]]:
+        """Yields (key, audio size, last use) for every entry on disk."""
+        for audio_path in disk_dir.glob("*.mp3"):
+            meta_path = audio_path.with_suffix(".json")
+            try:
+                size = audio_path.stat().st_size
+                last_used = meta_path.stat().st_mtime if meta_path.exists() else 0.0
+            except OSError:
+                continue
+            yield audio_path.stem, size, last_used
+
+    def _sweep_disk(self, disk_dir: Path, budget: int):
+        """Deletes the least recently used disk entries until the tier fits its budget."""
+        entries = sorted(self._scan_disk(disk_dir), key=lambda item: item[2])
+        self._disk_bytes = sum(size for _, size, _ in entries)
+        # Some headroom, so that the directory is not rescanned on every write
+        target = budget * _DISK_SWEEP_TARGET
+        for key, size, _ in entries:
+            if self._disk_bytes <= target:
+                break
+            # The sidecar goes first, so the entry is never read back without its audio
+            for suffix in (".json", ".mp3"):
+                try:
+                    (disk_dir / f"{key}{suffix}").unlink()
+                except FileNotFoundError:
+                    pass
+            self._disk_bytes -= size
+            self.disk_evictions += 1
+
+
+# Global singleton instance
+tts_audio_cache = TTSAudioCache()
@@ -0,0 +1,235 @@
+# neuro_simulator/services/tts_pool.py
+"""
+Centralized manager for pooled Azure SpeechSynthesizer instances.
+Keeps warm synthesizers per TTS provider so that each sentence does not pay for
+a new connection setup, and runs the SDK's blocking calls on a bounded executor.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import azure.cognitiveservices.speech as speechsdk  # type: ignore
+
+from ..core.config import AppSettings, TTSProviderSettings, config_manager
+
+logger = logging.getLogger(__name__)
+
+
+class PoolClosedError(RuntimeError):
+    """Raised when a synthesizer is requested from a pool that has been closed."""
+
+
+# Put in the idle queue on close, so that callers waiting for a synthesizer wake up
+_CLOSED = object()
+
+
+class _SynthesizerPool:
+    """A fixed-size pool of synthesizers sharing one provider configuration."""
+
+    def __init__(self, provider_config: TTSProviderSettings):
+        self.provider_config = provider_config
+        self.size = provider_config.synthesizer_pool_size
+        self.closed = False
+        self._idle: asyncio.Queue = asyncio.Queue()
+        # Each synthesizer's Connection is kept alive alongside it.
+        self._members: Dict[Any, Any] = {}
+
+    def _create_member(self) -> Any:
+        config = self.provider_config
+        speech_config = speechsdk.SpeechConfig(
+            subscription=config.api_key, region=config.region
+        )
+        speech_config.set_speech_synthesis_output_format(
+            speechsdk.SpeechSynthesisOutputFormat.Audio16Khz32KBitRateMonoMp3
+        )
+        synthesizer = speechsdk.SpeechSynthesizer(
+            speech_config=speech_config, audio_config=None
+        )
+        self._members[synthesizer] = speechsdk.Connection.from_speech_synthesizer(synthesizer)
+        return synthesizer
+
+    def _close_member(self, synthesizer: Any):
+        connection = self._members.pop(synthesizer, None)
+        if connection is None:
+            return
+        try:
+            connection.close()
+        except Exception as e:
+            logger.debug(f"Error closing TTS connection: {e}")
+
+    async def acquire(self) -> Any:
+        """
+        Returns an idle synthesizer, creating one if the pool is not yet full.
+        Raises PoolClosedError if the pool is or gets closed while waiting.
+        """
+        if self.closed:
+            raise PoolClosedError(f"Synthesizer pool of '{self.provider_config.provider_id}' is closed.")
+        if self._idle.empty() and len(self._members) < self.size:
+            return self._create_member()
+        synthesizer = await self._idle.get()
+        if synthesizer is _CLOSED:
+            # Passed on to the next waiter
+            self._idle.put_nowait(_CLOSED)
+            raise PoolClosedError(f"Synthesizer pool of '{self.provider_config.provider_id}' is closed.")
+        return synthesizer
+
+    def release(self, synthesizer: Any):
+        """Returns a synthesizer to the pool. Synthesizers of a closed pool are closed now."""
+        if self.closed:
+            self._close_member(synthesizer)
+        else:
+            self._idle.put_nowait(synthesizer)
+
+    def fill(self):
+        """Creates synthesizers until the pool is full and marks them idle."""
+        while len(self._members) < self.size:
+            self._idle.put_nowait(self._create_member())
+
+    def open_connections(self):
+        """Pre-opens every pooled connection. Blocking, run it in the executor."""
+        for connection in list(self._members.values()):
+            connection.open(False)
+
+    def close(self):
+        """
+        Closes the idle synthesizers and fails callers waiting for one.
+        Synthesizers still in use are closed once they are released.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        while not self._idle.empty():
+            self._close_member(self._idle.get_nowait())
+        self._idle.put_nowait(_CLOSED)
+
+
+class _TTSPoolManager:
+    """
+    Manages the lifecycle of synthesizer pools.
+    One pool is kept per provider_id and rebuilt when its settings change.
+    """
+
+    def __init__(self):
+        self._pools: Dict[str, _SynthesizerPool] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_workers = 0
+        logger.info("TTSPoolManager initialized.")
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        assert config_manager.settings is not None
+        workers = config_manager.settings.server.tts_executor_max_workers
+        if self._executor is None or self._executor_workers != workers:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="tts"
+            )
+            self._executor_workers = workers
+        return self._executor
+
+    def _get_pool(self, provider_config: TTSProviderSettings) -> _SynthesizerPool:
+        pool = self._pools.get(provider_config.provider_id)
+        if pool is None:
+            logger.debug(
+                f"Creating synthesizer pool for TTS provider '{provider_config.provider_id}'"
+            )
+            pool = _SynthesizerPool(provider_config)
+            self._pools[provider_config.provider_id] = pool
+        return pool
+
+    async def speak_ssml(self, provider_config: TTSProviderSettings, ssml: str) -> Any:
+        """
+        Synthesizes SSML on a pooled synthesizer and returns the SDK result.
+        If the caller stops waiting (e.g. on timeout), the synthesizer is only
+        returned to the pool once its blocking call has actually finished.
+        """
+        pool = self._get_pool(provider_config)
+        synthesizer = await pool.acquire()
+
+        def _perform_synthesis_sync():
+            # This function is fully blocking, as intended for the executor
+            return synthesizer.speak_ssml_async(ssml).get()
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_executor(), _perform_synthesis_sync)
+
+        def _on_done(f: asyncio.Future):
+            if not f.cancelled():
+                f.exception()  # Mark as retrieved when nobody awaits it anymore
+            pool.release(synthesizer)
+
+        future.add_done_callback(_on_done)
+        return await asyncio.shield(future)
+
+    async def warm_up(self, tts_provider_id: Optional[str]):
+        """Creates the provider's synthesizers and opens their connections in advance."""
+        if not tts_provider_id or not config_manager.settings:
+            return
+        provider_config = next(
+            (
+                p
+                for p in config_manager.settings.tts_providers
+                if p.provider_id == tts_provider_id
+            ),
+            None,
+        )
+        if (
+            not provider_config
+            or provider_config.provider_type != "azure"
+            or not provider_config.api_key
+            or not provider_config.region
+        ):
+            return
+
+        pool = self._get_pool(provider_config)
+        loop = asyncio.get_running_loop()
+        try:
+            pool.fill()
+            await loop.run_in_executor(self._get_executor(), pool.open_connections)
+            logger.info(
+                f"Warmed up {pool.size} synthesizer(s) for TTS provider '{tts_provider_id}'."
+            )
+        except Exception as e:
+            logger.warning(f"Could not warm up TTS provider '{tts_provider_id}': {e}")
+
+    def close_all(self):
+        """Closes every pool and the executor."""
+        for pool in self._pools.values():
+            pool.close()
+        self._pools.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns the size and idle count of every pool."""
+        return {
+            provider_id: {"size": pool.size, "idle": pool._idle.qsize()}
+            for provider_id, pool in self._pools.items()
+        }
+
+
+# Global instance of the manager
+tts_pool_manager = _TTSPoolManager()
+
+
+async def _rebuild_tts_pools_on_config_update(new_settings: AppSettings):
+    """Rebuilds the pools whose TTS provider settings have changed."""
+    new_configs = {p.provider_id: p for p in new_settings.tts_providers}
+    for provider_id, pool in list(tts_pool_manager._pools.items()):
+        new_config = new_configs.get(provider_id)
+        if new_config is not None and new_config == pool.provider_config:
+            continue
+        logger.info(f"TTS provider '{provider_id}' changed. Rebuilding its synthesizer pool.")
+        pool.close()
+        del tts_pool_manager._pools[provider_id]
+        if new_config is not None:
+            asyncio.create_task(tts_pool_manager.warm_up(provider_id))
+
+
+# Register the callback to the config manager
+config_manager.register_update_callback(
+    _rebuild_tts_pools_on_config_update, sections=["tts_providers"]
+)
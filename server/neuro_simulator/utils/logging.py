@@ -1,8 +1,10 @@
 # neuro_simulator/utils/logging.py
+import asyncio
 import logging
 import sys
+import threading
 from collections import deque
-from typing import Deque
+from typing import Deque, List, Set, Tuple
 
 from neuro_simulator.core.config import config_manager
 from neuro_simulator.utils import console
@@ -51,15 +53,58 @@ class ColoredFormatter(logging.Formatter):
         return super().format(record_copy)
 
 
-# Create two independent, bounded queues for different log sources
-server_log_queue: Deque[str] = deque(maxlen=1000)
-agent_log_queue: Deque[str] = deque(maxlen=1000)
+class LogBus:
+    """
+    A bounded, append-only log stream that many readers can follow.
+
+    Entries are numbered, so each reader keeps its own cursor and never takes
+    entries away from another. Appending is thread-safe and wakes up every
+    registered listener, so readers do not need to poll.
+    """
+
+    def __init__(self, maxlen: int = 1000):
+        self._entries: Deque[Tuple[int, str]] = deque(maxlen=maxlen)
+        self._next_seq = 0
+        self._lock = threading.Lock()
+        self._listeners: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    def append(self, entry: str):
+        with self._lock:
+            self._entries.append((self._next_seq, entry))
+            self._next_seq += 1
+            listeners = list(self._listeners)
+        for loop, event in listeners:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The listener's loop is already closed
+                self.remove_listener(event)
+
+    def read_since(self, cursor: int) -> Tuple[List[str], int]:
+        """Returns the entries at or after `cursor` that are still retained, and the new cursor."""
+        with self._lock:
+            entries = [entry for seq, entry in self._entries if seq >= cursor]
+            return entries, self._next_seq
+
+    def add_listener(self, event: asyncio.Event):
+        """Sets `event` (on the current event loop) whenever a new entry arrives."""
+        with self._lock:
+            self._listeners.add((asyncio.get_running_loop(), event))
+
+    def remove_listener(self, event: asyncio.Event):
+        with self._lock:
+            self._listeners = {item for item in self._listeners if item[1] is not event}
+
+
+# Create two independent, bounded log buses for different log sources
+server_log_bus = LogBus(maxlen=1000)
+agent_log_bus = LogBus(maxlen=1000)
 
 
 class QueueLogHandler(logging.Handler):
-    """A handler that sends log records to a specified queue."""
+    """A handler that sends log records to a specified log bus."""
 
-    def __init__(self, queue: Deque[str]):
+    def __init__(self, queue: LogBus):
         super().__init__()
         self.queue = queue
 
@@ -95,7 +140,7 @@ def configure_server_logging():
     console_formatter = ColoredFormatter(LOG_FORMAT)
 
     # Create a handler that writes to the server log queue for the web UI
-    server_queue_handler = QueueLogHandler(server_log_queue)
+    server_queue_handler = QueueLogHandler(server_log_bus)
     server_queue_handler.setFormatter(queue_formatter)
 
     # Create a handler that writes to the console (stdout)
@@ -113,7 +158,7 @@ def configure_server_logging():
     _update_log_level(config_manager.settings)
 
     # Register the callback to update log level dynamically
-    config_manager.register_update_callback(_update_log_level)
+    config_manager.register_update_callback(_update_log_level, sections=["server.log_level"])
 
     # Silence noisy third-party loggers
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -38,9 +38,16 @@ class ProcessManager:
         )
         from ..utils.queue import clear_all_queues
         from ..core.agent_factory import create_agent
+        from ..core.config import config_manager
+        from ..services.tts_pool import tts_pool_manager
         from ..utils.websocket import connection_manager
 
         asyncio.create_task(create_agent())
+        # Open the TTS connections while the welcome video plays
+        if config_manager.settings:
+            asyncio.create_task(
+                tts_pool_manager.warm_up(config_manager.settings.neuro.tts_provider_id)
+            )
 
         clear_all_queues()
         live_stream_manager.reset_stream_state()
@@ -78,10 +78,12 @@ def get_recent_audience_chats_for_chatbot(limit: int) -> list[dict]:
     formatted_chats = []
     for chat in recent_chats:
         role = "user" if chat.get("is_user_message") else "assistant"
-        formatted_chats.append(
-            {
-                "role": role,
-                "content": f"{chat.get('username', 'unknown')}: {chat.get('text', '')}",
-            }
-        )
+        entry = {
+            "role": role,
+            "content": f"{chat.get('username', 'unknown')}: {chat.get('text', '')}",
+        }
+        # Lets the chatbot tell its local model's own messages apart
+        if chat.get("source"):
+            entry["source"] = chat["source"]
+        formatted_chats.append(entry)
     return formatted_chats
@@ -19,6 +19,12 @@ class AppState:
         # Track stream state to distinguish between true stream start and config updates
         self.is_first_response_for_stream: bool = True  # Only reset when a new stream cycle starts
         self.stream_cycle_id: int = 0  # Incremented each time a new stream cycle starts
+        # Set while none of Neuro's turns is being generated; background LLM work waits for it
+        self.neuro_idle_event = asyncio.Event()
+        self.neuro_idle_event.set()
+        self.neuro_turns_generating: int = 0
+        # Incremented each time Neuro starts speaking a new turn
+        self.neuro_speech_id: int = 0
 
 
 # Create a single, globally accessible instance of the AppState.
@@ -1,29 +1,137 @@
 # neuro_simulator/utils/websocket.py
+import asyncio
+import base64
+import json
 import logging
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
 
 from fastapi import WebSocket, WebSocketDisconnect
 from starlette.websockets import WebSocketState
 
+from ..core.config import config_manager
+
 logger = logging.getLogger(__name__)
 
+# A frame is either a pre-encoded JSON text message or raw binary data
+Frame = Union[str, bytes]
+
+# How each message type is treated when a client's outbound queue backs up.
+#   coalesce: the oldest queued messages of this type are shed to make room
+#   latest:   only the most recent message of this type is kept in the queue
+#   never:    never dropped; a client that cannot take it any more is evicted
+# Types not listed here use "never".
+_DROP_POLICIES: Dict[str, str] = {
+    "chat_message": "coalesce",
+    "chat_batch": "coalesce",
+    "neuro_is_speaking": "latest",
+    "neuro_speech_segment": "never",
+}
+
+
+def encode_message(message: Dict[str, Any]) -> str:
+    """Encodes a message the same way `WebSocket.send_json` does, so it can be sent many times."""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+class _ClientOutbox:
+    """A bounded outbound queue for one stream client, drained by its own writer task."""
+
+    def __init__(self, websocket: WebSocket, capacity: int):
+        self.websocket = websocket
+        self.capacity = capacity
+        self.entries: Deque[Tuple[str, Sequence[Frame]]] = deque()
+        self.has_entries = asyncio.Event()
+        self.writer_task: Optional[asyncio.Task] = None
+        # Set once the client is disconnected, so the writer stops even if its cancel is lost
+        self.closed = False
+        self.max_depth = 0
+        self.sent = 0
+        self.dropped: Counter = Counter()
+
+    def put(self, message_type: str, frames: Sequence[Frame]) -> bool:
+        """
+        Queues a message according to its drop policy.
+        Returns False if the client has fallen so far behind that it should be evicted.
+        """
+        policy = _DROP_POLICIES.get(message_type, "never")
+        if policy == "latest":
+            self._discard(message_type)
+
+        if len(self.entries) >= self.capacity and not self._shed_oldest_lossy():
+            if policy != "coalesce":
+                return False
+            # The queue is full of messages that must not be dropped, so drop this one
+            self.dropped[message_type] += 1
+            return True
+
+        self.entries.append((message_type, frames))
+        self.max_depth = max(self.max_depth, len(self.entries))
+        self.has_entries.set()
+        return True
+
+    def _discard(self, message_type: str):
+        kept = [entry for entry in self.entries if entry[0] != message_type]
+        self.dropped[message_type] += len(self.entries) - len(kept)
+        self.entries = deque(kept)
+
+    def _shed_oldest_lossy(self) -> bool:
+        for entry in self.entries:
+            if _DROP_POLICIES.get(entry[0], "never") != "never":
+                self.entries.remove(entry)
+                self.dropped[entry[0]] += 1
+                return True
+        return False
+
 
 class WebSocketManager:
-    """Manages all active WebSocket connections and provides broadcasting capabilities."""
+    """
+    Manages all active WebSocket connections and provides broadcasting capabilities.
+
+    Every stream client gets a bounded outbound queue drained by its own writer
+    task, so broadcasting never waits on a slow peer. Admin connections are
+    still written to directly.
+    """
 
     def __init__(self):
         self.active_connections: list[WebSocket] = []
         self.admin_connections: list[WebSocket] = []
+        # Optional protocol features each stream client has opted into
+        self.client_capabilities: Dict[WebSocket, Set[str]] = {}
+        self._outboxes: Dict[WebSocket, _ClientOutbox] = {}
+        # Counters of clients that are already gone, kept for the stats
+        self._retired_dropped: Counter = Counter()
+        self._retired_sent = 0
+        self.evicted_clients = 0
+        # Chat messages waiting for the current batching window to close, as (due time, message)
+        self._pending_chats: List[Tuple[float, dict]] = []
+        self._chat_flush_task: Optional[asyncio.Task] = None
+        self._chat_delivery_tasks: Set[asyncio.Task] = set()
+        # Closing handshakes of evicted clients, which must not hold up the sender
+        self._closing_tasks: Set[asyncio.Task] = set()
         logger.info("WebSocketManager initialized.")
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        outbox = _ClientOutbox(websocket, self._queue_capacity())
+        outbox.writer_task = asyncio.create_task(self._run_writer(outbox))
+        self._outboxes[websocket] = outbox
         logger.info(
             f"WebSocket client connected. Total connections: {len(self.active_connections)}"
         )
 
     def disconnect(self, websocket: WebSocket):
         try:
+            self.client_capabilities.pop(websocket, None)
+            outbox = self._outboxes.pop(websocket, None)
+            if outbox is not None:
+                self._retired_dropped.update(outbox.dropped)
+                self._retired_sent += outbox.sent
+                outbox.closed = True
+                outbox.has_entries.set()
+                if outbox.writer_task and outbox.writer_task is not asyncio.current_task():
+                    outbox.writer_task.cancel()
             if websocket in self.active_connections:
                 self.active_connections.remove(websocket)
                 logger.info(
@@ -33,6 +141,9 @@ class WebSocketManager:
             logger.error(f"Error during WebSocket disconnect: {e}")
 
     async def send_personal_message(self, message: dict, websocket: WebSocket):
+        if websocket in self._outboxes:
+            await self._enqueue(websocket, message.get("type", ""), (encode_message(message),))
+            return
         if websocket.client_state == WebSocketState.CONNECTED:
             try:
                 await websocket.send_json(message)
@@ -42,9 +153,205 @@ class WebSocketManager:
                 )
                 self.disconnect(websocket)
 
+    def set_client_capabilities(self, websocket: WebSocket, capabilities: Iterable[str]):
+        """Records the optional protocol features a stream client supports."""
+        self.client_capabilities[websocket] = set(capabilities)
+        logger.debug(f"WebSocket client capabilities set: {sorted(capabilities)}")
+
+    def supports(self, websocket: WebSocket, capability: str) -> bool:
+        return capability in self.client_capabilities.get(websocket, ())
+
+    # --- Outbound queues ---
+
+    @staticmethod
+    def _send_timeout() -> float:
+        settings = config_manager.settings
+        return settings.server.websocket_send_timeout if settings else 5.0
+
+    @staticmethod
+    def _chat_batch_window() -> float:
+        settings = config_manager.settings
+        return settings.server.chat_batch_window_ms / 1000 if settings else 0.25
+
+    @staticmethod
+    def _queue_capacity() -> int:
+        settings = config_manager.settings
+        return settings.server.websocket_send_queue_size if settings else 256
+
+    async def _enqueue(self, websocket: WebSocket, message_type: str, frames: Sequence[Frame]):
+        outbox = self._outboxes.get(websocket)
+        if outbox is not None and not outbox.put(message_type, frames):
+            logger.warning(
+                f"WebSocket client send queue is full ({outbox.capacity} messages). Evicting it."
+            )
+            self._evict(websocket)
+
+    async def _run_writer(self, outbox: _ClientOutbox):
+        """Drains one client's queue in order. Evicts the client if a send fails."""
+        while not outbox.closed:
+            if not outbox.entries:
+                outbox.has_entries.clear()
+                await outbox.has_entries.wait()
+                continue
+            _, frames = outbox.entries.popleft()
+            if not await self._send_frames(outbox.websocket, frames):
+                self._evict(outbox.websocket)
+                return
+            outbox.sent += 1
+
+    async def _send_frames(self, websocket: WebSocket, frames: Sequence[Frame]) -> bool:
+        """
+        Sends pre-encoded frames to one client, in order, within the send timeout.
+        Returns False if the client is gone or too slow and should be evicted.
+        """
+        if websocket.client_state != WebSocketState.CONNECTED:
+            return False
+
+        async def _send_all():
+            for frame in frames:
+                if isinstance(frame, bytes):
+                    await websocket.send_bytes(frame)
+                else:
+                    await websocket.send_text(frame)
+
+        try:
+            await asyncio.wait_for(_send_all(), timeout=self._send_timeout())
+            return True
+        except asyncio.TimeoutError:
+            logger.warning("WebSocket client is too slow to keep up. Evicting it.")
+        except Exception as e:
+            logger.warning(f"Could not send broadcast, client likely disconnected: {e}")
+        return False
+
+    def _evict(self, websocket: WebSocket):
+        """
+        Drops a stream client at once and closes its socket in the background,
+        so a broadcast never waits on the closing handshake.
+        """
+        if websocket in self._outboxes:
+            self.evicted_clients += 1
+        self.disconnect(websocket)
+        if websocket.client_state == WebSocketState.CONNECTED:
+            task = asyncio.create_task(self._close_evicted(websocket))
+            self._closing_tasks.add(task)
+            task.add_done_callback(self._closing_tasks.discard)
+
+    @staticmethod
+    async def _close_evicted(websocket: WebSocket):
+        try:
+            # Bounded as well, a stalled client may not accept the close frame either
+            await asyncio.wait_for(websocket.close(code=1008), timeout=1.0)
+        except Exception:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns queue depths, drop and eviction counters for the admin panel."""
+        outboxes = list(self._outboxes.values())
+        dropped = Counter(self._retired_dropped)
+        for outbox in outboxes:
+            dropped.update(outbox.dropped)
+        depths = [len(outbox.entries) for outbox in outboxes]
+        return {
+            "connections": len(self.active_connections),
+            "admin_connections": len(self.admin_connections),
+            "queue_capacity": self._queue_capacity(),
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "queue_depth_peak": max((o.max_depth for o in outboxes), default=0),
+            "messages_sent": self._retired_sent + sum(o.sent for o in outboxes),
+            "dropped": dict(dropped),
+            "evicted_clients": self.evicted_clients,
+        }
+
+    # --- Broadcasting ---
+
     async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            await self.send_personal_message(message, connection)
+        frames = (encode_message(message),)
+        message_type = message.get("type", "")
+        for connection in list(self.active_connections):
+            await self._enqueue(connection, message_type, frames)
+
+    async def broadcast_speech_segment(self, message: dict, audio_data: bytes):
+        """
+        Broadcasts a speech segment with its audio.
+        Clients that opted into `binary_audio` receive the JSON header with
+        `audio_binary: true` followed by one binary frame holding the raw audio.
+        All other clients receive the audio Base64 encoded in `audio_base64`.
+        """
+        binary_frames: Optional[Sequence[Frame]] = None
+        base64_frames: Optional[Sequence[Frame]] = None
+        message_type = message.get("type", "")
+        for connection in list(self.active_connections):
+            if self.supports(connection, "binary_audio"):
+                if binary_frames is None:
+                    binary_frames = (
+                        encode_message({**message, "audio_binary": True}),
+                        audio_data,
+                    )
+                await self._enqueue(connection, message_type, binary_frames)
+            else:
+                if base64_frames is None:
+                    encoded_audio = base64.b64encode(audio_data).decode("utf-8")
+                    base64_frames = (
+                        encode_message({**message, "audio_base64": encoded_audio}),
+                    )
+                await self._enqueue(connection, message_type, base64_frames)
+
+    async def broadcast_chat(self, message: dict, delay: float = 0.0):
+        """
+        Broadcasts a `chat_message` that should be displayed `delay` seconds from now.
+
+        Messages are collected for `server.chat_batch_window_ms`. Clients that opted
+        into `chat_batch` then receive them in one frame, each with an `offset_ms`
+        telling when to display it. Other clients receive the usual single
+        `chat_message` frames, each sent at its display time.
+        """
+        due = asyncio.get_running_loop().time() + delay
+        self._pending_chats.append((due, message))
+        if self._chat_flush_task is None or self._chat_flush_task.done():
+            self._chat_flush_task = asyncio.create_task(self._flush_chats())
+
+    async def _flush_chats(self):
+        await asyncio.sleep(self._chat_batch_window())
+        pending, self._pending_chats = self._pending_chats, []
+        if not pending:
+            return
+        pending.sort(key=lambda item: item[0])
+
+        now = asyncio.get_running_loop().time()
+        batch_frames: Optional[Sequence[Frame]] = None
+        for connection in list(self.active_connections):
+            if not self.supports(connection, "chat_batch"):
+                continue
+            if batch_frames is None:
+                batch = {
+                    "type": "chat_batch",
+                    "messages": [
+                        {**message, "offset_ms": max(0, int((due - now) * 1000))}
+                        for due, message in pending
+                    ],
+                }
+                batch_frames = (encode_message(batch),)
+            await self._enqueue(connection, "chat_batch", batch_frames)
+
+        # Staggering for the other clients outlives this window, so it runs separately
+        task = asyncio.create_task(self._deliver_chats_individually(pending))
+        self._chat_delivery_tasks.add(task)
+        task.add_done_callback(self._chat_delivery_tasks.discard)
+
+    async def _deliver_chats_individually(self, pending: List[Tuple[float, dict]]):
+        loop = asyncio.get_running_loop()
+        for due, message in pending:
+            wait = due - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            frames: Optional[Sequence[Frame]] = None
+            for connection in list(self.active_connections):
+                if self.supports(connection, "chat_batch"):
+                    continue
+                if frames is None:
+                    frames = (encode_message(message),)
+                await self._enqueue(connection, "chat_message", frames)
 
     async def broadcast_to_admins(self, message: dict):
         dead_connections = []
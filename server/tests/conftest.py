@@ -0,0 +1,31 @@
+"""Shared fixtures. The server keeps its configuration and paths in process-wide singletons."""
+
+import pytest
+
+from neuro_simulator.core.config import config_manager
+from neuro_simulator.core import path_manager as path_manager_module
+
+
+@pytest.fixture(scope="session")
+def working_dir(tmp_path_factory):
+    """A working directory with a default configuration, set up once per test run."""
+    working_dir = tmp_path_factory.mktemp("neuro")
+    config_manager.load(str(working_dir / "config.yaml"))
+    path_manager_module.initialize_path_manager(str(working_dir))
+
+    from neuro_simulator.utils import queue
+
+    queue.initialize_queues()
+    return working_dir
+
+
+@pytest.fixture
+def fresh_data(working_dir):
+    """Resets the agents' data and the chat queues before a test."""
+    # Imported late, as it reads the path manager when it is imported
+    from neuro_simulator.core.data_manager import reset_data_directories_to_defaults
+    from neuro_simulator.utils import queue
+
+    reset_data_directories_to_defaults()
+    queue.clear_all_queues()
+    return working_dir
@@ -0,0 +1,57 @@
+"""Tests that the local ambient model learns from real viewers through the audience buffer."""
+
+import asyncio
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def env(working_dir):
+    # The chatbot and the application read the path manager when they are imported
+    from neuro_simulator.agents.chatbot.core import Chatbot
+    from neuro_simulator.core import application
+    from neuro_simulator.utils import queue
+
+    return Chatbot, application, queue
+
+
+@pytest.fixture
+def chatbot(env, fresh_data):
+    # Starts from an empty chat history, which the ambient model would learn from
+    Chatbot, _, _ = env
+    bot = Chatbot()
+    asyncio.run(bot.initialize())
+    return bot
+
+
+def _learn_from_buffer(env, bot):
+    _, _, queue = env
+    recent_history = queue.get_recent_audience_chats_for_chatbot(50)
+    asyncio.run(bot.record_recent_history(recent_history))
+
+
+def test_learns_real_viewer_messages(env, chatbot):
+    _, application, _ = env
+    asyncio.run(application._publish_user_chat({"username": "viewer", "text": "neuro is so cute today"}))
+
+    _learn_from_buffer(env, chatbot)
+
+    assert len(chatbot.ambient_model) == 1
+    assert chatbot.ambient_model.generate() == "neuro is so cute today"
+
+
+def test_skips_generated_and_local_messages(env, chatbot):
+    _, application, queue = env
+
+    async def publish():
+        await application._publish_audience_chat({"username": "bot", "text": "llm wrote this"})
+        await application._publish_audience_chat(
+            {"username": "local", "text": "the local model wrote this", "source": "local"}
+        )
+
+    asyncio.run(publish())
+    _learn_from_buffer(env, chatbot)
+
+    assert len(chatbot.ambient_model) == 0
+    # The source marker stays in the buffer and is not passed on to Neuro
+    assert all("source" not in chat for chat in queue.get_all_neuro_input_chats())
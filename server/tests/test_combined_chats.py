@@ -0,0 +1,52 @@
+"""Tests that a failed combined chatbot call falls back to separate calls."""
+
+import asyncio
+
+import pytest
+
+from neuro_simulator.core.config import config_manager
+
+
+class _FlakyLLM:
+    """Fails the first call, then returns no chats."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate(self, prompt, max_tokens=None):
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionError("provider unavailable")
+        return ""
+
+
+@pytest.fixture
+def chatbot(fresh_data, monkeypatch):
+    from neuro_simulator.agents.chatbot.core import Chatbot
+
+    settings = config_manager.settings.chatbot
+    monkeypatch.setattr(settings, "combined_generation", True)
+    monkeypatch.setattr(settings, "chats_per_batch", 10)
+    monkeypatch.setattr(settings, "ambient_chat_ratio", 0.5)
+    monkeypatch.setattr(settings, "local_ambient_share", 0.4)
+    monkeypatch.setattr(settings, "local_ambient_min_messages", 1)
+
+    bot = Chatbot()
+    asyncio.run(bot.initialize())
+    bot.chatbot_llm = _FlakyLLM()
+    return bot
+
+
+def test_failed_combined_call_keeps_local_chats(chatbot):
+    from neuro_simulator.core import application
+    from neuro_simulator.utils import queue
+
+    asyncio.run(application._publish_user_chat({"username": "viewer", "text": "neuro is so cute today"}))
+    history = queue.get_recent_audience_chats_for_chatbot(50)
+
+    messages = asyncio.run(chatbot.generate_chat_messages("Hello chat", history))
+
+    # The combined call and then one call for each kind
+    assert chatbot.chatbot_llm.calls == 3
+    assert messages
+    assert all(message["source"] == "local" for message in messages)
@@ -0,0 +1,37 @@
+"""Tests that the diff of a settings update is only visible to its callbacks."""
+
+import asyncio
+
+import pytest
+
+from neuro_simulator.core.config import AppSettings, ConfigManager
+
+
+def _manager():
+    manager = ConfigManager()
+    manager.settings = AppSettings()  # No file path, so nothing is saved
+    return manager
+
+
+def test_last_diff_is_cleared_after_the_callbacks():
+    manager = _manager()
+    seen = []
+    manager.register_update_callback(lambda settings: seen.append(manager.last_diff), sections=["stream"])
+
+    asyncio.run(manager.update_settings({"stream": {**manager.settings.stream.model_dump(), "stream_title": "new"}}))
+
+    assert seen and seen[0].touches("stream.stream_title")
+    assert manager.last_diff is None
+
+
+def test_last_diff_is_cleared_when_a_callback_fails():
+    manager = _manager()
+
+    def fail(settings):
+        raise RuntimeError("callback failed")
+
+    manager.register_update_callback(fail)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(manager.update_settings({"stream": {**manager.settings.stream.model_dump(), "stream_title": "new"}}))
+    assert manager.last_diff is None
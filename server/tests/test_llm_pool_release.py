@@ -0,0 +1,54 @@
+"""Tests that an LLM client's HTTP pool is released on the event loop, whichever thread collects it."""
+
+import asyncio
+import threading
+
+from neuro_simulator.agents.llm import LLMClient
+from neuro_simulator.core.config import LLMProviderSettings
+from neuro_simulator.core.http_pool import http_pool_manager
+
+
+def _provider():
+    return LLMProviderSettings(
+        provider_id="pool-test",
+        display_name="Pool test",
+        provider_type="openai",
+        api_key="test-key",
+        base_url="http://127.0.0.1:9/v1",
+        model_name="test-model",
+    )
+
+
+def test_finalizer_releases_on_the_loop_thread(monkeypatch):
+    released_on = []
+    release = http_pool_manager.release
+    monkeypatch.setattr(
+        http_pool_manager,
+        "release",
+        lambda key: (released_on.append(threading.get_ident()), release(key)),
+    )
+
+    async def run():
+        client = LLMClient(_provider())
+        # Garbage collection may run the finalizer on any thread
+        await asyncio.get_running_loop().run_in_executor(None, client._pool_release)
+        await asyncio.sleep(0)
+        assert released_on == [threading.get_ident()]
+        client.close()
+        assert len(released_on) == 1
+        await http_pool_manager.close_all()
+
+    asyncio.run(run())
+
+
+def test_close_releases_once():
+    async def run():
+        client = LLMClient(_provider())
+        pooled = http_pool_manager._pools[client._pool_key]
+        references = pooled.references
+        client.close()
+        client.close()
+        assert pooled.references == references - 1
+        await http_pool_manager.close_all()
+
+    asyncio.run(run())
@@ -0,0 +1,59 @@
+"""Tests that a blocking LLM stream is consumed without blocking the event loop."""
+
+import asyncio
+import threading
+import time
+
+from neuro_simulator.agents.llm import _iterate_in_thread
+
+# How long the fake SDK blocks for each chunk
+_CHUNK_DELAY_SEC = 0.1
+
+
+def _blocking_chunks(count, closed=None):
+    try:
+        for index in range(count):
+            time.sleep(_CHUNK_DELAY_SEC)  # A blocking network read
+            yield f"chunk {index}"
+    finally:
+        if closed is not None:
+            closed.set()
+
+
+async def _max_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Ticks periodically and returns the longest delay past a tick's due time."""
+    max_lag = 0.0
+    while not stop.is_set():
+        due = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, time.perf_counter() - due)
+    return max_lag
+
+
+def test_consuming_a_blocking_stream_does_not_block_the_loop():
+    async def run():
+        stop = asyncio.Event()
+        ticker = asyncio.ensure_future(_max_loop_lag(stop))
+        await asyncio.sleep(0)  # The ticker is running before the stream starts
+        chunks = [chunk async for chunk in _iterate_in_thread(lambda: _blocking_chunks(5), "test-stream")]
+        stop.set()
+        return chunks, await ticker
+
+    chunks, max_lag = asyncio.run(run())
+
+    assert chunks == [f"chunk {index}" for index in range(5)]
+    # Iterating on the loop itself would stall it for a whole chunk delay each time
+    assert max_lag < _CHUNK_DELAY_SEC / 2
+
+
+def test_stopping_early_closes_the_iterator():
+    closed = threading.Event()
+
+    async def run():
+        async for _ in _iterate_in_thread(lambda: _blocking_chunks(100, closed), "test-stream"):
+            break
+
+    asyncio.run(run())
+
+    # The producer thread notices at its next chunk
+    assert closed.wait(timeout=2 * _CHUNK_DELAY_SEC + 1)
@@ -0,0 +1,82 @@
+"""Tests that a speculative Neuro turn only takes effect once it is spoken."""
+
+import asyncio
+import json
+
+import pytest
+
+from neuro_simulator.core.config import config_manager
+
+
+class _FakeLLM:
+    """Streams one fixed response, as the Actor LLM would."""
+
+    def __init__(self, response):
+        self.response = response
+
+    async def generate_stream(self, prompt, max_tokens=None):
+        for index in range(0, len(self.response), 7):
+            yield self.response[index : index + 7]
+
+
+@pytest.fixture
+def env(fresh_data, monkeypatch):
+    # Imported late, as they read the path manager when they are imported
+    from neuro_simulator.agents.neuro.core import Neuro
+    from neuro_simulator.core import application
+    from neuro_simulator.core.path_manager import path_manager
+    from neuro_simulator.utils import queue
+
+    monkeypatch.setattr(config_manager.settings.neuro, "speculative_next_turn", True)
+    agent = Neuro()
+    agent.neuro_llm = _FakeLLM(json.dumps([{"name": "speak", "params": {"text": "Hello chat. How are you?"}}]))
+    agent.reflection_threshold = 1000
+    asyncio.run(agent.initialize())
+    return agent, application, queue, path_manager.neuro_history_path
+
+
+def _history(path):
+    return path.read_bytes() if path.exists() else b""
+
+
+def _run_speculative_turn(agent, application):
+    async def run():
+        turn = application._start_speculative_turn(agent)
+        assert turn is not None
+        texts = [text async for text in turn.responses()]
+        return turn, texts
+
+    return asyncio.run(run())
+
+
+def test_discarded_turn_leaves_history_unchanged(env):
+    agent, application, queue, history_path = env
+    chat = {"username": "viewer", "text": "hi neuro"}
+    queue.add_to_neuro_input_queue(chat)
+    history_before = _history(history_path)
+
+    turn, texts = _run_speculative_turn(agent, application)
+    assert texts  # The turn was fully generated
+    turn.discard()
+
+    assert _history(history_path) == history_before
+    assert agent.turn_counter == 0
+    # The chats it was answering are waiting for the next turn
+    assert queue.get_all_neuro_input_chats() == [chat]
+
+
+def test_used_turn_is_recorded(env):
+    agent, application, queue, history_path = env
+    queue.add_to_neuro_input_queue({"username": "viewer", "text": "hi neuro"})
+
+    turn, _ = _run_speculative_turn(agent, application)
+    assert _history(history_path) == b""
+    turn.use()
+
+    entries = [json.loads(line) for line in history_path.read_text(encoding="utf-8").splitlines()]
+    assert [(entry["role"], entry["content"]) for entry in entries] == [
+        ("user", "viewer: hi neuro"),
+        ("assistant", "Hello chat. How are you?"),
+    ]
+    assert agent.turn_counter == 1
+    assert queue.is_neuro_input_queue_empty()
@@ -0,0 +1,74 @@
+"""Tests that a streamed speak call is spoken and recorded exactly once, whatever the tool returns."""
+
+import asyncio
+import json
+
+import pytest
+
+from neuro_simulator.core.config import config_manager
+
+_TEXT = "Hello chat. How are you doing today? I am great."
+
+
+class _FakeLLM:
+    """Streams one fixed response in small chunks, as the Actor LLM would."""
+
+    def __init__(self, response):
+        self.response = response
+
+    async def generate_stream(self, prompt, max_tokens=None):
+        for index in range(0, len(self.response), 5):
+            yield self.response[index : index + 5]
+
+
+@pytest.fixture
+def agent(fresh_data, monkeypatch):
+    # Imported late, as it reads the path manager when it is imported
+    from neuro_simulator.agents.neuro.core import Neuro
+
+    monkeypatch.setattr(config_manager.settings.neuro, "stream_partial_speech", True)
+    monkeypatch.setattr(config_manager.settings.neuro, "filter_enabled", False)
+    agent = Neuro()
+    agent.neuro_llm = _FakeLLM(json.dumps([{"name": "speak", "params": {"text": _TEXT}}]))
+    agent.reflection_threshold = 1000
+    asyncio.run(agent.initialize())
+    return agent
+
+
+def _speak(agent):
+    async def run():
+        return [str(text) async for text in agent.stream_responses([{"username": "viewer", "text": "hi"}])]
+
+    return asyncio.run(run())
+
+
+def _recorded_reply():
+    from neuro_simulator.core.path_manager import path_manager
+
+    lines = path_manager.neuro_history_path.read_text(encoding="utf-8").splitlines()
+    return [json.loads(line)["content"] for line in lines if json.loads(line)["role"] == "assistant"]
+
+
+def test_different_tool_text_is_not_spoken_twice(agent, monkeypatch):
+    async def execute_tool(name, **params):
+        # E.g. a tool that trims what it was given
+        return {"status": "success", "spoken_text": params["text"][:10]}
+
+    monkeypatch.setattr(agent.tool_manager, "execute_tool", execute_tool)
+
+    spoken = _speak(agent)
+
+    assert " ".join(spoken) == _TEXT
+    assert _recorded_reply() == [_TEXT]
+
+
+def test_streamed_text_is_recorded_when_the_call_fails(agent, monkeypatch):
+    async def execute_tool(name, **params):
+        raise RuntimeError("speak failed")
+
+    monkeypatch.setattr(agent.tool_manager, "execute_tool", execute_tool)
+
+    spoken = _speak(agent)
+
+    assert " ".join(spoken) == _TEXT
+    assert _recorded_reply() == [_TEXT]
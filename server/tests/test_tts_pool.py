@@ -0,0 +1,54 @@
+"""Tests that closing a synthesizer pool never disturbs a synthesis in progress."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from neuro_simulator.services.tts_pool import PoolClosedError, _SynthesizerPool
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    def create_member(self):
+        synthesizer = object()
+        self._members[synthesizer] = _FakeConnection()
+        return synthesizer
+
+    monkeypatch.setattr(_SynthesizerPool, "_create_member", create_member)
+    return _SynthesizerPool(SimpleNamespace(provider_id="azure", synthesizer_pool_size=1))
+
+
+def test_close_waits_for_the_synthesizer_in_use(pool):
+    async def run():
+        synthesizer = await pool.acquire()
+        connection = pool._members[synthesizer]
+        pool.close()
+        assert not connection.closed
+        pool.release(synthesizer)
+        assert connection.closed
+        assert pool._idle.qsize() == 1  # Only the wake-up marker
+
+    asyncio.run(run())
+
+
+def test_close_wakes_waiting_callers(pool):
+    async def run():
+        await pool.acquire()
+        waiters = [asyncio.create_task(pool.acquire()) for _ in range(2)]
+        await asyncio.sleep(0)
+        pool.close()
+        results = await asyncio.wait_for(asyncio.gather(*waiters, return_exceptions=True), timeout=1.0)
+        assert all(isinstance(result, PoolClosedError) for result in results)
+        with pytest.raises(PoolClosedError):
+            await pool.acquire()
+
+    asyncio.run(run())
@@ -0,0 +1,48 @@
+"""Tests that evicting a stream client never holds up a broadcast."""
+
+import asyncio
+import time
+
+from starlette.websockets import WebSocketState
+
+from neuro_simulator.utils.websocket import WebSocketManager
+
+
+class _StalledWebSocket:
+    """A client that never accepts a frame or the close handshake."""
+
+    def __init__(self):
+        self.client_state = WebSocketState.CONNECTED
+        self.close_started = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await asyncio.Event().wait()
+
+    async def close(self, code=1000):
+        self.close_started.set()
+        await asyncio.Event().wait()
+
+
+def test_eviction_does_not_wait_for_the_close():
+    async def run():
+        manager = WebSocketManager()
+        client = _StalledWebSocket()
+        await manager.connect(client)
+        writer = manager._outboxes[client].writer_task
+
+        start = time.perf_counter()
+        # Speech segments are never dropped, so the stalled client overflows and is evicted
+        for _ in range(manager._queue_capacity() + 1):
+            await manager.broadcast({"type": "neuro_speech_segment"})
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.5
+        assert client not in manager.active_connections
+        assert manager.evicted_clients == 1
+        await asyncio.wait_for(client.close_started.wait(), timeout=1.0)
+        await asyncio.wait_for(asyncio.gather(writer, return_exceptions=True), timeout=1.0)
+
+    asyncio.run(run())